@@ -1,3 +1,4 @@
+import importlib
 from dataclasses import fields
 from pathlib import Path
 
@@ -5,16 +6,16 @@ from selenium.webdriver.remote.webdriver import WebDriver
 
 from src.action_handler import register_action, parse_param_to_dict
 from src.config import ProcessingConfig, Runner
+from src.image_writer import image_suffix
 from src.logger_setup import logger
-from src.runner_axe import runner_axe
-from src.runner_contrast import runner_contrast
-from src.runner_tab import runner_tab
+from src.page_ready import take_wait_time
 from src.utils import take_fullpage_screenshot, count_violations
 
+# runner modules are imported on first use, so loading the actions does not load the runner dependencies
 runner_function_map = {
-    Runner.AXE: runner_axe,
-    Runner.CONTRAST: runner_contrast,
-    Runner.TAB: runner_tab,
+    Runner.AXE: ("src.runner_axe", "runner_axe"),
+    Runner.CONTRAST: ("src.runner_contrast", "runner_contrast"),
+    Runner.TAB: ("src.runner_tab", "runner_tab"),
 }
 
 input_idx = 0
@@ -56,18 +57,20 @@ def analyse_action(config: ProcessingConfig, driver: WebDriver, action: dict) ->
         # if no param is given, we assume the current page is the one to analyse
         page_title = driver.title
 
-    logger.info(f"[{input_idx}] Analysing page '{page_title}' with runner '{config.runner.value}'")
+    # time spent waiting for the page since the previous analyse (navigation and actions to reach this page)
+    wait_time = take_wait_time()
+    logger.info(f"[{input_idx}] Analysing page '{page_title}' with runner '{config.runner.value}' "
+                f"(waited {wait_time:.2f}s for the page to get ready)")
 
     # take full-pagescreenshot
-    full_page_screenshot_path = Path(config.output) / f"{config.mode.value}_{input_idx}_full_page_screenshot.png"
+    full_page_screenshot_path = Path(config.output) / f"{config.mode.value}_{input_idx}_full_page_screenshot{image_suffix()}"
     logger.debug(f"Taking full-page screenshot and saving to: {full_page_screenshot_path}")
-    take_fullpage_screenshot(driver, full_page_screenshot_path)
+    page_screenshot = take_fullpage_screenshot(driver, full_page_screenshot_path)
 
     # select runner to run the check
-    runner_function = runner_function_map.get(config.runner)
-    if runner_function is None:
-        raise ValueError(f"Invalid runner: {config.runner}")
-    full_page_screenshot_path_outline = runner_function(config, driver, results, screenshots_folder, input_idx)
+    runner_function = get_runner_function(config.runner)
+    full_page_screenshot_path_outline = runner_function(config, driver, results, screenshots_folder, input_idx,
+                                                        page_screenshot=page_screenshot)
 
     # check for violations
     violations = count_violations(results)
@@ -85,6 +88,7 @@ def analyse_action(config: ProcessingConfig, driver: WebDriver, action: dict) ->
         "browser_height": browser_height,
         "violations": violations,
         "failed": violations > 0,
+        "wait_time": round(wait_time, 3),
     }
     if full_page_screenshot_path:
         entry["screenshot"] = full_page_screenshot_path.as_posix()
@@ -93,6 +97,20 @@ def analyse_action(config: ProcessingConfig, driver: WebDriver, action: dict) ->
     return entry
 
 
+def get_runner_function(runner: Runner):
+    """
+    Get the function of a runner, the runner module is imported on first use.
+
+    :param runner: The runner to get the function for.
+    :return: The runner function.
+    """
+    runner_location = runner_function_map.get(runner)
+    if runner_location is None:
+        raise ValueError(f"Invalid runner: {runner}")
+    module_name, function_name = runner_location
+    return getattr(importlib.import_module(module_name), function_name)
+
+
 def _analyse_runner(runner: Runner, config: ProcessingConfig, driver: WebDriver, action: dict) -> dict | None:
     """
     Internal function to handle the different analysis action runners.
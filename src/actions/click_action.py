@@ -1,12 +1,11 @@
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common import NoSuchElementException
 from selenium.webdriver import ActionChains
-from selenium.webdriver.common.by import By
 
 from src.action_handler import register_action
 from src.config import ProcessingConfig
 from src.logger_setup import logger
-from src.utils import wait_page_loaded
+from src.page_ready import find_element_when_present, wait_page_loaded
 
 @register_action("click")
 def click_action(config: ProcessingConfig, driver: WebDriver, action: dict) -> None:
@@ -23,7 +22,7 @@ def click_action(config: ProcessingConfig, driver: WebDriver, action: dict) -> N
         logger.warning("No selector provided for click action.")
         return
     try:
-        elem = driver.find_element(By.CSS_SELECTOR, param)
+        elem = find_element_when_present(driver, param)
         elem.click()
         wait_page_loaded(driver)
     except NoSuchElementException as e:
@@ -45,7 +44,7 @@ def click_double_action(config: ProcessingConfig, driver: WebDriver, action: dic
         logger.warning("No selector provided for click_double action.")
         return
     try:
-        elem = driver.find_element(By.CSS_SELECTOR, param)
+        elem = find_element_when_present(driver, param)
         ActionChains(driver).double_click(elem).perform()
     except NoSuchElementException as e:
         logger.warning(f"No element found for click_double action with selector: {param}")
@@ -67,7 +66,7 @@ def click_context_action(config: ProcessingConfig, driver: WebDriver, action: di
         logger.warning("No selector provided for click_context action.")
         return
     try:
-        elem = driver.find_element(By.CSS_SELECTOR, param)
+        elem = find_element_when_present(driver, param)
         ActionChains(driver).context_click(elem).perform()
     except NoSuchElementException as e:
         logger.warning(f"No element found for click_context action with selector: {param}")
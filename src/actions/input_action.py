@@ -2,13 +2,12 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common import NoSuchElementException
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select
 
 from src.action_handler import register_action, parse_param_to_key_value
 from src.config import ProcessingConfig
 from src.logger_setup import logger
-from src.utils import wait_page_loaded
+from src.page_ready import find_element_when_present, wait_page_loaded
 
 special_chars = {
     "<CR>": "\r",
@@ -75,7 +74,7 @@ def input_action(config: ProcessingConfig, driver: WebDriver, action: dict) -> N
     logger.debug(f"Inputting text '{text}' into element with selector '{selector}'")
 
     try:
-        elem = driver.find_element(By.CSS_SELECTOR, selector)
+        elem = find_element_when_present(driver, selector)
         for placeholder, char in special_chars.items():
             text = text.replace(placeholder, char)
         elem.send_keys(text)
@@ -102,7 +101,7 @@ def clear_action(config: ProcessingConfig, driver: WebDriver, action: dict) -> N
         logger.warning("no selector provided for clear action.")
         return
     try:
-        element = driver.find_element(By.CSS_SELECTOR, param)
+        element = find_element_when_present(driver, param)
         element.clear()
     except NoSuchElementException:
         logger.warning(f"No element found for clear action with selector: {param}")
@@ -127,7 +126,7 @@ def select_action(config: ProcessingConfig, driver: WebDriver, action: dict) ->
     selector, value = parse_param_to_key_value(param)
     logger.debug(f"Selecting value '{value}' in element with selector '{selector}'")
     try:
-        element = driver.find_element(By.CSS_SELECTOR, selector)
+        element = find_element_when_present(driver, selector)
         Select(element).select_by_value(value)
     except NoSuchElementException:
         logger.warning(f"No element found for select action with selector: {selector}")
@@ -156,7 +155,7 @@ def send_keys_action(config: ProcessingConfig, driver: WebDriver, action: dict)
     logger.debug(f"Sending keys '{keys}' to element with selector '{selector}'")
 
     try:
-        element = driver.find_element(By.CSS_SELECTOR, selector)
+        element = find_element_when_present(driver, selector)
         for placeholder, char in special_chars.items():
             keys = keys.replace(placeholder, char)
         element.send_keys(keys)
@@ -196,7 +195,7 @@ def send_key_combination(config: ProcessingConfig, driver: WebDriver, action: di
         keys = key_combination.split('+')
         action_chain = ActionChains(driver)
         if selector:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
+            element = find_element_when_present(driver, selector)
             action_chain.click(element)
 
         # Press and hold special keys
@@ -231,7 +230,7 @@ def submit_action(config: ProcessingConfig, driver: WebDriver, action: dict) ->
         return
 
     try:
-        element = driver.find_element(By.CSS_SELECTOR, param)
+        element = find_element_when_present(driver, param)
         element.submit()
     except NoSuchElementException:
         logger.warning(f"No element found for submit action with selector: {param}")
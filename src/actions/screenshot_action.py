@@ -4,6 +4,7 @@ from selenium.webdriver.common.by import By
 
 from src.action_handler import register_action, parse_param_to_key_value
 from src.config import ProcessingConfig
+from src.image_writer import IMAGE_SUFFIXES, image_suffix, write_image
 from src.logger_setup import logger
 from src.utils import take_fullpage_screenshot
 
@@ -14,6 +15,7 @@ def screenshot_action(config: ProcessingConfig, driver: WebDriver, action: dict)
     Syntax: `@screenshot: [<selector>=]<filename>`
 
     Takes a screenshot of the current page and saves it with the specified `<filename>`.
+    The image format is taken from the file suffix (.png, .webp, .jpg), without suffix the configured format is used.
     If optional `<selector>` is provided, it will take a screenshot of that specific element.
     This is done by separating the filename and selector with an equals sign (`=`).
     ```
@@ -28,8 +30,8 @@ def screenshot_action(config: ProcessingConfig, driver: WebDriver, action: dict)
 
     selector, filename = parse_param_to_key_value(param)
 
-    if not param.endswith(".png"):
-        param += ".png"
+    if Path(filename).suffix.lower() not in (*IMAGE_SUFFIXES.values(), ".jpeg"):
+        filename += image_suffix()
 
     screenshot_path = Path(config.output) / "screenshots" / filename
     logger.debug(f"Taking screenshot for '{selector if selector else 'all'}' and saving to {screenshot_path}")
@@ -37,7 +39,7 @@ def screenshot_action(config: ProcessingConfig, driver: WebDriver, action: dict)
     if selector:
         try:
             element = driver.find_element(By.CSS_SELECTOR, selector)
-            element.screenshot(screenshot_path.as_posix())
+            write_image(element.screenshot_as_png, screenshot_path)
         except Exception as e:
             logger.error(f"Failed to take screenshot of element '{selector}': {e}")
     else:
@@ -1,14 +1,12 @@
 import time
 
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.wait import WebDriverWait
 
 from src.action_handler import register_action
 from src.config import ProcessingConfig
 from src.logger_setup import logger
-from src.utils import wait_page_loaded
+from src.page_ready import wait_for_selector, wait_page_loaded
 
 @register_action("wait")
 def wait_action(config: ProcessingConfig, driver: WebDriver, action: dict) -> None:
@@ -45,12 +43,14 @@ def wait_action(config: ProcessingConfig, driver: WebDriver, action: dict) -> No
             # If the parameter starts with '!', wait for the element to be absent
             param = param[1:]
             logger.info(f"Waiting for element with ID '{param}' to not exist (timeout: {timeout} seconds)")
-            WebDriverWait(driver, timeout).until(EC.staleness_of(driver.find_element(By.CSS_SELECTOR, param)))
+            if not wait_for_selector(driver, param, present=False, timeout=timeout):
+                raise TimeoutException(f"Element '{param}' still exists after {timeout} seconds")
             return
 
         if not param[0].isdigit():
             logger.info(f"Waiting for element with ID '{param}' to exist (timeout: {timeout} seconds)")
-            WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, param)))
+            if not wait_for_selector(driver, param, timeout=timeout):
+                raise TimeoutException(f"Element '{param}' does not exist after {timeout} seconds")
             return
 
         wait_time = 0
@@ -7,7 +7,7 @@ from rich_argparse import RawTextRichHelpFormatter
 from gettext import gettext as _
 from argparse import SUPPRESS, OPTIONAL, ZERO_OR_MORE
 
-from src.config import ColorSource, Mode, ReportLevel, Runner
+from src.config import ColorExtraction, ColorSource, ColorSuggestion, ImageFormat, Mode, ReportLevel, Runner, ScreenshotStore, TabMode
 
 
 class CustomArgparseFormatter(RawTextRichHelpFormatter):
@@ -54,6 +54,8 @@ def argument_parser() -> argparse.ArgumentParser:
                         help="Enable debug mode for detailed output.")
     parser.add_argument("--readme", "-r", action="store_true",
                         help="Show README markdown in terminal.")
+    parser.add_argument("--profile_startup", "--profile-startup", action="store_true",
+                        help="Print the time spent on imports (startup breakdown) on exit.")
     parser.add_argument(
         "--version", "-v", action="version", version="[argparse.prog]%(prog)s[/] version [i]1.0.0[/]"
     )
@@ -72,14 +74,54 @@ def argument_parser() -> argparse.ArgumentParser:
                                           nargs="?", default=None)
     parent_processing_parser.add_argument("--json", action=argparse.BooleanOptionalAction,
                                           help="Enable or disable JSON output.", default=True)
+    parent_processing_parser.add_argument("--results_gzip", action=argparse.BooleanOptionalAction,
+                                          help="Write the results files gzip compressed (.gz).", default=False)
+    parent_processing_parser.add_argument("--result_html_length", type=int,
+                                          help=textwrap.dedent("""\
+                            Maximum length of the HTML snippet stored per axe node in the results (0 keeps the full HTML).
+                            """).strip(), default=0)
     parent_processing_parser.add_argument("--markdown", action=argparse.BooleanOptionalAction,
                                           help="Enable or disable Markdown Report output.", default=True)
     parent_processing_parser.add_argument("--html", action=argparse.BooleanOptionalAction,
                                           help="Enable or disable HTML Report output.", default=True)
     parent_processing_parser.add_argument("--simulate", "-s", type=str,
-                                          help="Simulate checking; use JSON as base to generate reports (no website calls)")
+                                          help="Simulate checking; use a results file (.jsonl or .json) as base to generate reports (no website calls)")
+    parent_processing_parser.add_argument("--report_processes", type=int,
+                                          help=textwrap.dedent("""\
+                            Number of processes to render the pages of the reports in parallel.
+                            0 uses the CPU cores, 1 renders in the main process.
+                            """).strip(), default=0)
     parent_processing_parser.add_argument("--resolution", type=str,
                                           help="Set the Resolution the remote controlled Browser will default to. Format <width>x<height>", default="1920x1080")
+    parent_processing_parser.add_argument("--workers", "-w", type=int,
+                                          help=textwrap.dedent("""\
+                            Number of parallel browser sessions to split the inputs on.
+                            Every worker replays the login and gets its own screenshot folder.
+                            """).strip(), default=1)
+    parent_processing_parser.add_argument("--wait_timeout", type=float,
+                                          help="Maximum time in seconds to wait for a page to get ready after loading it or an action.",
+                                          default=5)
+    parent_processing_parser.add_argument("--wait_idle", type=float,
+                                          help=textwrap.dedent("""\
+                            Time in seconds without running requests and DOM changes until a page is considered ready.
+                            """).strip(), default=0.5)
+    parent_processing_parser.add_argument("--screenshot_format", type=ImageFormat,
+                                          help="Image format of the screenshots (webp and jpeg are much smaller than png).",
+                                          choices=list(ImageFormat), nargs="?", default=ImageFormat.PNG)
+    parent_processing_parser.add_argument("--screenshot_quality", type=int,
+                                          help="Quality (1-100) of the screenshots for format webp and jpeg.", default=85)
+    parent_processing_parser.add_argument("--screenshot_max_dimension", type=int,
+                                          help=textwrap.dedent("""\
+                            Downscale full-page screenshots so the longer side is at most this many pixels (0 keeps the size).
+                            """).strip(), default=0)
+    parent_processing_parser.add_argument("--screenshot_store", type=ScreenshotStore,
+                                          help=textwrap.dedent("""\
+                            How element screenshots are stored.
+                            'hashed' stores each distinct image once under its content hash in 'screenshots/blobs'
+                            (identical elements like shared headers and menus are written only once),
+                            'files' writes one file per element and page.
+                            """).strip(),
+                                          choices=list(ScreenshotStore), nargs="?", default=ScreenshotStore.HASHED)
 
     subparsers = parser.add_subparsers(dest="mode", required=False,
                                        help="Mode of the Tool")
@@ -112,10 +154,35 @@ def argument_parser() -> argparse.ArgumentParser:
     check_parser.add_argument("--color_source", type=ColorSource,
                                  help=f"{for_contrast_runner_hint}The source to extract the colors from to check.",
                                  choices=list(ColorSource), nargs="?", default=ColorSource.ELEMENT)
+    check_parser.add_argument("--color_extraction", type=ColorExtraction,
+                              help=textwrap.dedent(f"""\
+                                 {for_contrast_runner_hint}The algorithm to find the dominant colors of an image (color source image).
+                                 histogram: quantized color histogram with refinement (default, fast),
+                                 kmeans: K-Means clustering (scikit-learn, slow).
+                                 """).strip(),
+                              choices=list(ColorExtraction), nargs="?", default=ColorExtraction.HISTOGRAM)
+    check_parser.add_argument("--image_processes", type=int,
+                              help=textwrap.dedent(f"""\
+                                 {for_contrast_runner_hint}Number of processes to extract the colors of element images (color source image)
+                                 while the browser collects the next elements. 0 uses the CPU cores (shared by the workers), 1 disables it.
+                                 """).strip(), default=0)
+    check_parser.add_argument("--contrast_prefilter", action=argparse.BooleanOptionalAction, default=False,
+                              help=textwrap.dedent(f"""\
+                                 {for_contrast_runner_hint}Drop elements that meet the contrast threshold already in the browser.
+                                 Only used with color source element and report level invalid, only failing elements are transferred.
+                                 """).strip())
+    check_parser.add_argument("--color_suggestion", type=ColorSuggestion,
+                                 help=textwrap.dedent(f"""\
+                                 {for_contrast_runner_hint}The algorithm to suggest WCAG compliant colors.
+                                 hsl: brightness steps in the HSL color spectrum (default),
+                                 rgb: random search in the RGB space (computation heavy, results vary between runs),
+                                 lightness: deterministic solver along the perceptual lightness (CIELAB), closest colors.
+                                 """).strip(),
+                                 choices=list(ColorSuggestion), nargs="?", default=ColorSuggestion.HSL)
     check_parser.add_argument("--alternate_color_suggestion", action="store_true",
                                  help=textwrap.dedent(f"""\
                                  {for_contrast_runner_hint}Use alternative color suggestion algorithm.
-                                 (RGB color if true -- computation heavy) - default is HSL color spectrum."
+                                 (same as --color_suggestion rgb)
                                  """).strip())
     check_parser.add_argument("--report_level", type=ReportLevel,
                                  help=f"{for_contrast_runner_hint}The level of which to report.",
@@ -129,5 +196,13 @@ def argument_parser() -> argparse.ArgumentParser:
                                 """).strip())
     check_parser.add_argument("--missing_tab_check", action=argparse.BooleanOptionalAction, default=True,
                               help=f"{for_tab_runner_hint}Should the missing tab check be done to compare with found TAB keypresses.")
+    check_parser.add_argument("--tab_mode", type=TabMode,
+                              help=textwrap.dedent(f"""\
+                                 {for_tab_runner_hint}How to collect the tab order of a page.
+                                 full: press the TAB key for every focusable element (default),
+                                 predicted: compute the tab order in the browser and verify it with TAB keys at sampled checkpoints,
+                                 parts that differ are collected with TAB keys.
+                                 """).strip(),
+                              choices=list(TabMode), nargs="?", default=TabMode.FULL)
 
     return parser
@@ -0,0 +1,211 @@
+import numpy as np
+from numpy import ndarray
+
+# weights of the linear R, G and B channels for the relative luminance (WCAG 2.x)
+LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+
+def _srgb_to_linear_formula(values: ndarray) -> ndarray:
+    """
+    Gamma correction of sRGB channel values (0-255) to linear values (0-1).
+
+    c = c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+    where c is the channel value normalized to 0-1.
+    """
+    values = values / 255.0
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+# precomputed linear value for every 8-bit sRGB channel value
+SRGB_TO_LINEAR: ndarray = _srgb_to_linear_formula(np.arange(256, dtype=float))
+_srgb_to_linear_values: list[float] = SRGB_TO_LINEAR.tolist()
+
+
+def srgb_to_linear(values) -> ndarray:
+    """
+    Convert sRGB channel values (0-255) to linear values (0-1).
+    Integer values are looked up in the precomputed table, float values are calculated.
+
+    :param values: Array like of channel values (any shape).
+    :return: Array of the same shape with the linear values.
+    """
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return SRGB_TO_LINEAR[np.clip(values, 0, 255)]
+    return _srgb_to_linear_formula(values.astype(float))
+
+
+def relative_luminance_array(colors) -> ndarray:
+    """
+    Calculate the relative luminance for an array of colors.
+
+    :param colors: Array like of RGB colors with shape (..., 3), e.g. N×3.
+    :return: Array with the relative luminance per color, shape (...).
+    """
+    return srgb_to_linear(colors) @ LUMINANCE_WEIGHTS
+
+
+def contrast_ratio_array(l1, l2) -> ndarray:
+    """
+    Calculate the contrast ratio between two arrays of luminance values (element wise, broadcasting).
+
+    :param l1: luminance values of the first colors
+    :param l2: luminance values of the second colors
+    :return: Array of contrast ratios
+    """
+    l1 = np.asarray(l1, dtype=float)
+    l2 = np.asarray(l2, dtype=float)
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
+
+
+def contrast_ratio_colors(colors1, colors2) -> ndarray:
+    """
+    Calculate the contrast ratio between two arrays of RGB colors (element wise, broadcasting).
+
+    :param colors1: Array like of RGB colors with shape (..., 3)
+    :param colors2: Array like of RGB colors with shape (..., 3)
+    :return: Array of contrast ratios
+    """
+    return contrast_ratio_array(relative_luminance_array(colors1), relative_luminance_array(colors2))
+
+
+def _channel_to_linear(value) -> float:
+    index = int(value)
+    if index == value and 0 <= index <= 255:
+        return _srgb_to_linear_values[index]
+    value = value / 255.0
+    return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+
+def relative_luminance(color: tuple[int, int, int]) -> float:
+    """
+    Calculate the relative luminance of a color.
+    The formula is based on the WCAG 2.0 guidelines.
+
+    The formula is:
+    L = 0.2126 * R + 0.7152 * G + 0.0722 * B
+    where R, G, and B are the gamma corrected (linear) RGB values (0-1).
+
+    The linear values of 8-bit channels are taken from a precomputed table (see SRGB_TO_LINEAR).
+
+    :param color: The color as an RGB tuple (R, G, B).
+    :return: The relative luminance of the color.
+    """
+    r, g, b = color
+    return 0.2126 * _channel_to_linear(r) + 0.7152 * _channel_to_linear(g) + 0.0722 * _channel_to_linear(b)
+
+
+def contrast_ratio(l1: float, l2: float) -> float:
+    """
+    Calculate the contrast ratio between two luminance values.
+    :param l1: luminance of the first color
+    :param l2: luminance of the second color
+    :return: contrast ratio
+    """
+    l1, l2 = max(l1, l2), min(l1, l2)
+    return (l1 + 0.05) / (l2 + 0.05)
+
+
+def _hls_channel(m1: ndarray, m2: ndarray, hue: float) -> ndarray:
+    hue = hue % 1.0
+    if hue < 1.0 / 6.0:
+        return m1 + (m2 - m1) * hue * 6.0
+    if hue < 0.5:
+        return m2
+    if hue < 2.0 / 3.0:
+        return m1 + (m2 - m1) * (2.0 / 3.0 - hue) * 6.0
+    return m1
+
+
+def hls_to_rgb_array(h: float, lightness, s: float) -> ndarray:
+    """
+    Convert a hue and saturation with an array of lightness values to RGB (like colorsys.hls_to_rgb).
+
+    :param h: Hue (0-1)
+    :param lightness: Array like of lightness values (0-1), shape (N,)
+    :param s: Saturation (0-1)
+    :return: Array of RGB values (0-1) with shape (N, 3)
+    """
+    lightness = np.asarray(lightness, dtype=float)
+    if s == 0.0:
+        return np.stack([lightness, lightness, lightness], axis=-1)
+    m2 = np.where(lightness <= 0.5, lightness * (1.0 + s), lightness + s - (lightness * s))
+    m1 = 2.0 * lightness - m2
+    channels = [_hls_channel(m1, m2, h + 1.0 / 3.0), _hls_channel(m1, m2, h), _hls_channel(m1, m2, h - 1.0 / 3.0)]
+    return np.stack([np.broadcast_to(channel, lightness.shape) for channel in channels], axis=-1)
+
+
+# sRGB (D65) <-> CIE XYZ (IEC 61966-2-1), the Y row are the WCAG luminance weights
+_RGB_TO_XYZ = np.array([
+    [0.4124, 0.3576, 0.1805],
+    LUMINANCE_WEIGHTS,
+    [0.0193, 0.1192, 0.9505],
+])
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+_WHITE_D65 = _RGB_TO_XYZ.sum(axis=1)
+_LAB_DELTA = 6 / 29
+
+
+def srgb_to_lab_array(colors) -> ndarray:
+    """
+    Convert RGB colors (0-255) to CIELAB (D65).
+
+    :param colors: Array like of RGB colors with shape (..., 3)
+    :return: Array of L*, a*, b* values with shape (..., 3)
+    """
+    xyz = srgb_to_linear(colors) @ _RGB_TO_XYZ.T / _WHITE_D65
+    f = np.where(xyz > _LAB_DELTA ** 3, np.cbrt(xyz), xyz / (3 * _LAB_DELTA ** 2) + 4 / 29)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+def lab_to_linear_array(lab, clip: bool = True) -> ndarray:
+    """
+    Convert CIELAB (D65) colors to linear RGB values.
+
+    :param lab: Array like of L*, a*, b* values with shape (..., 3)
+    :param clip: Clip out of gamut colors to 0-1 (default: True)
+    :return: Array of linear RGB values with shape (..., 3)
+    """
+    lab = np.asarray(lab, dtype=float)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    xyz = np.where(f > _LAB_DELTA, f * f * f, 3 * _LAB_DELTA ** 2 * (f - 4 / 29)) * _WHITE_D65
+    linear = xyz @ _XYZ_TO_RGB.T
+    return np.clip(linear, 0, 1) if clip else linear
+
+
+def luminance_to_lightness(luminance) -> ndarray:
+    """
+    Convert relative luminance values (CIE Y, 0-1) to CIELAB lightness L* (0-100).
+
+    :param luminance: Array like of luminance values (any shape).
+    :return: Array of the same shape with the L* values.
+    """
+    luminance = np.asarray(luminance, dtype=float)
+    f = np.where(luminance > _LAB_DELTA ** 3, np.cbrt(luminance), luminance / (3 * _LAB_DELTA ** 2) + 4 / 29)
+    return 116 * f - 16
+
+
+def linear_to_srgb_array(linear) -> ndarray:
+    """
+    Convert linear RGB values (0-1) to sRGB channel values (0-255, not rounded).
+
+    :param linear: Array like of linear values (any shape).
+    :return: Array of the same shape with the sRGB values as float.
+    """
+    linear = np.asarray(linear, dtype=float)
+    return np.where(linear <= 0.0031308, 12.92 * linear, 1.055 * linear ** (1 / 2.4) - 0.055) * 255
+
+
+def lab_to_srgb_array(lab) -> ndarray:
+    """
+    Convert CIELAB (D65) colors to 8-bit RGB colors, out of gamut colors are clipped.
+
+    :param lab: Array like of L*, a*, b* values with shape (..., 3)
+    :return: Array of RGB colors (integers 0-255) with shape (..., 3)
+    """
+    return np.rint(linear_to_srgb_array(lab_to_linear_array(lab))).astype(int)
@@ -197,7 +197,14 @@ class ConditionParser:
     """Parser for condition expressions using Lark."""
 
     def __init__(self):
-        self.parser = Lark(CONDITION_GRAMMAR, parser='lalr')
+        self._parser: Lark | None = None
+
+    @property
+    def parser(self) -> Lark:
+        # the grammar is compiled on first use, not on import (e.g. for the actions listing)
+        if self._parser is None:
+            self._parser = Lark(CONDITION_GRAMMAR, parser='lalr')
+        return self._parser
 
     def evaluate(self, condition: str, context: dict = None) -> bool:
         """
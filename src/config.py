@@ -18,6 +18,43 @@ class ColorSource(Enum):
     def __str__(self):
         return self.value
 
+class ColorExtraction(Enum):
+    HISTOGRAM = "histogram"
+    KMEANS = "kmeans"
+
+    def __str__(self):
+        return self.value
+
+class ColorSuggestion(Enum):
+    HSL = "hsl"
+    RGB = "rgb"
+    LIGHTNESS = "lightness"
+
+    def __str__(self):
+        return self.value
+
+class TabMode(Enum):
+    FULL = "full"
+    PREDICTED = "predicted"
+
+    def __str__(self):
+        return self.value
+
+class ImageFormat(Enum):
+    PNG = "png"
+    WEBP = "webp"
+    JPEG = "jpeg"
+
+    def __str__(self):
+        return self.value
+
+class ScreenshotStore(Enum):
+    HASHED = "hashed"
+    FILES = "files"
+
+    def __str__(self):
+        return self.value
+
 class Mode(Enum):
     CHECK = "check"
     ACTIONS = "actions"
@@ -58,10 +95,20 @@ class ProcessingConfig(Config):
     inputs: list[str] = field(default_factory=list)
     excludes: Path | None = None
     json: bool = True
+    results_gzip: bool = False
+    result_html_length: int = 0
     markdown: bool = True
     html: bool = True
     simulate: str | None = None
     resolution: tuple[int, int] = (1920, 1080)
+    workers: int = 1
+    report_processes: int = 0
+    wait_timeout: float = 5
+    wait_idle: float = 0.5
+    screenshot_format: ImageFormat = ImageFormat.PNG
+    screenshot_quality: int = 85
+    screenshot_max_dimension: int = 0
+    screenshot_store: ScreenshotStore = ScreenshotStore.HASHED
     resolution_width: int = field(init=False)
     resolution_height: int = field(init=False)
     axe_rules: str | None = "wcag2a, wcag2aa, wcag21a, wcag21aa, wcag22aa"
@@ -71,9 +118,22 @@ class ProcessingConfig(Config):
     use_antialias: bool = False
     report_level: ReportLevel = ReportLevel.INVALID
     alternate_color_suggestion: bool = False
+    color_suggestion: ColorSuggestion = ColorSuggestion.HSL
     color_source: ColorSource = ColorSource.ELEMENT
+    color_extraction: ColorExtraction = ColorExtraction.HISTOGRAM
+    image_processes: int = 0
+    contrast_prefilter: bool = False
     context: str | None = None
     missing_tab_check: bool = True
+    tab_mode: TabMode = TabMode.FULL
 
     def __post_init__(self):
         self.resolution_width, self.resolution_height = self.resolution
+        self.color_suggestion = ColorSuggestion(self.color_suggestion)
+        self.color_extraction = ColorExtraction(self.color_extraction)
+        self.tab_mode = TabMode(self.tab_mode)
+        self.screenshot_format = ImageFormat(self.screenshot_format)
+        self.screenshot_store = ScreenshotStore(self.screenshot_store)
+        # legacy flag, selects the RGB algorithm if no other algorithm is configured
+        if self.alternate_color_suggestion and self.color_suggestion == ColorSuggestion.HSL:
+            self.color_suggestion = ColorSuggestion.RGB
@@ -1,41 +1,46 @@
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import cv2
 from numpy import ndarray
 from selenium.webdriver.remote.webdriver import WebDriver
-from sklearn.cluster import KMeans
 from pathlib import Path
 
 from PIL import Image
-from selenium.webdriver.remote.webelement import WebElement
 
+from src.image_writer import store_image
 from src.logger_setup import logger
 from src.recommend_colors import suggest_wcag_colors
-from src.utils import get_element_colors, log_colored_char, rgb_to_hex, contrast_ratio, relative_luminance, \
-    take_element_screenshot
-from src.config import ColorSource, ReportLevel, ProcessingConfig
+from src.screenshot import PageScreenshot, save_element_screenshot, get_element_image
+from src.color_math import contrast_ratio, relative_luminance
+from src.utils import log_colored_char, rgb_to_hex
+from src.config import ColorSource, ReportLevel, ProcessingConfig, ColorExtraction
 
 
-def get_dominant_colors_from_element(driver: WebDriver, element: WebElement) -> list[tuple[int, int, int]]:
+def get_dominant_colors_from_element(element_snapshot: dict) -> list[tuple[int, int, int]]:
     """
-    Get the dominant colors of a WebElement.
-    This function uses the WebElement's CSS properties to get the foreground and background colors.
-    The function returns the foreground and background colors as RGB values.
+    Get the dominant colors of an element snapshot.
+    The foreground and background colors are taken from the element's CSS properties
+    collected in the browser (see get_element_snapshots).
 
-    :param driver: The Selenium WebDriver instance.
-    :param element: The WebElement to get the colors from.
-    :return: A tuple with the foreground and background colors as RGB values.
+    :param element_snapshot: The element snapshot to get the colors from.
+    :return: A list with the foreground and background colors as RGB values.
     """
-    fg_color, bg_color = get_element_colors(driver, element)
+    fg_color, bg_color = element_snapshot.get("fg"), element_snapshot.get("bg")
     if fg_color is None or bg_color is None:
         return []
     return [fg_color, bg_color]
 
-def get_dominant_colors_from_image(image: ndarray, mask: ndarray=None, n_colors=2) -> list[tuple[int, int, int]]:
+def get_dominant_colors_from_image(image: ndarray, mask: ndarray=None, n_colors=2,
+                                   extraction: ColorExtraction = ColorExtraction.HISTOGRAM) -> list[tuple[int, int, int]]:
     """
-    Get the dominant colors in an image using K-Means clustering.
-    This function uses K-Means clustering to find the most common colors in an image.
-    The image is first converted to an array, and then the K-Means algorithm is applied to find the dominant colors.
+    Get the dominant colors in an image.
+    The image is converted to an array of pixels and the most common colors are searched,
+    by default with a quantized color histogram (see dominant_colors_histogram)
+    or with K-Means clustering (see dominant_colors_kmeans).
     The function returns the dominant colors sorted by frequency.
     The function also applies a mask to the image to only consider pixels where the mask is 255.
 
@@ -45,6 +50,7 @@ def get_dominant_colors_from_image(image: ndarray, mask: ndarray=None, n_colors=
     :param image: The input image as a NumPy array.
     :param mask: The mask to apply to the image. Only pixels where the mask is 255 are considered.
     :param n_colors: The number of dominant colors to find.
+    :param extraction: The algorithm to find the dominant colors.
     :return: A list of the dominant colors in the image.
     """
     # convert image to array, only if mask = 255
@@ -53,8 +59,80 @@ def get_dominant_colors_from_image(image: ndarray, mask: ndarray=None, n_colors=
     if len(pixels) == 0:
         raise ValueError("No valid Pixels available to find dominant colors.")
 
-    # K-Means-Clustering - use additional of n_colors to account for color anti aliasing, we choose the top 2
-    kmeans = KMeans(n_clusters=n_colors+1, random_state=0)
+    # use additional of n_colors to account for color anti aliasing, we choose the top 2
+    if extraction == ColorExtraction.KMEANS:
+        return dominant_colors_kmeans(pixels, n_colors + 1)
+    return dominant_colors_histogram(pixels, n_colors + 1)
+
+def dominant_colors_histogram(pixels: ndarray, n_clusters: int, bits: int = 5, iterations: int = 3,
+                              min_seed_distance: float = 32.0) -> list[tuple[int, int, int]]:
+    """
+    Find the dominant colors of pixels with a quantized color histogram.
+    The pixels are quantized to `bits` per channel and counted with np.bincount,
+    the most frequent bins (with a minimum distance to each other, closer bins if there are not enough)
+    are the start colors of the clusters.
+    The clusters are refined with a few weighted-mean iterations over all histogram bins
+    (like K-Means, but on the bins instead of every pixel).
+
+    :param pixels: The pixels as array with shape (N, 3).
+    :param n_clusters: The number of colors to find.
+    :param bits: Bits per channel for the quantization.
+    :param iterations: Number of refinement iterations.
+    :param min_seed_distance: Minimum distance (RGB) between the start colors of the clusters.
+    :return: The dominant colors sorted by frequency (fewer if the pixels have fewer colors).
+    """
+    quantized = (pixels >> (8 - bits)).astype(np.intp)
+    bins = (quantized[:, 0] << (2 * bits)) | (quantized[:, 1] << bits) | quantized[:, 2]
+    size = 1 << (3 * bits)
+
+    # count and mean color per histogram bin, only bins with pixels are used
+    counts = np.bincount(bins, minlength=size)
+    used = np.flatnonzero(counts)
+    weights = counts[used].astype(float)
+    bin_colors = np.column_stack([np.bincount(bins, weights=pixels[:, channel], minlength=size)[used]
+                                  for channel in range(3)]) / weights[:, None]
+
+    # most frequent bins as start colors, skip bins close to a color already chosen (anti aliasing shades)
+    order = np.argsort(-weights, kind="stable")
+    seeds = []
+    for index in order:
+        if all(np.linalg.norm(bin_colors[index] - bin_colors[seed]) >= min_seed_distance for seed in seeds):
+            seeds.append(index)
+            if len(seeds) == n_clusters:
+                break
+    # low contrast colors are closer than the seed distance, fill up with the next most frequent bins
+    for index in order:
+        if len(seeds) == n_clusters:
+            break
+        if index not in seeds:
+            seeds.append(index)
+    centers = bin_colors[seeds]
+
+    # weighted-mean refinement, every bin belongs to the nearest center
+    for _ in range(iterations):
+        labels = np.argmin(((bin_colors[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+        cluster_weights = np.bincount(labels, weights=weights, minlength=len(centers))
+        filled = cluster_weights > 0
+        for channel in range(3):
+            sums = np.bincount(labels, weights=weights * bin_colors[:, channel], minlength=len(centers))
+            centers[filled, channel] = sums[filled] / cluster_weights[filled]
+
+    labels = np.argmin(((bin_colors[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+    cluster_weights = np.bincount(labels, weights=weights, minlength=len(centers))
+    order = np.argsort(-cluster_weights, kind="stable")
+    return [tuple(int(value) for value in np.rint(centers[index])) for index in order if cluster_weights[index] > 0]
+
+def dominant_colors_kmeans(pixels: ndarray, n_clusters: int) -> list[tuple[int, int, int]]:
+    """
+    Find the dominant colors of pixels with K-Means clustering (scikit-learn, loaded on first use).
+
+    :param pixels: The pixels as array with shape (N, 3).
+    :param n_clusters: The number of colors to find.
+    :return: The dominant colors sorted by frequency.
+    """
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(n_clusters=n_clusters, random_state=0)
     kmeans.fit(pixels)
     dominant_colors = kmeans.cluster_centers_.astype(int)
 
@@ -66,30 +144,30 @@ def get_dominant_colors_from_image(image: ndarray, mask: ndarray=None, n_colors=
 
     return [tuple(color) for color in dominant_colors]
 
-def apply_antialias(image_path: Path) -> tuple[ndarray, None]:
+def apply_antialias(image: ndarray, debug_path: Path | None = None) -> tuple[ndarray, None]:
     """
-    Apply anti-aliasing to an image_path.
+    Apply anti-aliasing to an image.
     This function uses OpenCV to apply anti-aliasing to an image.
 
-    :param image_path: The path to the image file.
+    :param image: The image (BGR, like OpenCV decodes it).
+    :param debug_path: Base path to save the intermediate image for debugging (None to skip).
     :return: The processed image and the mask, mask is always None.
     """
-    img = cv2.imread(image_path.as_posix())
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  # Convert BGR to RGB
+    img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)  # Convert BGR to RGB
 
     # Apply edge-preserving smoothing (bilateral filter)
     # Reduces anti-aliasing while preserving edges
     smoothed_img = cv2.bilateralFilter(img_rgb, d=15, sigmaColor=75, sigmaSpace=75)
 
-    if logger.isEnabledFor(logging.DEBUG):
-        Image.fromarray(smoothed_img).save(f"{image_path}.antialias.png")
+    if debug_path is not None:
+        Image.fromarray(smoothed_img).save(f"{debug_path}.antialias.png")
 
     return smoothed_img, None
 
-def apply_canny_edge_detection(image_path: Path, low_threshold: int = 50,
-                               high_threshold: int = 150, blur_size: int = 5) -> tuple[ndarray, ndarray]:
+def apply_canny_edge_detection(image: ndarray, low_threshold: int = 50, high_threshold: int = 150,
+                               blur_size: int = 5, debug_path: Path | None = None) -> tuple[ndarray, ndarray]:
     """
-    Apply Canny edge detection to an image_path.
+    Apply Canny edge detection to an image.
     This function uses the Canny edge detection algorithm to find the edges in an image.
     The function first applies a Gaussian blur to the image to reduce noise, and then
     applies the Canny edge detection algorithm to find the edges.
@@ -98,16 +176,15 @@ def apply_canny_edge_detection(image_path: Path, low_threshold: int = 50,
     The function also inverts the mask so that the non-edges are set to 255 and the edges are set to 0.
     The function also saves the processed image with edges and non-edges for debugging purposes.
 
-    :param image_path: the path to the image file.
+    :param image: the image (BGR, like OpenCV decodes it).
     :param low_threshold: low threshold for Canny edge detection.
     :param high_threshold: high threshold for Canny edge detection.
     :param blur_size: size of the Gaussian blur kernel.
+    :param debug_path: base path to save the intermediate images for debugging (None to skip).
     :return: the processed image and the mask.
     """
-    # load image (BGR-Format)
-    img = cv2.imread(image_path.as_posix())
     # convert to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     # Gauss Blur to reduce noise
     blurred = cv2.GaussianBlur(gray, (blur_size, blur_size), 0)
     # Canny-Edge detection
@@ -116,66 +193,153 @@ def apply_canny_edge_detection(image_path: Path, low_threshold: int = 50,
     non_edges_mask = cv2.bitwise_not(edges)
 
     # original image in RGB format
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
     # save intermediate images for debugging
-    if logger.isEnabledFor(logging.DEBUG):
-        cv2.imwrite(f"{image_path}.edges.png", edges)
-        cv2.imwrite(f"{image_path}.edges_invert.png", non_edges_mask)
+    if debug_path is not None:
+        cv2.imwrite(f"{debug_path}.edges.png", edges)
+        cv2.imwrite(f"{debug_path}.edges_invert.png", non_edges_mask)
         result = np.zeros_like(img_rgb)
         result[non_edges_mask == 255] = img_rgb[non_edges_mask == 255]
-        Image.fromarray(result).save(f"{image_path}.non_edges_image.png")
+        Image.fromarray(result).save(f"{debug_path}.non_edges_image.png")
 
     return img_rgb, non_edges_mask
 
-def check_contrast(driver: WebDriver, config: ProcessingConfig, index: int, element: WebElement, image_path: Path, results: list[dict],
-                   element_path: str = None, low_threshold=50, high_threshold=150) -> bool:
+def extract_image_colors(image: ndarray | bytes, extraction: ColorExtraction = ColorExtraction.HISTOGRAM,
+                         use_canny_edge_detection: bool = False, use_antialias: bool = False,
+                         low_threshold: int = 50, high_threshold: int = 150,
+                         debug_path: Path | None = None) -> list[tuple[int, int, int]]:
+    """
+    Extract the dominant colors of an element image (color source image).
+    The image is processed in memory, this function also runs in the image process pool (see get_image_pool),
+    it only gets the extraction parameters (not the whole config) to keep the pickled tasks small.
+
+    :param image: The element image (BGR array) or the PNG bytes of it.
+    :param extraction: The algorithm to find the dominant colors.
+    :param use_canny_edge_detection: Only use the non-edge areas of the image.
+    :param use_antialias: Apply anti-aliasing before the extraction.
+    :param low_threshold: threshold for Canny-edge detection
+    :param high_threshold: threshold for Canny-edge detection
+    :param debug_path: base path to save intermediate images for debugging (None to skip).
+    :return: The dominant colors sorted by frequency.
+    """
+    if isinstance(image, bytes):
+        image = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if use_canny_edge_detection:
+        processed_image, mask = apply_canny_edge_detection(image, low_threshold, high_threshold, debug_path=debug_path)
+    elif use_antialias:
+        processed_image, mask = apply_antialias(image, debug_path=debug_path)
+    else:
+        processed_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        mask = None
+    return get_dominant_colors_from_image(processed_image, mask, n_colors=2, extraction=extraction)
+
+# process pool for the image color extraction, created on first use and kept for all pages
+_image_pool: ProcessPoolExecutor | None = None
+
+def get_image_pool(config: ProcessingConfig) -> ProcessPoolExecutor | None:
+    """
+    Get the process pool to extract image colors in parallel to the browser work.
+    The number of processes is set via config (0 = CPU cores shared by the workers), 1 disables the pool.
+
+    :param config: configuration for the contrast checks
+    :return: The process pool or None if the colors are extracted in the current process.
+    """
+    global _image_pool
+    processes = config.image_processes or max(1, (os.cpu_count() or 1) // max(1, config.workers))
+    if processes <= 1:
+        return None
+    if _image_pool is None:
+        logger.debug(f"Starting {processes} processes for image color extraction")
+        _image_pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+    return _image_pool
+
+def shutdown_image_pool() -> None:
+    """
+    Shut down the image process pool (if started), called at the end of the browser session.
+    """
+    global _image_pool
+    if _image_pool is not None:
+        _image_pool.shutdown()
+        _image_pool = None
+
+def image_debug_path(image_path: Path) -> Path | None:
+    """
+    Base path for the intermediate images of the image processing, only in debug mode.
+    """
+    return image_path if logger.isEnabledFor(logging.DEBUG) else None
+
+def check_contrast(driver: WebDriver, config: ProcessingConfig, index: int, element_snapshot: dict, image_path: Path,
+                   results: list[dict], low_threshold=50, high_threshold=150,
+                   page_screenshot: PageScreenshot | None = None) -> bool:
     """
     Check the contrast ratio of the element.
-    This function uses Canny edge detection to find the edges in the image and then
-    applies K-Means clustering to find the most common colors in the non-edge areas of the image.
+    The colors are taken from the element (CSS) or extracted from the element image,
+    the image can be processed with Canny edge detection to only use the non-edge areas of it.
+    The most common colors are found with a color histogram or K-Means clustering.
     The function then calculates the contrast ratio between the two most common colors
-    and checks if it meets the WCAG requirements.
-    The function also logs the result and appends it to the results list.
+    and checks if it meets the WCAG requirements (see evaluate_contrast).
 
     :param driver: The Selenium WebDriver instance.
     :param config: configuration for the contrast checks
     :param index: current index of the element
-    :param element: The WebElement to check.
+    :param element_snapshot: The element snapshot to check (see get_element_snapshots).
     :param image_path: The path to the screenshot image.
     :param results: The list to store results.
-    :param element_path: The XPath of the element.
     :param low_threshold: threshold for Canny-edge detection
     :param high_threshold: threshold for Canny-edge detection
+    :param page_screenshot: capture of the current page, the element screenshot is cropped from it
     :return: True if the contrast ratio meets the threshold, False otherwise.
     """
-
-    target_ratio = config.contrast_threshold
-    invalid_only = config.report_level == ReportLevel.INVALID
-    logger.debug(f"[Element {index}] Check contrast ratio for element path: {element_path}")
+    logger.debug(f"[Element {index}] Check contrast ratio for element path: {element_snapshot['path']}")
 
     # extract dominant colors
+    image = None
     if config.color_source == ColorSource.IMAGE:
-        take_element_screenshot(driver, element, index, image_path)
-        logger.debug(f"[Element {index}] Extracting colors from image: {image_path}")
-        if config.use_canny_edge_detection:
-            processed_image, mask = apply_canny_edge_detection(image_path, low_threshold, high_threshold)
-        elif config.use_antialias:
-            processed_image, mask = apply_antialias(image_path)
-        else:
-            processed_image = cv2.cvtColor(cv2.imread(image_path.as_posix()), cv2.COLOR_BGR2RGB)
-            mask = None
-        colors = get_dominant_colors_from_image(processed_image, mask, n_colors=2)
+        image = get_element_image(page_screenshot, element_snapshot, element_snapshot["element"])
+        logger.debug(f"[Element {index}] Extracting colors from image")
+        colors = extract_image_colors(image, config.color_extraction, config.use_canny_edge_detection,
+                                      config.use_antialias, low_threshold, high_threshold,
+                                      debug_path=image_debug_path(image_path))
     else:
         logger.debug(f"[Element {index}] Extracting colors from element")
-        colors = get_dominant_colors_from_element(driver, element)
+        colors = get_dominant_colors_from_element(element_snapshot)
+
+    return evaluate_contrast(config, index, element_snapshot, image_path, results, colors,
+                             image=image, page_screenshot=page_screenshot)
+
+def evaluate_contrast(config: ProcessingConfig, index: int, element_snapshot: dict, image_path: Path,
+                      results: list[dict], colors: list[tuple[int, int, int]], image: ndarray | bytes | None = None,
+                      page_screenshot: PageScreenshot | None = None) -> bool:
+    """
+    Evaluate the contrast ratio of the extracted element colors.
+    The result is appended to the results list, suggestions are added if the contrast is too low.
+    The element screenshot is only written if the result is part of the report.
+
+    :param config: configuration for the contrast checks
+    :param index: current index of the element
+    :param element_snapshot: The element snapshot to check (see get_element_snapshots).
+    :param image_path: The path to the screenshot image.
+    :param results: The list to store results.
+    :param colors: The extracted colors (foreground and background).
+    :param image: The element image the colors are extracted from (color source image).
+    :param page_screenshot: capture of the current page, the element screenshot is cropped from it
+    :return: True if the contrast ratio meets the threshold, False otherwise.
+    """
+    target_ratio = config.contrast_threshold
+    invalid_only = config.report_level == ReportLevel.INVALID
+    element = element_snapshot["element"]
+    element_path = element_snapshot["path"]
+    element_text = element_snapshot["text"]
 
     if len(colors) < 2:
         logger.info(f"[Element {index}] Not enough colors to determine contrast ratio.")
+        if image is not None:
+            image_path = store_image(image, image_path)
         results.append({
             "element_index": index,
             "element_path": element_path,
-            "element_text": element.text,
+            "element_text": element_text,
             "screenshot": image_path.as_posix(),
             "error": "Not enough colors to determine contrast ratio."
         })
@@ -192,16 +356,21 @@ def check_contrast(driver: WebDriver, config: ProcessingConfig, index: int, elem
     result = {
         "element_index": index,
         "element_path": element_path,
-        "element_text": element.text,
+        "element_text": element_text,
         "screenshot": image_path.as_posix(),
         "colors": [rgb_to_hex(color) for color in colors],
         "contrast_ratio": ratio,
         "meets_wcag": meet_wcag
     }
 
-    # take screenshot of element if needed
-    if config.color_source == ColorSource.ELEMENT and (not invalid_only or not meet_wcag):
-        take_element_screenshot(driver, element, index, image_path)
+    # write screenshot of element if needed for the report
+    if not invalid_only or not meet_wcag:
+        if image is not None:
+            image_path = store_image(image, image_path)
+            logger.debug(f"[Element {index}] Screenshot saved to: {image_path}")
+        else:
+            image_path = save_element_screenshot(page_screenshot, element_snapshot, element, index, image_path)
+        result["screenshot"] = image_path.as_posix()
 
     if not meet_wcag:
         suggest_wcag_colors(config, result, color1, color2)
@@ -214,4 +383,3 @@ def check_contrast(driver: WebDriver, config: ProcessingConfig, index: int, elem
     else:
         logger.warning(f"[Element {index}] Image {image_path}; Contrast Ratio: {ratio:.2f} - The contrast ratio is too low. {color_log_message}")
         return False
-
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from src.config import ImageFormat, ScreenshotStore
+from src.logger_setup import logger
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+# WebP can not encode images with a side longer than this
+WEBP_MAX_DIMENSION = 16383
+IMAGE_SUFFIXES = {
+    ImageFormat.PNG: ".png",
+    ImageFormat.WEBP: ".webp",
+    ImageFormat.JPEG: ".jpg",
+}
+
+BLOB_FOLDER = "blobs"
+
+image_format: ImageFormat = ImageFormat.PNG
+image_quality: int = 85
+full_page_max_dimension: int = 0
+
+# element screenshots are stored once per content hash, shared elements (header, menu) of many pages as one file
+screenshot_store: ScreenshotStore = ScreenshotStore.HASHED
+blob_folder: Path | None = None
+_stored_blobs: set[Path] = set()
+_duplicate_count = 0
+
+# images are encoded and written in background threads, the number of pending images is bounded
+_max_pending = 32
+_executor: ThreadPoolExecutor | None = None
+_slots = threading.BoundedSemaphore(_max_pending)
+_pending: set[Future] = set()
+_pending_lock = threading.Lock()
+
+
+def configure_image_writer(screenshot_format: ImageFormat, quality: int, max_dimension: int) -> None:
+    """
+    Set the format and size of the written screenshots.
+
+    :param screenshot_format: Image format of the screenshots.
+    :param quality: Quality (1-100) for webp and jpeg.
+    :param max_dimension: Maximum length of the longer side of full-page screenshots (0 for no limit).
+    """
+    global image_format, image_quality, full_page_max_dimension
+    image_format = ImageFormat(screenshot_format)
+    image_quality = quality
+    full_page_max_dimension = max_dimension
+
+
+def configure_screenshot_store(store: ScreenshotStore, folder: Path | None = None) -> None:
+    """
+    Set how element screenshots are stored (see store_image).
+
+    :param store: Store the images under their content hash or as one file per element.
+    :param folder: Folder of the hashed images, defaults to a 'blobs' sub folder next to the element screenshot path.
+    """
+    global screenshot_store, blob_folder, _duplicate_count
+    screenshot_store = ScreenshotStore(store)
+    blob_folder = Path(folder) if folder else None
+    _stored_blobs.clear()
+    _duplicate_count = 0
+
+
+def image_suffix() -> str:
+    """
+    File suffix of the configured screenshot format (e.g. ".png").
+    """
+    return IMAGE_SUFFIXES[image_format]
+
+
+def content_hash(image: "ndarray | bytes") -> str:
+    """
+    Hash of the image content, for arrays the pixels and the shape are hashed.
+
+    :param image: The image as BGR array or PNG bytes.
+    :return: The hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(image, bytes):
+        digest.update(image)
+    else:
+        import numpy as np
+
+        digest.update(str(image.shape).encode())
+        digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+def store_image(image: "ndarray | bytes", path: Path) -> Path:
+    """
+    Store an element screenshot (see write_image).
+    With the hashed store the image is written once under its content hash, sharded by the first two hex digits
+    (e.g. 'screenshots/blobs/3f/3f2a....png'). Images already stored (by this run or a worker) are not written again.
+
+    :param image: The image as BGR array or PNG bytes.
+    :param path: Path of the element screenshot, used as is for the 'files' store.
+    :return: The path the image is stored at, to be referenced by the results.
+    """
+    global _duplicate_count
+    path = Path(path)
+    if screenshot_store != ScreenshotStore.HASHED:
+        write_image(image, path)
+        return path
+
+    key = content_hash(image)
+    blob_path = (blob_folder or path.parent / BLOB_FOLDER) / key[:2] / f"{key}{path.suffix}"
+    if blob_path in _stored_blobs:
+        _duplicate_count += 1
+        return blob_path
+    _stored_blobs.add(blob_path)
+    write_image(image, blob_path, keep_existing=True)
+    return blob_path
+
+
+def stored_image_counts() -> tuple[int, int]:
+    """
+    Number of distinct images stored and of duplicates skipped by the hashed store (see store_image).
+    """
+    return len(_stored_blobs), _duplicate_count
+
+
+def write_image(image: "ndarray | bytes", path: Path, full_page: bool = False, keep_existing: bool = False) -> None:
+    """
+    Encode and write an image in a background thread, the format is taken from the file suffix.
+    Blocks only if too many images are pending, call flush_images to wait until all are written.
+
+    :param image: The image as BGR array or PNG bytes (browser capture).
+    :param path: Path where the image will be written.
+    :param full_page: Full-page screenshot, downscaled to the configured maximum dimension.
+    :param keep_existing: Do not write the image if the file already exists (content addressed path).
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image_writer")
+    max_dimension = full_page_max_dimension if full_page else 0
+    _slots.acquire()
+    future = _executor.submit(_encode_and_write, image, Path(path), max_dimension, image_quality,
+                              keep_existing)
+    with _pending_lock:
+        _pending.add(future)
+    future.add_done_callback(_written)
+
+
+def flush_images() -> None:
+    """
+    Wait until all pending images are written.
+    """
+    with _pending_lock:
+        pending = list(_pending)
+    if pending:
+        logger.debug(f"Waiting for {len(pending)} images to be written")
+        wait(pending)
+
+
+def _written(future: Future) -> None:
+    with _pending_lock:
+        _pending.discard(future)
+    _slots.release()
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Failed to write image: {error}")
+
+
+def _write_file(path: Path, data: bytes, keep_existing: bool) -> None:
+    if keep_existing:
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write and rename, a worker storing the same image at the same time never sees a partial file
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+    else:
+        path.write_bytes(data)
+
+
+def _encode_and_write(image: "ndarray | bytes", path: Path, max_dimension: int, quality: int,
+                      keep_existing: bool = False) -> None:
+    import cv2
+    import numpy as np
+
+    if keep_existing and path.exists():
+        return
+    suffix = path.suffix.lower()
+    if isinstance(image, bytes):
+        if suffix == ".png" and not max_dimension:
+            # browser capture is already PNG, no re-encoding needed
+            _write_file(path, image, keep_existing)
+            return
+        image = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    if suffix == ".webp":
+        max_dimension = min(max_dimension or WEBP_MAX_DIMENSION, WEBP_MAX_DIMENSION)
+    height, width = image.shape[:2]
+    if max_dimension and max(height, width) > max_dimension:
+        scale = max_dimension / max(height, width)
+        image = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+
+    if suffix == ".webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+    elif suffix in (".jpg", ".jpeg"):
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+    else:
+        params = [cv2.IMWRITE_PNG_COMPRESSION, 6]
+    success, data = cv2.imencode(suffix, image, params)
+    if not success:
+        raise ValueError(f"Could not encode image {path}")
+    _write_file(path, data.tobytes(), keep_existing)
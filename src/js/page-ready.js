@@ -0,0 +1,155 @@
+const PageReady = (() => {
+
+    // requests (fetch / XHR) started and not finished yet
+    let inflight = 0;
+    // last time a request finished or the DOM changed
+    let lastActivity = performance.now();
+    const waiters = new Set();
+
+    const notify = () => waiters.forEach((check) => check());
+    const touch = () => {
+        lastActivity = performance.now();
+        notify();
+    };
+    const requestStarted = () => {
+        inflight++;
+        lastActivity = performance.now();
+    };
+    const requestEnded = () => {
+        inflight = Math.max(0, inflight - 1);
+        touch();
+    };
+
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function (...args) {
+            requestStarted();
+            let result;
+            try {
+                result = originalFetch.apply(this, args);
+            } catch (error) {
+                requestEnded();
+                throw error;
+            }
+            result.then(requestEnded, requestEnded);
+            return result;
+        };
+    }
+
+    if (window.XMLHttpRequest) {
+        const originalSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function (...args) {
+            requestStarted();
+            this.addEventListener('loadend', requestEnded, { once: true });
+            try {
+                return originalSend.apply(this, args);
+            } catch (error) {
+                this.removeEventListener('loadend', requestEnded);
+                requestEnded();
+                throw error;
+            }
+        };
+    }
+
+    // resources of the page (images, styles, scripts) count as activity when they are finished
+    if (window.PerformanceObserver) {
+        new PerformanceObserver(touch).observe({ type: 'resource', buffered: false });
+    }
+    new MutationObserver(touch).observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+
+    /**
+     * Waits until the page is ready: document loaded, no request in flight and no DOM change for the idle time.
+     * With a selector the page is ready as soon as the document is loaded, no request is in flight
+     * and an element matches the selector.
+     * The state is checked on page events (readystatechange, finished requests, DOM changes), not polled.
+     * @param {number} idleMs - Time without requests and DOM changes
+     * @param {number} timeoutMs - Maximum time to wait
+     * @param {string|null} selector - CSS selector of an element to wait for instead of the idle time
+     * @returns {Promise<{ready: boolean, reason: string, waited_ms: number, inflight: number}>}
+     */
+    const waitReady = (idleMs, timeoutMs, selector = null) => new Promise((resolve) => {
+        const start = performance.now();
+        let timer = null;
+        let reason = 'loading';
+        let deadline = null;
+
+        const finish = (ready) => {
+            clearTimeout(timer);
+            clearTimeout(deadline);
+            waiters.delete(check);
+            document.removeEventListener('readystatechange', check);
+            resolve({ ready: ready, reason: ready ? 'ready' : reason, waited_ms: Math.round(performance.now() - start), inflight: inflight });
+        };
+        const check = () => {
+            clearTimeout(timer);
+            if (document.readyState !== 'complete') {
+                reason = 'loading';
+                return;
+            }
+            if (inflight > 0) {
+                reason = 'network';
+                return;
+            }
+            if (selector) {
+                reason = 'selector';
+                if (document.querySelector(selector)) finish(true);
+                return;
+            }
+            reason = 'busy';
+            const quiet = performance.now() - lastActivity;
+            if (quiet >= idleMs) {
+                finish(true);
+            } else {
+                timer = setTimeout(check, idleMs - quiet);
+            }
+        };
+
+        deadline = setTimeout(() => finish(false), timeoutMs);
+        waiters.add(check);
+        document.addEventListener('readystatechange', check);
+        check();
+    });
+
+    /**
+     * Waits until an element matches the selector (present) or no element matches anymore (absent).
+     * Resolves on the DOM change that satisfies the condition.
+     * @param {string} selector - CSS selector of the element
+     * @param {boolean} present - Wait for the element to be present (true) or absent (false)
+     * @param {number} timeoutMs - Maximum time to wait
+     * @returns {Promise<{ready: boolean, reason: string, waited_ms: number}>}
+     */
+    const waitForSelector = (selector, present = true, timeoutMs = 10000) => new Promise((resolve, reject) => {
+        const start = performance.now();
+        const matches = () => !!document.querySelector(selector) === present;
+        const result = (ready) => ({ ready: ready, reason: ready ? 'ready' : 'selector', waited_ms: Math.round(performance.now() - start) });
+        try {
+            if (matches()) {
+                resolve(result(true));
+                return;
+            }
+        } catch (error) {
+            reject(error);
+            return;
+        }
+
+        let deadline = null;
+        const observer = new MutationObserver(() => {
+            if (matches()) finish(true);
+        });
+        const finish = (ready) => {
+            observer.disconnect();
+            clearTimeout(deadline);
+            resolve(result(ready));
+        };
+        observer.observe(document, { childList: true, subtree: true, attributes: true });
+        deadline = setTimeout(() => finish(matches()), timeoutMs);
+    });
+
+    return {
+        waitReady: waitReady,
+        waitForSelector: waitForSelector,
+        inflight: () => inflight
+    };
+})();
+
+window.PageReady = PageReady;
@@ -121,18 +121,61 @@ const TabPath = (() => {
     });
 
     /**
-     * Checks if an element or its parents are hidden.
-     * @param {HTMLElement} element
-     * @returns {boolean}
+     * Collects elements with a pointer cursor that are not covered by the found elements.
+     * One top-down pass over the DOM, the "inside found element" and "hidden by ancestor" state
+     * is passed down to the children and the computed style of each element is read at most once.
+     * An element is collected if it is visible, none of its ancestors is found or hidden
+     * and none of its children is found or has a pointer cursor itself.
+     * @param {Set<Element>} elementsFound - Elements already found (tabbed and interactive elements)
+     * @returns {Element[]} The collected elements in document order
      */
-    const isElementHiddenByParents = (element) => {
-        let parent = element.parentElement;
-        while (parent && parent !== document.body) {
-            const style = window.getComputedStyle(parent);
-            if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') return true;
-            parent = parent.parentElement;
+    const collectCursorElements = (elementsFound) => {
+        const candidates = [];
+        const enter = (element, parent) => {
+            let style = null;
+            const getStyle = () => style ??= window.getComputedStyle(element);
+            const insideFound = parent ? parent.childrenInsideFound : false;
+            const hidden = parent ? parent.childrenHidden : false;
+            const found = elementsFound.has(element);
+
+            if (parent?.candidate && !parent.candidate.relevantChild && (found || getStyle().cursor === 'pointer')) {
+                parent.candidate.relevantChild = true;
+            }
+
+            const frame = { candidate: null, childrenInsideFound: insideFound || found, childrenHidden: hidden };
+            if (!frame.childrenInsideFound && !hidden) {
+                const { cursor, display, visibility, opacity } = getStyle();
+                if (cursor === 'pointer' && display !== 'none' && visibility !== 'hidden') {
+                    frame.candidate = { element: element, relevantChild: false };
+                    candidates.push(frame.candidate);
+                }
+                // the body and its ancestors do not hide the page content
+                const pageRoot = element === document.body || element.contains(document.body);
+                frame.childrenHidden = !pageRoot && (display === 'none' || visibility === 'hidden' || opacity === '0');
+            }
+            // children are needed for the descendants or to check the children of a candidate
+            frame.visitChildren = !!frame.candidate || (!frame.childrenInsideFound && !frame.childrenHidden);
+            return frame;
+        };
+
+        const walker = document.createTreeWalker(document.documentElement, NodeFilter.SHOW_ELEMENT);
+        const stack = [];
+        let frame = enter(walker.currentNode, null);
+        while (true) {
+            if (frame.visitChildren && walker.firstChild()) {
+                stack.push(frame);
+                frame = enter(walker.currentNode, frame);
+                continue;
+            }
+            while (!walker.nextSibling()) {
+                if (!stack.length) {
+                    return candidates.filter((candidate) => !candidate.relevantChild).map((candidate) => candidate.element);
+                }
+                walker.parentNode();
+                stack.pop();
+            }
+            frame = enter(walker.currentNode, stack[stack.length - 1]);
         }
-        return false;
     };
 
     /**
@@ -146,28 +189,7 @@ const TabPath = (() => {
         const tabbedElements = await getTabOrder();
         const clickableElements = Array.from(document.querySelectorAll(INTERACTIVE_SELECTOR));
         const elementsFound = new Set([...tabbedElements, ...clickableElements]);
-
-        const cursorElements = Array.from(document.querySelectorAll('*')).filter(el => {
-          if (elementsFound.has(el)) return false;
-
-          let parent = el.parentElement;
-          while (parent) {
-            if (elementsFound.has(parent)) return false;
-            parent = parent.parentElement;
-          }
-
-          const style = window.getComputedStyle(el);
-          if (style.cursor === 'pointer' && style.display !== 'none' && style.visibility !== 'hidden') {
-            const isHiddenByParent = isElementHiddenByParents(el);
-            if (isHiddenByParent) return false;
-
-            const children = Array.from(el.children || []);
-            const hasRelevantChild = children.some(child =>
-                elementsFound.has(child) || window.getComputedStyle(child).cursor === 'pointer');
-            return !hasRelevantChild;
-          }
-          return false;
-        });
+        const cursorElements = collectCursorElements(elementsFound);
 
         return Array.from(new Set([...tabbedElements, ...clickableElements, ...cursorElements])).map((el, index) => buildElementInfo(el, index));
     };
@@ -398,8 +420,10 @@ const TabPath = (() => {
         console.debug('Tab path Runner started');
         const tabElements = elements ? elements : (await getTabOrder()).map((el, index) => buildElementInfo(el, index));
         const potentialElements = elements ? await buildPotentialElements(missing_check) : tabElements;
+        const tabbedIds = new Set(tabElements.map((te) => te.id));
+        const ignoredIds = new Set(missing_ignores);
         const missedElements = potentialElements
-            .filter((pe) => !tabElements.some(te => te.id === pe.id) && !missing_ignores.includes(pe.id))
+            .filter((pe) => !tabbedIds.has(pe.id) && !ignoredIds.has(pe.id))
             .map((el, index) => ({ ...el, index: (index+1) }));
         console.debug("Tab path Runner found", tabElements.length, "tabbed elements and", potentialElements.length, "potential elements");
 
@@ -434,6 +458,15 @@ const TabPath = (() => {
      * @returns {Object} Object containing element and its metadata
      */
     const getRealActiveElement = () => {
+        const element = getRealActiveNode();
+        return element ? buildElementInfo(element) : null;
+    };
+
+    /**
+     * Gets the focused node, including elements in shadow DOM.
+     * @returns {HTMLElement|null} The focused element or null if nothing (or the body) is focused
+     */
+    const getRealActiveNode = () => {
         let element = document.activeElement;
 
         // Traverse through shadow DOM if present
@@ -444,14 +477,218 @@ const TabPath = (() => {
         if (!element || element === document.body) {
             return null;
         }
+        return element;
+    };
+
+    let predictedOrder = [];
+
+    /**
+     * Checks if an element is reached by sequential focus navigation (Tab key), visibility is checked separately.
+     * @param {HTMLElement} element
+     * @returns {boolean}
+     */
+    const isSequentiallyFocusable = (element) => {
+        if (element.tabIndex < 0 || element.disabled) return false;
+        return element.hasAttribute('tabindex') || element.matches(FOCUSABLE_SELECTOR);
+    };
 
-        return buildElementInfo(element);
+    /**
+     * Builds the sequential focus navigation order of a focus navigation scope.
+     * Shadow roots and slots are own scopes, placed at the position of their host.
+     * Inert and not rendered (display: none) subtrees are skipped.
+     * @param {Element[]} nodes - The top level elements of the scope
+     * @returns {HTMLElement[]}
+     */
+    const buildFocusScope = (nodes) => {
+        const items = [];
+        const visit = (element) => {
+            if (element.inert) return;
+            if (!element.checkVisibility() && window.getComputedStyle(element).display === 'none') return;
+            if (isSequentiallyFocusable(element) && element.checkVisibility({ visibilityProperty: true })) {
+                items.push({ tabIndex: Math.max(element.tabIndex, 0), elements: [element] });
+            }
+            if (element.shadowRoot) {
+                // explicit negative tabindex on the host removes its shadow tree from the order
+                const hostTabIndex = element.hasAttribute('tabindex') ? element.tabIndex : 0;
+                if (hostTabIndex >= 0) {
+                    items.push({ tabIndex: hostTabIndex, elements: buildFocusScope(Array.from(element.shadowRoot.children)) });
+                }
+            } else if (element instanceof HTMLSlotElement) {
+                const assigned = element.assignedElements({ flatten: true });
+                items.push({ tabIndex: 0, elements: buildFocusScope(assigned.length ? assigned : Array.from(element.children)) });
+            } else {
+                Array.from(element.children).forEach(visit);
+            }
+        };
+        nodes.forEach(visit);
+
+        // positive tabindex first (ascending, tree order for equal values), then tabindex 0 in tree order
+        const positive = items.filter((item) => item.tabIndex > 0).sort((a, b) => a.tabIndex - b.tabIndex);
+        return [...positive, ...items.filter((item) => item.tabIndex === 0)].flatMap((item) => item.elements);
+    };
+
+    /**
+     * Predicts the tab order of the page and selects the checkpoints to verify with real Tab keys.
+     * Checkpoints are the start of the page, every n-th element, the last element
+     * and the elements around a custom tabindex.
+     * @param {number} sampleStep - Distance between sampled checkpoints
+     * @returns {{elements: Array, checkpoints: number[]}}
+     */
+    const predictTabOrder = (sampleStep = 20) => {
+        predictedOrder = buildFocusScope([document.documentElement]);
+        const checkpoints = new Set([-1, predictedOrder.length - 1]);
+        predictedOrder.forEach((element, index) => {
+            if (index % sampleStep === 0) checkpoints.add(index);
+            if (element.hasAttribute('tabindex')) {
+                checkpoints.add(index - 1);
+                checkpoints.add(index);
+            }
+        });
+        return {
+            elements: predictedOrder.map((element) => buildElementInfo(element)),
+            checkpoints: Array.from(checkpoints).filter((index) => index < predictedOrder.length).sort((a, b) => a - b)
+        };
+    };
+
+    let tabVerification = null;
+
+    /**
+     * Compares the focused element after a Tab key with the prediction and focuses the next checkpoint,
+     * registered as keyup listener while verifying.
+     * @param {KeyboardEvent} event
+     */
+    const verifyTabStop = (event) => {
+        if (event.key !== 'Tab' || !tabVerification) return;
+        const { checkpoints, results } = tabVerification;
+        const index = checkpoints[results.length];
+        if (index === undefined) return;
+
+        const active = getRealActiveNode();
+        // after the last element the focus leaves the page or starts again with the first element
+        const expected = index + 1 < predictedOrder.length ? [predictedOrder[index + 1]] : [null, predictedOrder[0]];
+        results.push({ index: index, ok: expected.includes(active) });
+
+        const next = checkpoints[results.length];
+        if (next !== undefined) predictedOrder[next].focus();
+    };
+
+    /**
+     * Starts the verification of the predicted tab order, one Tab key per checkpoint is expected.
+     * @param {number[]} checkpoints - Indices of the predicted elements to verify the next element for (-1 for the page start)
+     */
+    const startTabVerification = (checkpoints) => {
+        stopTabVerification();
+        tabVerification = { checkpoints: checkpoints, results: [] };
+        if (checkpoints.length && checkpoints[0] >= 0) predictedOrder[checkpoints[0]].focus();
+        window.addEventListener('keyup', verifyTabStop, true);
+    };
+
+    /**
+     * Stops the verification and takes the results.
+     * Checkpoints without result (focus left the page) are verified only for the last element.
+     * @returns {{index: number, ok: boolean}[]}
+     */
+    const takeTabVerification = () => {
+        if (!tabVerification) throw new Error('Tab verification not started');
+        const { checkpoints, results } = tabVerification;
+        const missing = checkpoints.slice(results.length)
+            .map((index) => ({ index: index, ok: index === predictedOrder.length - 1 }));
+        stopTabVerification();
+        return [...results, ...missing];
+    };
+
+    const stopTabVerification = () => {
+        window.removeEventListener('keyup', verifyTabStop, true);
+        tabVerification = null;
+    };
+
+    let tabRecording = null;
+
+    /**
+     * Records the active element after each Tab key, registered as keyup listener while recording.
+     * The recording is done if no element is focused or an element is focused a second time (cycle).
+     * @param {KeyboardEvent} event
+     */
+    const recordTabStop = (event) => {
+        if (event.key !== 'Tab' || !tabRecording || tabRecording.done) return;
+        const element = getRealActiveNode();
+        if (!element) {
+            tabRecording.done = true;
+            return;
+        }
+        if (tabRecording.resync.has(element)) {
+            tabRecording.done = true;
+            tabRecording.resyncIndex = tabRecording.resync.get(element);
+            return;
+        }
+        const info = buildElementInfo(element);
+        const signature = tabStopSignature(info);
+        if (tabRecording.seen.has(signature)) {
+            tabRecording.done = true;
+            tabRecording.cycle = true;
+            return;
+        }
+        tabRecording.seen.add(signature);
+        tabRecording.buffer.push(info);
+    };
+
+    const tabStopSignature = (info) => `${info.id}|${info.location.x}|${info.location.y}`;
+
+    /**
+     * Starts recording the elements focused by Tab key presses.
+     * With a start index the recording starts at that predicted element (-1 for the page start)
+     * and is done when a later predicted element is focused again (resync with the prediction).
+     * @param {number|null} startIndex - Index of the predicted element to start from, null to record the whole page
+     */
+    const startTabRecording = (startIndex = null) => {
+        stopTabRecording();
+        tabRecording = { buffer: [], seen: new Set(), resync: new Map(), resyncIndex: null, done: false, cycle: false };
+        if (startIndex !== null) {
+            predictedOrder.forEach((element, index) => {
+                if (index > startIndex) {
+                    tabRecording.resync.set(element, index);
+                } else {
+                    tabRecording.seen.add(tabStopSignature(buildElementInfo(element)));
+                }
+            });
+            if (startIndex >= 0) {
+                predictedOrder[startIndex].focus();
+            } else {
+                document.activeElement?.blur();
+            }
+        }
+        window.addEventListener('keyup', recordTabStop, true);
+    };
+
+    /**
+     * Takes the elements recorded since the last call.
+     * @param {number} presses - Number of Tab keys sent since the last call
+     * @returns {{elements: Array, done: boolean, cycle: boolean, resync_index: (number|null)}}
+     */
+    const takeTabRecording = (presses = 0) => {
+        if (!tabRecording) throw new Error('Tab recording not started');
+        const elements = tabRecording.buffer.splice(0);
+        // focus left the page (no keyup received) or stays on the page body
+        if (!tabRecording.done && presses > 0 && (!elements.length || !getRealActiveNode())) {
+            tabRecording.done = true;
+        }
+        return { elements: elements, done: tabRecording.done, cycle: tabRecording.cycle, resync_index: tabRecording.resyncIndex };
+    };
+
+    /**
+     * Stops recording the elements focused by Tab key presses.
+     */
+    const stopTabRecording = () => {
+        window.removeEventListener('keyup', recordTabStop, true);
+        tabRecording = null;
     };
 
     /**
      * Cleans up the tabpath visualization.
      */
     const cleanTabpathVisualization = () => {
+        // script stays in the page (preloaded), do not keep paths of a changed DOM for the next run
+        idCache.clear();
         document.querySelectorAll('[data-tabpath="true"]').forEach((el) => el.remove());
         const cleanInRoot = (root) => {
             root.querySelectorAll('[data-tabpath-styled="true"]').forEach((el) => {
@@ -505,7 +742,13 @@ const TabPath = (() => {
             return exportTabpathAsSVG(svg || document.querySelector('svg[data-tabpath="true"]'));
         },
         cleanVisualization: cleanTabpathVisualization,
-        getRealActiveElement: getRealActiveElement
+        getRealActiveElement: getRealActiveElement,
+        startTabRecording: startTabRecording,
+        takeTabRecording: takeTabRecording,
+        stopTabRecording: stopTabRecording,
+        predictTabOrder: predictTabOrder,
+        startTabVerification: startTabVerification,
+        takeTabVerification: takeTabVerification
     };
 })();
 
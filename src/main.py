@@ -3,24 +3,26 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+if __name__ == "__main__" and ("--profile_startup" in sys.argv or "--profile-startup" in sys.argv):
+    from src.startup_profile import start_import_profile
+    start_import_profile()
+
 import logging
 import importlib
+import multiprocessing
 import pkgutil
 
-from rich.console import Console
-from rich.markdown import Markdown
-
 from src.logger_setup import logger
 from src.arg_parse import argument_parser
-from src.utils import get_embedded_file_path, filter_args_for_dataclass
 from src.config import Mode, ProcessingConfig
-from src.action_handler import print_action_documentation
-from src.actions.analyse_action import analyse_action
-from src.processing import check_run
-import src.actions
+
+# heavy dependencies (selenium, cv2, numpy, jinja2, ...) are imported on first use,
+# so --help, --readme and the actions listing start fast
 
 # dynamically load all actions from the actions module
 def load_all_actions():
+    import src.actions
+
     for _, module_name, _ in pkgutil.iter_modules(src.actions.__path__):
         importlib.import_module(f"src.actions.{module_name}")
 
@@ -31,6 +33,10 @@ def show_readme(file_path: str):
 
     :param file_path: Pfad zur README.md-Datei
     """
+    from rich.console import Console
+    from rich.markdown import Markdown
+    from src.utils import get_embedded_file_path
+
     console = Console(width=100)
     try:
         readme_path = get_embedded_file_path(file_path)
@@ -61,6 +67,7 @@ def main():
 
     load_all_actions()
     if args.mode == Mode.ACTIONS.value:
+        from src.action_handler import print_action_documentation
         print_action_documentation()
         sys.exit(0)
 
@@ -74,10 +81,14 @@ def main():
     args_dict["resolution"] = tuple(map(int, args_dict["resolution"].split("x")))
 
     if args.mode == Mode.CHECK:
+        from src.processing import check_run
+        from src.utils import filter_args_for_dataclass
+
         filtered_args = filter_args_for_dataclass(ProcessingConfig, args_dict)
         arg_config = ProcessingConfig(**filtered_args)
         check_run(arg_config)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import time
+from pathlib import Path
+
+from selenium.common.exceptions import InvalidSelectorException, JavascriptException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from src.logger_setup import logger
+from src.script_preload import ensure_script, register_preload_script
+
+# default budgets of the page readiness wait in seconds (see configure_page_wait)
+wait_timeout: float = 5
+wait_idle_time: float = 0.5
+# time spent waiting for page readiness since the last take_wait_time call
+_wait_time: float = 0.0
+_script_data: str | None = None
+
+
+def _page_ready_script() -> str:
+    global _script_data
+    if _script_data is None:
+        script_file = Path(__file__).parent / "js" / "page-ready.js"
+        logger.debug(f"Loading page ready script from {script_file}")
+        with script_file.open("r", encoding="utf-8") as f:
+            _script_data = f.read()
+    return _script_data
+
+
+def configure_page_wait(timeout: float, idle_time: float) -> None:
+    """
+    Set the default budgets of the page readiness wait.
+
+    :param timeout: Maximum time in seconds to wait for the page.
+    :param idle_time: Time in seconds without requests and DOM changes the page needs to be considered ready.
+    """
+    global wait_timeout, wait_idle_time
+    wait_timeout = timeout
+    wait_idle_time = idle_time
+
+
+def take_wait_time() -> float:
+    """
+    Get the time spent waiting for page readiness since the last call and reset it.
+
+    :return: The waiting time in seconds.
+    """
+    global _wait_time
+    waited, _wait_time = _wait_time, 0.0
+    return waited
+
+
+def _wait_in_page(driver: WebDriver, wait_call: str, timeout: float, *args) -> dict:
+    """
+    Run a wait function of the page ready script (see js/page-ready.js) in one async script call.
+    The script is preloaded, so requests of a new document are counted from its start.
+    If the document changes while waiting (navigation), the wait is continued in the new document.
+    The time spent is added to the waiting time (see take_wait_time).
+
+    :param driver: Selenium WebDriver instance.
+    :param wait_call: JavaScript call of the wait function, the remaining timeout in ms is `arguments[0]`,
+                      the args follow.
+    :param timeout: Maximum time in seconds to wait.
+    :param args: Arguments for the wait function.
+    :return: The state the wait function resolved with.
+    :raises TimeoutException: If the page does not answer within the timeout.
+    :raises InvalidSelectorException: If the wait function failed on an invalid selector.
+    """
+    global _wait_time
+    script = _page_ready_script()
+    register_preload_script(driver, "page_ready", script)
+    if timeout + 5 > 30:
+        # default script timeout of the browser session is 30 seconds
+        driver.set_script_timeout(timeout + 5)
+
+    # Language=JS
+    command = f"""
+        const callback = arguments[arguments.length - 1];
+        if (typeof PageReady !== 'object') {{
+            callback(null);
+            return;
+        }}
+        {wait_call}.then(callback, (error) => callback({{ error: error.message }}));
+    """
+    start = time.perf_counter()
+    try:
+        state = None
+        while state is None:
+            remaining = timeout - (time.perf_counter() - start)
+            if remaining <= 0:
+                raise TimeoutException("Page did not get ready in time")
+            try:
+                state = driver.execute_async_script(command, remaining * 1000, *args)
+            except JavascriptException as e:
+                # document changed while waiting (navigation), wait for the new document
+                logger.debug(f"Page changed while waiting: {e.msg}")
+                time.sleep(0.1)
+                continue
+            if state is None:
+                ensure_script(driver, "page_ready", script, "typeof PageReady === 'object'")
+    finally:
+        _wait_time += time.perf_counter() - start
+
+    if "error" in state:
+        raise InvalidSelectorException(state["error"])
+    return state
+
+
+def wait_page_loaded(driver: WebDriver, element_selector: str = None, timeout: float | None = None,
+                     idle_time: float | None = None) -> None:
+    """
+    Wait until the page is ready.
+    The page is ready if the document is loaded, no request (fetch/XHR) is in flight and the DOM
+    did not change for the idle time. If an element selector is given, the page is ready as soon as
+    an element matches instead of the idle time.
+
+    :param driver: Selenium WebDriver instance.
+    :param element_selector: CSS selector of an element to wait for.
+    :param timeout: Maximum time in seconds to wait (None for the configured default).
+    :param idle_time: Idle time in seconds (None for the configured default).
+    :raises TimeoutException: If the document is not loaded or the element is not present within the timeout.
+    """
+    timeout = wait_timeout if timeout is None else timeout
+    idle_time = wait_idle_time if idle_time is None else idle_time
+    state = _wait_in_page(driver, "PageReady.waitReady(arguments[1], arguments[0], arguments[2])", timeout,
+                          idle_time * 1000, element_selector)
+
+    logger.debug(f"Page readiness: {state['reason']} after {state['waited_ms']} ms ({state['inflight']} requests in flight)")
+    if not state["ready"] and state["reason"] in ("loading", "selector"):
+        raise TimeoutException(f"Page did not get ready in time ({state['reason']})")
+
+
+def wait_for_selector(driver: WebDriver, selector: str, present: bool = True, timeout: float | None = None) -> bool:
+    """
+    Wait until an element matches the CSS selector (or no element matches anymore).
+    The page resolves the wait on the DOM change that satisfies it (MutationObserver), there is no polling.
+
+    :param driver: Selenium WebDriver instance.
+    :param selector: CSS selector of the element.
+    :param present: Wait for the element to be present (True) or absent (False).
+    :param timeout: Maximum time in seconds to wait (None for the configured default).
+    :return: True if the condition is met, False if the timeout is reached.
+    :raises InvalidSelectorException: If the selector is invalid.
+    """
+    timeout = wait_timeout if timeout is None else timeout
+    try:
+        state = _wait_in_page(driver, "PageReady.waitForSelector(arguments[1], arguments[2], arguments[0])", timeout,
+                              selector, present)
+    except TimeoutException:
+        return False
+    logger.debug(f"Wait for selector '{selector}' ({'present' if present else 'absent'}): "
+                 f"{state['reason']} after {state['waited_ms']} ms")
+    return state["ready"]
+
+
+def find_element_when_present(driver: WebDriver, selector: str, timeout: float | None = None) -> WebElement:
+    """
+    Find an element by CSS selector, waiting until it is present (see wait_for_selector).
+
+    :param driver: Selenium WebDriver instance.
+    :param selector: CSS selector of the element.
+    :param timeout: Maximum time in seconds to wait (None for the configured default).
+    :return: The first element matching the selector.
+    :raises NoSuchElementException: If no element matches within the timeout.
+    """
+    wait_for_selector(driver, selector, timeout=timeout)
+    return driver.find_element(By.CSS_SELECTOR, selector)
@@ -1,6 +1,10 @@
 import json
+import logging
+import multiprocessing
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 
 import selenium.common
@@ -11,11 +15,15 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from src.action_handler import action_registry, pre_define_action_context, parse_param_to_string
 from src.actions.analyse_action import analyse_action
 from src.browser_console_log_handler import handle_browser_console_log, get_browser_console_log
-from src.config import Config, ProcessingConfig, ConfigEncoder, ReportLevel, Runner
+from src.config import Config, ProcessingConfig, ReportLevel, Runner, ColorSource, ImageFormat, \
+    ScreenshotStore
 from src.ignore_violations import populate_ignored_violation_from_file
 from src.input_parser import parse_inputs
+from src.image_writer import BLOB_FOLDER, configure_image_writer, configure_screenshot_store, flush_images, \
+    stored_image_counts
 from src.logger_setup import logger
-from src.report import build_markdown, generate_markdown_report, generate_html_report
+from src.page_ready import configure_page_wait
+from src.results_stream import GZIP_SUFFIX, RESULTS_SUFFIX, ResultsWriter, load_results, read_results, write_results_json
 from src.utils import call_url, get_full_base_url
 
 
@@ -42,8 +50,7 @@ def check_run(config: ProcessingConfig) -> None:
     if isinstance(config, ProcessingConfig):
         if config.simulate:
             logger.info(f"Simulating with file: {config.simulate}")
-            with open(config.simulate, "r") as f:
-                json_data = json.load(f)
+            json_data = load_results(config.simulate)
         else:
             actions = parse_inputs(config.inputs)
             actions_len = len(actions)
@@ -53,77 +60,313 @@ def check_run(config: ProcessingConfig) -> None:
             else:
                 logger.info(f"Found {actions_len} inputs to check.")
 
-            logger.info("Starting Selenium WebDriver")
-            if config.browser == "edge":
-                from selenium.webdriver.edge.options import Options
-                options = Options()
+            execution_time = time.strftime("%Y-%m-%d %H:%M:%S")
+            results_file = results_file_path(config)
+            run_start = time.perf_counter()
+            if config.workers > 1:
+                session_data = _run_workers(config, actions, execution_time, results_file)
             else:
-                from selenium.webdriver.chrome.options import Options
-                options = Options()
-            if not config.browser_visible:
-                options.add_argument("--headless")
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-            options.enable_bidi = True
-            if config.browser == "edge":
-                driver = selenium.webdriver.Edge(options=options)
-            else:
-                driver = selenium.webdriver.Chrome(options=options)
+                session_data = _run_session(config, actions, execution_time, results_file=results_file)
+            run_time = time.perf_counter() - run_start
 
-            logger.debug(f"Selenium WebDriver Initialized")
-            driver.script.add_console_message_handler(handle_browser_console_log)
-            try:
-                # first go to login url if defined
-                if config.login:
-                    logger.info(f"Perform Login with URL: {config.login}")
-                    call_url(driver, config.login)
-
-                base_url = get_full_base_url(driver)
-                logger.debug(f"Extracted Base URL: {base_url}")
-                execution_time = time.strftime("%Y-%m-%d %H:%M:%S")
-                pre_define_action_context(execution_time=execution_time, base_url=base_url,
-                                          screenshots_folder=screenshots_folder.as_posix())
-
-                actions_data = _execute_actions(config, driver, actions)
-
-                json_data.update({
-                    "timestamp": execution_time,
-                    "base_url": base_url,
-                    "total_inputs": len(actions_data),
-                    "inputs": actions_data,
-                    "browser_console_log": get_browser_console_log(),
-                })
+            if session_data is not None:
+                wait_time = session_data["wait_time"]
+                logger.info(f"Waited {wait_time:.2f}s for pages to get ready in {run_time:.2f}s run time"
+                            f" ({wait_time / run_time:.0%}{' summed over workers' if config.workers > 1 else ''})")
+                logger.info(f"Results of {session_data['total_inputs']} inputs written to: {results_file}")
+                # the entries are streamed from the results file, the run is not kept in memory
+                json_data = read_results(results_file)
 
                 if config.json:
-                    results_file = Path(config.output) / f"{config.mode.value}_results.json"
-                    with results_file.open("w", encoding="utf-8") as json_file:
-                        json.dump(json_data, json_file, indent=4, ensure_ascii=False, cls=ConfigEncoder)
-
-            except selenium.common.exceptions.WebDriverException as e:
-                logger.error(f"WebDriverException occurred: {e.msg}")
-                logger.error(f"Screen: {e.screen}")
-                logger.warning("Please check if the URL is correct and the server is running. \
-                You can use the --debug flag to enable debug mode. \
-                Please check the arguments passed to the script. \
-                Use --help to see all available arguments.")
-            except Exception as e:
-                logger.error(f"An error occurred: {e}")
-                raise e
-            finally:
-                # close bowser
-                if config.browser_leave_open and config.browser_visible:
-                    logger.warning("Leave Browser open by user request - close it yourself or things happen.")
-                else:
-                    driver.quit()
+                    write_results_json(json_data, results_file_path(config, suffix=".json"))
+            elif results_file.exists():
+                logger.warning(f"Results up to the failure are kept in {results_file}, "
+                               f"use --simulate with this file to generate the reports.")
 
     reporting(config, json_data)
     logger.info("Finished.")
     if config.browser_leave_open and config.browser_visible:
         logger.warning("The browser has been left open - remember to close it later to close the tool.")
 
+def results_file_path(config: ProcessingConfig, suffix: str = RESULTS_SUFFIX) -> Path:
+    """
+    Path of the results file in the output folder, with '.gz' if the results are written compressed.
+
+    :param config: Config object containing all arguments.
+    :param suffix: Suffix of the results format.
+    :return: The path of the results file.
+    """
+    return Path(config.output) / f"{config.mode.value}_results{suffix}{GZIP_SUFFIX if config.results_gzip else ''}"
+
+def _create_driver(config: ProcessingConfig) -> WebDriver:
+    """
+    Create and configure the Selenium WebDriver for the configured browser.
+
+    :param config: Config object containing all arguments.
+    :return: The started WebDriver instance.
+    """
+    logger.info("Starting Selenium WebDriver")
+    if config.browser == "edge":
+        from selenium.webdriver.edge.options import Options
+        options = Options()
+    else:
+        from selenium.webdriver.chrome.options import Options
+        options = Options()
+    if not config.browser_visible:
+        options.add_argument("--headless")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.enable_bidi = True
+    if config.browser == "edge":
+        driver = selenium.webdriver.Edge(options=options)
+    else:
+        driver = selenium.webdriver.Chrome(options=options)
+
+    logger.debug(f"Selenium WebDriver Initialized")
+    driver.script.add_console_message_handler(handle_browser_console_log)
+    return driver
+
+def _run_session(config: ProcessingConfig, actions: list[dict], execution_time: str,
+                 prelude: list[dict] = None, keep_prelude_results: bool = True,
+                 blob_folder: Path | None = None, results_file: Path | None = None) -> dict | None:
+    """
+    Run the actions in one browser session.
+    The login URL is called first (if defined), then the optional prelude and the actions are executed.
+    Every completed entry is appended to the results file (see ResultsWriter) instead of being kept in memory.
+
+    :param config: Config object containing all arguments.
+    :param actions: The actions to execute in this session.
+    :param execution_time: Timestamp of the run, shared by all sessions.
+    :param prelude: Actions to execute before the actions (e.g. setup actions replayed by every worker).
+    :param keep_prelude_results: If False, the results of the prelude are not returned.
+    :param blob_folder: Folder of the hashed element screenshots, defaults to 'blobs' in the screenshots folder.
+    :param results_file: Path of the results file, defaults to '<mode>_results.jsonl' in the output folder.
+    :return: Dict with base_url, results_file, total_inputs, wait_time and browser_console_log
+             or None if the browser session failed.
+    """
+    screenshots_folder = Path(config.output) / "screenshots"
+    results_file = results_file or results_file_path(config)
+    results_writer = None
+    configure_page_wait(config.wait_timeout, config.wait_idle)
+    configure_image_writer(config.screenshot_format, config.screenshot_quality, config.screenshot_max_dimension)
+    configure_screenshot_store(config.screenshot_store, blob_folder or screenshots_folder / BLOB_FOLDER)
+    driver = _create_driver(config)
+    try:
+        # first go to login url if defined
+        if config.login:
+            logger.info(f"Perform Login with URL: {config.login}")
+            call_url(driver, config.login)
+
+        base_url = get_full_base_url(driver)
+        logger.debug(f"Extracted Base URL: {base_url}")
+        pre_define_action_context(execution_time=execution_time, base_url=base_url,
+                                  screenshots_folder=screenshots_folder.as_posix())
+
+        results_writer = ResultsWriter(results_file, html_length=config.result_html_length)
+        results_writer.start(execution_time, base_url)
+        if prelude:
+            prelude_data = _execute_actions(config, driver, prelude)
+            if keep_prelude_results:
+                for entry in prelude_data:
+                    results_writer.add(entry)
+        # top-level actions one by one, their entries are written as soon as they are completed
+        for action in actions:
+            for entry in _execute_actions(config, driver, [action]):
+                results_writer.add(entry)
+
+        browser_console_log = get_browser_console_log()
+        results_writer.finish(base_url, browser_console_log)
+        return {
+            "base_url": base_url,
+            "results_file": results_file.as_posix(),
+            "total_inputs": results_writer.total_inputs,
+            "wait_time": results_writer.wait_time,
+            "browser_console_log": browser_console_log,
+        }
+    except selenium.common.exceptions.WebDriverException as e:
+        logger.error(f"WebDriverException occurred: {e.msg}")
+        logger.error(f"Screen: {e.screen}")
+        logger.warning("Please check if the URL is correct and the server is running. \
+        You can use the --debug flag to enable debug mode. \
+        Please check the arguments passed to the script. \
+        Use --help to see all available arguments.")
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        raise e
+    finally:
+        if results_writer is not None:
+            results_writer.close()
+        # close bowser
+        if config.browser_leave_open and config.browser_visible:
+            logger.warning("Leave Browser open by user request - close it yourself or things happen.")
+        else:
+            driver.quit()
+        # screenshots are written in the background, the reports need them
+        flush_images()
+        # the image process pool only exists if the contrast runner was loaded
+        if "src.contrast" in sys.modules:
+            from src.contrast import shutdown_image_pool
+            shutdown_image_pool()
+        if config.screenshot_store == ScreenshotStore.HASHED:
+            stored, duplicates = stored_image_counts()
+            logger.info(f"Element screenshots stored: {stored}, identical screenshots not written again: {duplicates}")
+    return None
+
+def split_actions_for_workers(actions: list[dict], workers: int) -> tuple[list[dict], list[list[dict]]]:
+    """
+    Split the top-level actions into a prelude and up to `workers` chunks.
+
+    Every top-level URL input starts a new segment, actions following it stay with it,
+    because they usually work on the page the URL opened.
+    Actions before the first URL form the prelude, they are replayed in every worker session.
+    The segments are distributed in contiguous chunks, so the input order is kept.
+    If there is no URL input at all, the actions can not be split and are returned as one chunk.
+
+    :param actions: The parsed top-level actions.
+    :param workers: The maximum number of chunks.
+    :return: Tuple of prelude and the list of chunks.
+    """
+    prelude = []
+    segments: list[list[dict]] = []
+    for action in actions:
+        if action and action.get("type") == "url":
+            segments.append([action])
+        elif segments:
+            segments[-1].append(action)
+        else:
+            prelude.append(action)
+
+    if not segments:
+        return [], [prelude] if prelude else []
+
+    workers = max(1, min(workers, len(segments)))
+    size, rest = divmod(len(segments), workers)
+    chunks = []
+    start = 0
+    for worker_idx in range(workers):
+        end = start + size + (1 if worker_idx < rest else 0)
+        chunks.append([action for segment in segments[start:end] for action in segment])
+        start = end
+    return prelude, chunks
+
+def _worker_config(config: ProcessingConfig, worker_idx: int) -> ProcessingConfig:
+    """Config of a worker, writing to its own sub folder of the output folder."""
+    return replace(config, output=(Path(config.output) / f"worker_{worker_idx}").as_posix())
+
+def _run_worker(config: ProcessingConfig, worker_idx: int, prelude: list[dict], actions: list[dict],
+                execution_time: str) -> dict | None:
+    """
+    Entry point of a worker process, runs its chunk of actions in an own browser session.
+    Screenshots of the worker are written to an own sub folder of the output folder,
+    the hashed element screenshots to the store shared by all workers.
+    The results are written to the results file of the worker folder.
+    """
+    from src.main import load_all_actions
+
+    if config.debug:
+        logger.setLevel(logging.DEBUG)
+    load_all_actions()
+    populate_ignored_violation_from_file(config.excludes)
+
+    worker_config = _worker_config(config, worker_idx)
+    (Path(worker_config.output) / "screenshots").mkdir(parents=True, exist_ok=True)
+    logger.info(f"[Worker {worker_idx}] Processing {len(actions)} actions")
+    return _run_session(worker_config, actions, execution_time,
+                        prelude=prelude, keep_prelude_results=worker_idx == 0,
+                        blob_folder=Path(config.output) / "screenshots" / BLOB_FOLDER)
+
+def _run_workers(config: ProcessingConfig, actions: list[dict], execution_time: str,
+                 results_file: Path) -> dict | None:
+    """
+    Run the actions split over multiple worker processes, each with its own browser session.
+    The results files of the workers are merged back in input order into the results file (entry by entry).
+
+    :param config: Config object containing all arguments.
+    :param actions: The parsed top-level actions.
+    :param execution_time: Timestamp of the run.
+    :param results_file: Path of the merged results file.
+    :return: Dict with base_url, results_file, total_inputs, wait_time and browser_console_log
+             or None if all sessions failed.
+    """
+    prelude, chunks = split_actions_for_workers(actions, config.workers)
+    if len(chunks) <= 1:
+        logger.info("Inputs can not be split for multiple workers, running in a single session.")
+        return _run_session(config, actions, execution_time, results_file=results_file)
+
+    logger.info(f"Running {len(chunks)} workers in parallel")
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(_run_worker, config, worker_idx, prelude, chunk, execution_time)
+                   for worker_idx, chunk in enumerate(chunks)]
+        sessions = []
+        for worker_idx, future in enumerate(futures):
+            # a failing worker must not discard the results of the others
+            try:
+                sessions.append(future.result())
+            except Exception as e:
+                logger.error(f"[Worker {worker_idx}] An error occurred: {e}")
+                sessions.append(None)
+
+    return merge_worker_results(config, chunks, sessions, execution_time, results_file)
+
+def merge_worker_results(config: ProcessingConfig, chunks: list[list[dict]], sessions: list[dict | None],
+                         execution_time: str, results_file: Path) -> dict | None:
+    """
+    Merge the results files of the workers in input order into the results file (entry by entry).
+    The partial results of a failed worker are merged as well, followed by an error entry for its chunk,
+    so the report shows that pages are missing.
+
+    :param config: Config object containing all arguments.
+    :param chunks: The actions of the workers.
+    :param sessions: The session data of the workers (see _run_session), None for a failed worker.
+    :param execution_time: Timestamp of the run.
+    :param results_file: Path of the merged results file.
+    :return: Dict with base_url, results_file, total_inputs, wait_time and browser_console_log
+             or None if all workers failed.
+    """
+    completed = [session for session in sessions if session is not None]
+    browser_console_log = [log for session in completed for log in session["browser_console_log"]]
+    browser_console_log.sort(key=lambda log: log.get("timestamp") or 0)
+    base_url = completed[0]["base_url"] if completed else None
+    page_idx = 0
+    with ResultsWriter(results_file, html_length=config.result_html_length) as results_writer:
+        results_writer.start(execution_time, base_url)
+        for worker_idx, (chunk, session) in enumerate(zip(chunks, sessions)):
+            worker_results = Path(session["results_file"]) if session else \
+                results_file_path(_worker_config(config, worker_idx))
+            inputs = read_results(worker_results)["inputs"] if worker_results.exists() else []
+            for entry in inputs:
+                # renumber analysed pages, every worker starts counting by 1
+                if "index" in entry:
+                    page_idx += 1
+                    entry["index"] = page_idx
+                results_writer.add(entry)
+            if session is None:
+                urls = [action.get("url", "") for action in chunk if action and action.get("type") == "url"]
+                url_range = f"{urls[0]} to {urls[-1]}" if urls else "no URL"
+                logger.warning(f"[Worker {worker_idx}] failed, results of {len(inputs)} entries kept, "
+                               f"the remaining inputs of its chunk ({url_range}) are missing in the report.")
+                results_writer.add({
+                    "url": urls[0] if urls else "",
+                    "title": f"Exception occured: Worker {worker_idx} failed",
+                    "action": json.dumps(chunk, indent=2),
+                    "failed": True,
+                    "error": f"Worker {worker_idx} failed, inputs of {url_range} are incomplete"
+                             f" ({len(inputs)} entries written before the failure)",
+                })
+        results_writer.finish(base_url, browser_console_log)
+    if not completed:
+        return None
+    return {
+        "base_url": base_url,
+        "results_file": results_file.as_posix(),
+        "total_inputs": results_writer.total_inputs,
+        "wait_time": results_writer.wait_time,
+        "browser_console_log": browser_console_log,
+    }
+
 def _execute_actions(config: ProcessingConfig, driver: WebDriver, actions: list[dict]) -> list:
     actions_data = []
     for action_idx, action in enumerate(actions):
@@ -207,10 +450,20 @@ def info_logs_of_config(config: ProcessingConfig) -> None:
     logger.info(f"Login URL: {config.login if config.login else 'None'}")
     logger.info(f"Resolution: {config.resolution_width}x{config.resolution_height}")
     logger.info(f"JSON output enabled: {'Yes' if config.json else 'No'}")
+    logger.info(f"Results compressed (gzip): {'Yes' if config.results_gzip else 'No'}, "
+                f"node HTML length: {config.result_html_length if config.result_html_length else 'full'}")
     logger.info(f"Markdown report enabled: {'Yes' if config.markdown else 'No'}")
     logger.info(f"HTML report enabled: {'Yes' if config.html else 'No'}")
     logger.info(f"Simulate with file: {config.simulate if config.simulate else 'None'}")
     logger.info(f"Inputs to check ({len(config.inputs)}): {config.inputs}")
+    if config.workers > 1:
+        logger.info(f"Parallel workers: {config.workers}")
+    logger.info(f"Report render processes: {config.report_processes if config.report_processes else 'CPU cores'}")
+    logger.info(f"Screenshot format: {config.screenshot_format}"
+                + (f" (quality {config.screenshot_quality})" if config.screenshot_format != ImageFormat.PNG else "")
+                + (f", full-page max dimension {config.screenshot_max_dimension}px" if config.screenshot_max_dimension else "")
+                + f", element store: {config.screenshot_store}")
+    logger.info(f"Page ready wait - timeout: {config.wait_timeout}s, idle time: {config.wait_idle}s")
     if config.excludes:
         logger.info(f"Excludes file: {config.excludes}")
 
@@ -219,17 +472,20 @@ def info_logs_of_config(config: ProcessingConfig) -> None:
         logger.info(f"Contrast ratio threshold: {config.contrast_threshold}")
         logger.info("Reporting only invalid elements (do not meet WCAG requirements): " + ("Yes" if config.report_level == ReportLevel.INVALID else "No"))
         logger.info(f"Color source: {config.color_source}")
+        if config.color_source == ColorSource.IMAGE:
+            logger.info(f"Color extraction: {config.color_extraction}")
+            logger.info(f"Image processes: {config.image_processes if config.image_processes else 'CPU cores'}")
+        if config.contrast_prefilter:
+            logger.info("Dropping passing elements in the browser (prefilter): Yes")
         logger.info(f"Image processing options - Canny-edge detection: {config.use_canny_edge_detection}, Antialias: {config.use_antialias}")
-        if config.alternate_color_suggestion:
-            logger.info("Using alternate RGB color suggestion algorithm.")
-        else:
-            logger.info("Using default HSL color spectrum for suggestions.")
+        logger.info(f"Color suggestion algorithm: {config.color_suggestion}")
 
     if config.runner == Runner.AXE:
         logger.info(f"Axe rules to check: {config.axe_rules if config.axe_rules else 'default'}")
 
     if config.runner == Runner.TAB:
         logger.info(f"Missing TAB check: {config.missing_tab_check}")
+        logger.info(f"Tab mode: {config.tab_mode}")
 
 
 def handle_action(config: ProcessingConfig, driver: WebDriver, action: dict) -> dict | None:
@@ -248,12 +504,9 @@ def reporting(config: Config, json_data: dict) -> None:
         logger.warning("No data to report. Exiting.")
         return
     if isinstance(config, ProcessingConfig) and (config.markdown or config.html):
-        logger.info("Building Markdown report data...")
-        markdown_report_data = build_markdown(config, json_data)
-
-        if config.markdown:
-            logger.info("Generating Markdown report...")
-            generate_markdown_report(config, json_data, markdown_data=markdown_report_data)
-        if config.html:
-            logger.info("Generating HTML report...")
-            generate_html_report(config, json_data, markdown_data=markdown_report_data)
+        from src.report import generate_reports
+
+        report_names = [name for name, enabled in (("Markdown", config.markdown), ("HTML", config.html)) if enabled]
+        logger.info(f"Generating {' and '.join(report_names)} report...")
+        generate_reports(config, json_data, markdown=config.markdown, html=config.html,
+                         processes=config.report_processes)
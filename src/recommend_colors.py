@@ -1,14 +1,20 @@
 import colorsys
+from functools import lru_cache
+
 import numpy as np
 
-from src.config import ProcessingConfig
-from src.utils import hex_to_rgb, rgb_to_hex, relative_luminance, contrast_ratio
+from src.config import ProcessingConfig, ColorSuggestion
+from src.color_math import relative_luminance, contrast_ratio, relative_luminance_array, contrast_ratio_array, \
+    hls_to_rgb_array, srgb_to_lab_array, lab_to_linear_array, linear_to_srgb_array, luminance_to_lightness, \
+    LUMINANCE_WEIGHTS
+from src.utils import hex_to_rgb, rgb_to_hex
 
 
 def suggest_wcag_colors(config: ProcessingConfig, result_dict: dict,
                         color1: tuple[int, int, int], color2: tuple[int, int, int]) -> list:
     """
     Suggests WCAG-compliant color combinations that are close to the original colors.
+    Suggestions are cached per color pair, threshold and algorithm, so repeated pairs cost nothing.
 
     :param: config: Configuration object containing settings.
     :param: result_dict: Dictionary containing the results to add.
@@ -17,10 +23,8 @@ def suggest_wcag_colors(config: ProcessingConfig, result_dict: dict,
     :return: List of WCAG-compliant color combinations (HEX values) with contrast ratios.
     """
     # Suggest WCAG-compliant colors
-    if not config.alternate_color_suggestion:
-        suggestions = _suggest_wcag_colors(color1, color2)
-    else:
-        suggestions = _alternate_suggest_wcag_colors(color1, color2, config.contrast_threshold)
+    suggestions = _cached_suggestions(tuple(int(c) for c in color1), tuple(int(c) for c in color2),
+                                      float(config.contrast_threshold), config.color_suggestion)
 
     # Add contrast ratios to suggestions
     suggestions_with_contrast = [
@@ -37,13 +41,33 @@ def suggest_wcag_colors(config: ProcessingConfig, result_dict: dict,
     return suggestions_with_contrast
 
 
+@lru_cache(maxsize=4096)
+def _cached_suggestions(color1: tuple[int, int, int], color2: tuple[int, int, int],
+                        min_contrast: float, algorithm: ColorSuggestion) -> tuple[tuple[str, str, float], ...]:
+    if algorithm == ColorSuggestion.RGB:
+        return tuple(_alternate_suggest_wcag_colors(color1, color2, min_contrast))
+    if algorithm == ColorSuggestion.LIGHTNESS:
+        return tuple(_solve_wcag_colors(color1, color2, min_contrast))
+    return tuple(_suggest_wcag_colors(color1, color2, min_contrast))
+
+
+def suggestion_cache_info() -> str:
+    """
+    Statistics of the color suggestion cache (for debug output).
+
+    :return: Text with hits, misses and size of the cache.
+    """
+    info = _cached_suggestions.cache_info()
+    return f"Color suggestion cache: {info.hits} hits, {info.misses} misses, {info.currsize}/{info.maxsize} entries"
+
+
 def _suggest_wcag_colors(color1_rgb: tuple[int, int, int], color2_rgb: tuple[int, int, int],
                          min_contrast: float = 4.5) -> list[tuple[str, str, float]]:
     """
     Suggests WCAG-compliant color combinations that are close to the original colors.
-    Uses the colorsys library for color conversions and contrast calculations.
     The color is converted to HLS (Hue, Lightness, Saturation) and brightness is adjusted
     in 5% steps (±40%) to find colors that meet the contrast ratio requirement.
+    All combinations of the adjusted colors are evaluated at once as a grid (NumPy broadcast).
     It returns the 3 best suggestions based on minimal deviation from the original colors or less if none could be found.
 
     :param: color1: first color in rgb format (tuple of 3 integers)
@@ -55,38 +79,147 @@ def _suggest_wcag_colors(color1_rgb: tuple[int, int, int], color2_rgb: tuple[int
     h1, l1, s1 = colorsys.rgb_to_hls(*(c / 255.0 for c in color1_rgb))
     h2, l2, s2 = colorsys.rgb_to_hls(*(c / 255.0 for c in color2_rgb))
 
-    suggestions = []
-    seen_suggestions = set()
+    # Brightness adjustments (±40% in 5% steps), duplicate colors (clipped brightness) are evaluated once
+    adjustments = np.arange(-40, 41, 5) / 100
+    colors1 = _unique_rows((hls_to_rgb_array(h1, np.clip(l1 + adjustments, 0, 1), s1) * 255).astype(int))
+    colors2 = _unique_rows((hls_to_rgb_array(h2, np.clip(l2 + adjustments, 0, 1), s2) * 255).astype(int))
 
-    # Try brightness adjustments (±40% in 5% steps)
-    for l1_adj in range(-40, 41, 5):
-        for l2_adj in range(-40, 41, 5):
-            # New brightness values (in percent)
-            new_l1 = max(0, min(1, l1 + l1_adj / 100))
-            new_l2 = max(0, min(1, l2 + l2_adj / 100))
-
-            # Create new colors with adjusted brightness
-            new_color1_rgb = tuple(int(c * 255) for c in colorsys.hls_to_rgb(h1, new_l1, s1))
-            new_color2_rgb = tuple(int(c * 255) for c in colorsys.hls_to_rgb(h2, new_l2, s2))
-            ratio = contrast_ratio(
-                relative_luminance(new_color1_rgb),
-                relative_luminance(new_color2_rgb)
-            )
-
-            if ratio >= min_contrast:
-                suggestion = (rgb_to_hex(new_color1_rgb), rgb_to_hex(new_color2_rgb), ratio)
-                if suggestion[:2] not in seen_suggestions:  # Check for duplicates
-                    seen_suggestions.add(suggestion[:2])  # Add unique color pair
-                    suggestions.append(suggestion)
+    lum1 = relative_luminance_array(colors1)
+    lum2 = relative_luminance_array(colors2)
+    ratios = contrast_ratio_array(lum1[:, None], lum2[None, :])
 
     # Sort by minimal deviation (based on luminance difference)
-    suggestions.sort(key=lambda x: (
-            abs(relative_luminance(hex_to_rgb(x[0])) - relative_luminance(color1_rgb)) +
-            abs(relative_luminance(hex_to_rgb(x[1])) - relative_luminance(color2_rgb))
-    ))
+    deviation = (np.abs(lum1 - relative_luminance(color1_rgb))[:, None]
+                 + np.abs(lum2 - relative_luminance(color2_rgb))[None, :])
+    idx1, idx2 = np.nonzero(ratios >= min_contrast)
+    order = np.argsort(deviation[idx1, idx2], kind="stable")[:3]
 
     # Return the three best suggestions (or fewer if not enough are found)
-    return suggestions[:3]
+    return [
+        (rgb_to_hex(colors1[i]), rgb_to_hex(colors2[j]), float(ratios[i, j]))
+        for i, j in zip(idx1[order], idx2[order])
+    ]
+
+
+def _unique_rows(colors: np.ndarray) -> np.ndarray:
+    """
+    Remove duplicate colors, the order of the first occurrences is kept.
+    """
+    _, first_indices = np.unique(colors, axis=0, return_index=True)
+    return colors[np.sort(first_indices)]
+
+
+def _solve_wcag_colors(color1_rgb: tuple[int, int, int], color2_rgb: tuple[int, int, int],
+                       min_contrast: float = 4.5, splits: int = 9,
+                       chroma_scales: tuple[float, ...] = (1.0, 0.5, 0.0)) -> list[tuple[str, str, float]]:
+    """
+    Suggests WCAG-compliant color combinations that are close to the original colors (deterministic solver).
+
+    The lighter color is made lighter and the darker color darker (the polarity is kept).
+    The luminance both colors need is solved directly from the contrast formula,
+    the needed change is split between both colors in several steps (from only one color to only the other).
+    For every target luminance the color with the same hue and chroma (CIELAB a*, b*) is solved
+    along the perceptual lightness L*, all candidates at once (see _solve_lightness).
+    Candidates with reduced chroma are added for colors that can not reach the luminance in their hue
+    (e.g. saturated blue can not become very light).
+    It returns the 3 suggestions with the smallest perceptual distance (CIE76) to the original colors.
+
+    :param color1_rgb: first color in rgb format (tuple of 3 integers)
+    :param color2_rgb: second color in rgb format (tuple of 3 integers)
+    :param min_contrast: Minimum contrast ratio (default: 4.5)
+    :param splits: Number of steps to split the needed luminance change between the colors (default: 9)
+    :param chroma_scales: Factors of the original chroma to search with (default: 1.0, 0.5, 0.0)
+    :return: List of tuples with WCAG-compliant color combinations (HEX values)
+    """
+    swapped = relative_luminance(color1_rgb) > relative_luminance(color2_rgb)
+    dark_rgb, light_rgb = (color2_rgb, color1_rgb) if swapped else (color1_rgb, color2_rgb)
+    dark_lum, light_lum = relative_luminance(dark_rgb), relative_luminance(light_rgb)
+
+    # luminance of the dark color: from unchanged (only the light color changes) to only the dark color changes,
+    # the light color needs the luminance to reach the contrast with it
+    dark_only = max(0.0, (light_lum + 0.05) / min_contrast - 0.05)
+    dark_targets = np.linspace(dark_lum, min(dark_lum, dark_only), splits)
+    light_targets = np.maximum(light_lum, min_contrast * (dark_targets + 0.05) - 0.05)
+    feasible = light_targets <= 1.0
+    if not feasible.any():
+        # only possible with black as dark color
+        dark_targets, light_targets = np.zeros(1), np.array([max(light_lum, min_contrast * 0.05 - 0.05)])
+    else:
+        dark_targets, light_targets = dark_targets[feasible], light_targets[feasible]
+
+    # rows: all dark candidates (per chroma scale and split) followed by the light candidates
+    count = dark_targets.size * len(chroma_scales)
+    scales = np.repeat(np.asarray(chroma_scales, dtype=float), dark_targets.size)
+    original_lab = srgb_to_lab_array([dark_rgb, light_rgb])
+    darker = np.arange(2 * count) < count
+    ab = np.concatenate([original_lab[0, 1:] * scales[:, None], original_lab[1, 1:] * scales[:, None]])
+    targets = np.concatenate([np.tile(dark_targets, len(chroma_scales)), np.tile(light_targets, len(chroma_scales))])
+
+    colors = _solve_lightness(ab, targets, darker)
+    # a color that does not need to change keeps its exact value (no rounding in the Lab conversion)
+    unchanged = np.concatenate([scales, scales]) == 1.0
+    unchanged &= np.where(darker, targets >= dark_lum, targets <= light_lum)
+    colors[unchanged] = np.where(darker[unchanged, None], dark_rgb, light_rgb)
+
+    lum = relative_luminance_array(colors)
+    ratios = (lum[count:] + 0.05) / (lum[:count] + 0.05)
+    deviation = np.linalg.norm(srgb_to_lab_array(colors) - np.repeat(original_lab, count, axis=0), axis=1)
+    distance = deviation[:count] + deviation[count:]
+
+    suggestions = []
+    seen_suggestions = set()
+    for i in np.argsort(distance, kind="stable"):
+        if ratios[i] < min_contrast:
+            continue
+        pair = (rgb_to_hex(colors[count + i]), rgb_to_hex(colors[i])) if swapped \
+            else (rgb_to_hex(colors[i]), rgb_to_hex(colors[count + i]))
+        if pair in seen_suggestions:
+            continue
+        seen_suggestions.add(pair)
+        suggestions.append((pair[0], pair[1], float(ratios[i])))
+        if len(suggestions) == 3:
+            break
+    return suggestions
+
+
+def _solve_lightness(ab: np.ndarray, targets: np.ndarray, darker: np.ndarray,
+                     levels: int = 3, points: int = 12) -> np.ndarray:
+    """
+    Solve the CIELAB lightness of colors (a*, b* fixed) that reaches the target luminance, vectorised over all colors.
+
+    Inside the sRGB gamut the luminance only depends on the lightness, so L* is calculated directly.
+    Colors that would be clipped (out of gamut) are searched along the lightness instead,
+    the interval is split in several points per level (multi-way bisection), one conversion per level.
+    Darker colors are rounded down and lighter colors up to 8-bit values,
+    so the darker colors end at or below the target luminance and the lighter colors at or above.
+
+    :param ab: Array of a*, b* values with shape (N, 2)
+    :param targets: Array of target luminance values with shape (N,)
+    :param darker: Boolean array, True for colors that have to stay below the target, False for above
+    :param levels: Number of refinement levels of the search (default: 3)
+    :param points: Number of lightness values per color and level (default: 12)
+    :return: Array of RGB colors (integers 0-255) with shape (N, 3)
+    """
+    lab = np.column_stack([luminance_to_lightness(targets), ab])
+    linear = lab_to_linear_array(lab, clip=False)
+    clipped = np.nonzero(((linear < 0) | (linear > 1)).any(axis=1))[0]
+    if clipped.size:
+        rows = np.arange(clipped.size)
+        low = np.zeros(clipped.size)
+        high = np.full(clipped.size, 100.0)
+        steps = np.linspace(0.0, 1.0, points)
+        grid_ab = np.broadcast_to(ab[clipped, None, :], (clipped.size, points, 2))
+        for _ in range(levels):
+            grid = low[:, None] + (high - low)[:, None] * steps
+            lum = lab_to_linear_array(np.concatenate([grid[..., None], grid_ab], axis=-1)) @ LUMINANCE_WEIGHTS
+            below = np.where(darker[clipped, None], lum <= targets[clipped, None], lum < targets[clipped, None])
+            # the luminance grows with the lightness, the target is between the last point below and the next one
+            index = np.clip(below.sum(axis=1) - 1, 0, points - 2)
+            low, high = grid[rows, index], grid[rows, index + 1]
+        lab[clipped, 0] = np.where(darker[clipped], low, high)
+        linear[clipped] = lab_to_linear_array(lab[clipped])
+    srgb = linear_to_srgb_array(linear)
+    return np.where(darker[:, None], np.floor(srgb), np.ceil(srgb)).astype(int)
 
 
 def _alternate_suggest_wcag_colors(color1_rgb: tuple[int, int, int], color2_rgb: tuple[int, int, int],
@@ -1,8 +1,13 @@
-import mistune
-
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from typing import Iterator
+from jinja2 import BaseLoader, BytecodeCache, ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, \
+    ModuleLoader, select_autoescape
 from src.config import Config
 from src.utils import create_color_span, get_embedded_file_path, count_violations
 from src.logger_setup import logger
@@ -20,67 +25,210 @@ def join_color_span(colors):
     return " ".join(create_color_span(color) for color in colors)
 
 
-def build_markdown(config: Config, json_data: dict) -> str:
-    """
-    Build a markdown report from the given data.
+TEMPLATE_FOLDER = Path("src") / "templates"
+# templates precompiled to python modules by the PyInstaller build (see compile_report_templates)
+COMPILED_TEMPLATE_FOLDER = Path("src") / "templates_compiled"
 
-    :param config: The configuration object.
-    :param json_data: JSON data to generate the markdown from.
-    :return: Markdown report as string.
+# template environment of the process, created on first use (main process and every render process)
+_environment: Environment | None = None
+
+# below this number of pages the process start costs more than rendering in the main process
+MIN_PAGES_FOR_POOL = 20
+# pages submitted to the pool and not written yet, bounds the memory of the parallel rendering
+MAX_PENDING_PAGES = 64
+
+
+def create_report_environment(loader: BaseLoader, bytecode_cache: BytecodeCache | None = None) -> Environment:
     """
+    Create the template environment of the reports.
 
-    env = Environment(loader=FileSystemLoader(get_embedded_file_path(Path("src") / "templates")))
+    :param loader: Loader of the report templates.
+    :param bytecode_cache: Cache of the compiled templates.
+    :return: The environment with the report filters.
+    """
+    # HTML templates are escaped, the markdown templates escape on their own
+    env = Environment(loader=loader, bytecode_cache=bytecode_cache, autoescape=select_autoescape(["html"]))
     env.filters['join_color_span'] = join_color_span
     env.filters['create_color_span'] = create_color_span
     env.filters['count_violations'] = count_violations
     env.filters['datetimeformat'] = datetimeformat
+    return env
 
-    template_name = "markdown_report.md"
-    md = (env.get_template(template_name)
-          .render(config=config, json_data=json_data, output=config.output))
-    return md
 
+def compile_report_templates(target: str | Path) -> None:
+    """
+    Compile the report templates to python modules (used by the PyInstaller build).
 
-def generate_markdown_report(config: Config, json_data: dict, markdown_data: str = None) -> None:
+    :param target: Folder to write the compiled templates to.
     """
-    Generate a markdown report from the given data.
+    env = create_report_environment(FileSystemLoader(TEMPLATE_FOLDER))
+    env.compile_templates(str(target), zip=None)
+
+
+def template_cache_folder() -> Path:
+    """
+    Folder of the template bytecode cache in the user cache directory.
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "wcag_checker" / "templates"
+
+
+def _report_environment() -> Environment:
+    global _environment
+    if _environment is None:
+        template_folder = get_embedded_file_path(TEMPLATE_FOLDER)
+        compiled_folder = get_embedded_file_path(COMPILED_TEMPLATE_FOLDER)
+        if hasattr(sys, '_MEIPASS') and Path(compiled_folder).is_dir():
+            # bundled build: precompiled templates, nothing to parse
+            loader = ChoiceLoader([ModuleLoader(str(compiled_folder)), FileSystemLoader(template_folder)])
+            _environment = create_report_environment(loader)
+        else:
+            bytecode_cache = None
+            try:
+                cache_folder = template_cache_folder()
+                cache_folder.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(cache_folder))
+            except OSError as e:
+                logger.debug(f"Template cache not available: {e}")
+            _environment = create_report_environment(FileSystemLoader(template_folder), bytecode_cache)
+    return _environment
+
+
+def _render_page(template_name: str, config: Config, input_data: dict, page_index: int, page_count: int) -> str:
+    return _report_environment().get_template(template_name).render(
+        config=config, input_data=input_data, page_index=page_index, page_count=page_count, output=config.output)
+
+
+def create_report_pool(processes: int, page_count: int) -> ProcessPoolExecutor | None:
+    """
+    Create the process pool to render the page fragments of the reports in parallel.
+
+    :param processes: Number of processes (0 = CPU cores), 1 disables the pool.
+    :param page_count: Number of pages of the report.
+    :return: The process pool or None if the pages are rendered in the current process.
+    """
+    processes = min(processes or os.cpu_count() or 1, page_count)
+    if processes <= 1 or page_count < MIN_PAGES_FOR_POOL:
+        return None
+    logger.debug(f"Starting {processes} processes to render the report pages")
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+
+def render_pages(config: Config, json_data: dict, template_name: str,
+                 pool: ProcessPoolExecutor | None = None) -> Iterator[str]:
+    """
+    Render the page fragment of every page (prev/next navigation included) in input order.
+    With a pool the pages are rendered in parallel, only a few pages per process are pending at a time,
+    the pages are taken one by one from json_data (see read_results).
+
+    :param config: The configuration object.
+    :param json_data: JSON data with the pages.
+    :param template_name: Template of a page fragment.
+    :param pool: Process pool to render the pages in (see create_report_pool).
+    :return: Iterator over the rendered pages.
+    """
+    inputs = json_data.get("inputs", [])
+    page_count = json_data.get("total_inputs") or len(inputs)
+    if pool is None:
+        for page_index, input_data in enumerate(inputs, start=1):
+            yield _render_page(template_name, config, input_data, page_index, page_count)
+        return
+
+    pending: deque[Future] = deque()
+    for page_index, input_data in enumerate(inputs, start=1):
+        pending.append(pool.submit(_render_page, template_name, config, input_data, page_index, page_count))
+        if len(pending) >= MAX_PENDING_PAGES:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_markdown_fragments(config: Config, json_data: dict, pool: ProcessPoolExecutor | None = None) -> Iterator[str]:
+    """
+    Render the markdown report fragment by fragment: the header with the page overview,
+    one fragment per page (see render_pages) and the footer with the browser logs.
+
+    :param config: The configuration object.
+    :param json_data: JSON data to generate the markdown from.
+    :param pool: Process pool to render the pages in (see create_report_pool).
+    :return: Iterator over the markdown fragments.
+    """
+    env = _report_environment()
+    yield env.get_template("markdown_report.md").render(config=config, json_data=json_data, output=config.output)
+    for page in render_pages(config, json_data, "markdown_report_page.md", pool):
+        # blank line at the end, a page fragment never continues a block of the previous one
+        yield page + "\n\n"
+    yield env.get_template("markdown_report_footer.md").render(config=config, json_data=json_data, output=config.output)
+
+
+def build_markdown(config: Config, json_data: dict) -> str:
+    """
+    Build a markdown report from the given data.
+
+    :param config: The configuration object.
+    :param json_data: JSON data to generate the markdown from.
+    :return: Markdown report as string.
+    """
+    return "".join(iter_markdown_fragments(config, json_data))
+
+
+def generate_markdown_report(config: Config, json_data: dict, pool: ProcessPoolExecutor | None = None) -> None:
+    """
+    Generate the markdown report from the given data.
+    Every fragment (see iter_markdown_fragments) is written as soon as it is rendered,
+    so the memory needed is bounded by the largest pages, not the whole run.
 
     :param config: The configuration object.
     :param json_data: Json data to generate the markdown from.
-    :param markdown_data: Optional markdown data to use instead of json_data. (pre build markdown)
+    :param pool: Process pool to render the pages in (see create_report_pool).
     :return: None
     """
-    if markdown_data is None:
-        report = build_markdown(config, json_data)
-    else:
-        report = markdown_data
-
-    results_file = Path(config.output) /  f"wcag_results.md"
+    results_file = Path(config.output) / "wcag_results.md"
     with results_file.open("w", encoding="utf-8") as markdown_file:
-        markdown_file.write(report)
+        for fragment in iter_markdown_fragments(config, json_data, pool):
+            markdown_file.write(fragment)
 
-def generate_html_report(config: Config, json_data: dict, markdown_data: str = None) -> None:
+
+def generate_html_report(config: Config, json_data: dict, pool: ProcessPoolExecutor | None = None) -> None:
     """
-    Generate a HTML report from the given data.
+    Generate the HTML report from the given data, rendered directly from the HTML templates (no markdown step).
+    The pages are rendered as fragments (see render_pages), the report template is rendered
+    with Template.generate() around them and written chunk by chunk.
 
     :param config: The configuration object.
     :param json_data: Json data to generate the HTML from.
-    :param markdown_data: Optional markdown data to use instead of json_data. (pre build markdown)
+    :param pool: Process pool to render the pages in (see create_report_pool).
     :return: None
     """
-    if markdown_data is None:
-        report = build_markdown(config, json_data)
-    else:
-        report = markdown_data
-
-    logger.debug("Generating HTML from markdown")
-    html_content = mistune.html(report)
-
     logger.debug("Generating HTML report from template direct to file")
-    html_file_path = Path(config.output) / f"wcag_results.html"
+    html_file_path = Path(config.output) / "wcag_results.html"
     with html_file_path.open("w", encoding="utf-8") as html_file:
-        env = Environment(loader=FileSystemLoader(get_embedded_file_path(Path("src") / "templates")))
-        template = env.get_template("html_report.html")
-        rendered_content = template.render(html_content=html_content, timestamp=json_data.get('timestamp'))
-        html_file.write(rendered_content)
+        template = _report_environment().get_template("html_report.html")
+        html_pages = render_pages(config, json_data, "html_report_page.html", pool)
+        for chunk in template.generate(config=config, json_data=json_data, output=config.output,
+                                       html_pages=html_pages, timestamp=json_data.get('timestamp')):
+            html_file.write(chunk)
 
+
+def generate_reports(config: Config, json_data: dict, markdown: bool = True, html: bool = True,
+                     processes: int = 1) -> None:
+    """
+    Generate the markdown and/or HTML report from the given data, both are independent of each other.
+    The page fragments of both reports are rendered in one process pool.
+
+    :param config: The configuration object.
+    :param json_data: Json data to generate the reports from.
+    :param markdown: Write the markdown report.
+    :param html: Write the HTML report.
+    :param processes: Number of processes to render the pages (0 = CPU cores), 1 renders in the current process.
+    :return: None
+    """
+    pool = create_report_pool(processes, json_data.get("total_inputs") or len(json_data.get("inputs", [])))
+    try:
+        if markdown:
+            generate_markdown_report(config, json_data, pool)
+        if html:
+            generate_html_report(config, json_data, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,276 @@
+import gzip
+import json
+import textwrap
+from pathlib import Path
+from typing import Iterator
+
+from src.config import ConfigEncoder
+
+RESULTS_SUFFIX = ".jsonl"
+GZIP_SUFFIX = ".gz"
+# 2: configs and axe rule metadata stored once and referenced by id, node html truncated
+RESULTS_SCHEMA_VERSION = 2
+# axe result lists and the rule metadata repeated by every page
+AXE_RESULT_TYPES = ("violations", "incomplete", "passes", "inapplicable")
+RULE_METADATA_KEYS = ("description", "help", "helpUrl", "tags")
+
+
+class ResultsEncoder(ConfigEncoder):
+    """
+    Encoder of the result entries, values that can not be stored as JSON are stored as text
+    (a single entry must not break the whole results file).
+    """
+    def default(self, obj):
+        try:
+            return super().default(obj)
+        except TypeError:
+            return str(obj)
+
+
+class ResultsWriter:
+    """
+    Streaming sink of the run results, one JSON line per record:
+
+    - ``{"run": {"timestamp": ..., "base_url": ..., "schema": 2}}`` once at the start
+    - ``{"config": {"id": ..., "data": {...}}}`` once per distinct config, before the first entry using it
+    - ``{"rule": {"id": ..., "data": {...}}}`` once per axe rule (description, help, helpUrl, tags)
+    - ``{"input": {...}}`` per completed entry (page analysed, action result or error),
+      the config is referenced by id, the axe rules without their metadata
+    - ``{"summary": {"base_url": ..., "total_inputs": ..., "browser_console_log": [...]}}`` at the end
+
+    Every line is flushed to disk when it is written, so the results of a crashed run are kept up to the last entry.
+    A path ending with '.gz' is written gzip compressed (flushed per entry as well).
+    """
+
+    def __init__(self, path: Path, html_length: int = 0):
+        """
+        :param path: Path of the results file.
+        :param html_length: Maximum length of the html snippet of the axe nodes (0 keeps the full html).
+        """
+        self.path = Path(path)
+        self.html_length = html_length
+        self.total_inputs = 0
+        self.wait_time = 0.0
+        self._config_ids: dict[str, str] = {}
+        self._rule_ids: set[str] = set()
+        self._file = _open_results(self.path, "w")
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def start(self, timestamp: str, base_url: str | None) -> None:
+        """
+        Write the run record.
+
+        :param timestamp: Timestamp of the run.
+        :param base_url: Base URL of the checked site.
+        """
+        self._write({"run": {"timestamp": timestamp, "base_url": base_url, "schema": RESULTS_SCHEMA_VERSION}})
+
+    def add(self, entry: dict) -> None:
+        """
+        Append a completed entry.
+
+        :param entry: The entry (see analyse_action).
+        """
+        self._write({"input": self._compact_entry(entry)})
+        self.total_inputs += 1
+        self.wait_time += entry.get("wait_time", 0)
+
+    def finish(self, base_url: str | None, browser_console_log: list[dict]) -> None:
+        """
+        Write the summary record and close the file.
+
+        :param base_url: Base URL of the checked site.
+        :param browser_console_log: Collected browser console messages.
+        """
+        self._write({"summary": {
+            "base_url": base_url,
+            "total_inputs": self.total_inputs,
+            "browser_console_log": browser_console_log,
+        }})
+        self.close()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def _compact_entry(self, entry: dict) -> dict:
+        entry = dict(entry)
+        config = entry.get("config")
+        if isinstance(config, dict):
+            key = json.dumps(config, sort_keys=True, ensure_ascii=False, cls=ResultsEncoder)
+            config_id = self._config_ids.get(key)
+            if config_id is None:
+                config_id = f"config_{len(self._config_ids) + 1}"
+                self._config_ids[key] = config_id
+                self._write({"config": {"id": config_id, "data": config}})
+            entry["config"] = config_id
+        results = entry.get("results")
+        if isinstance(results, list):
+            entry["results"] = [self._compact_axe_result(result) if isinstance(result, dict) and "violations" in result
+                                else result for result in results]
+        return entry
+
+    def _compact_axe_result(self, axe_data: dict) -> dict:
+        axe_data = dict(axe_data)
+        for result_type in AXE_RESULT_TYPES:
+            rules = axe_data.get(result_type)
+            if isinstance(rules, list):
+                axe_data[result_type] = [self._compact_rule(rule) if isinstance(rule, dict) and "id" in rule
+                                         else rule for rule in rules]
+        return axe_data
+
+    def _compact_rule(self, rule: dict) -> dict:
+        rule = dict(rule)
+        metadata = {key: rule.pop(key) for key in RULE_METADATA_KEYS if key in rule}
+        if rule["id"] not in self._rule_ids:
+            self._rule_ids.add(rule["id"])
+            self._write({"rule": {"id": rule["id"], "data": metadata}})
+        if self.html_length and isinstance(rule.get("nodes"), list):
+            rule["nodes"] = [_truncate_html(node, self.html_length) for node in rule["nodes"]]
+        return rule
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, cls=ResultsEncoder) + "\n")
+        self._file.flush()
+
+
+def _truncate_html(node: dict, html_length: int) -> dict:
+    html = node.get("html") if isinstance(node, dict) else None
+    if not isinstance(html, str) or len(html) <= html_length:
+        return node
+    return {**node, "html": html[:html_length] + "…"}
+
+
+def _expand_entry(entry: dict, configs: dict[str, dict], rules: dict[str, dict]) -> dict:
+    """
+    Replace the references of a compact entry (schema 2) with the config and the rule metadata.
+    Entries of the old format are returned as they are.
+    """
+    if isinstance(entry.get("config"), str):
+        entry["config"] = configs.get(entry["config"], {})
+    for result in entry.get("results") or []:
+        if not isinstance(result, dict) or "violations" not in result:
+            continue
+        for result_type in AXE_RESULT_TYPES:
+            for idx, rule in enumerate(result.get(result_type) or []):
+                if isinstance(rule, dict) and rule.get("id") in rules:
+                    result[result_type][idx] = {**rules[rule["id"]], **rule}
+    return entry
+
+
+class ResultInputs:
+    """
+    The entries of a results file, read from disk on every iteration (not kept in memory).
+    Compact entries are expanded, the templates always get the full entries.
+    """
+
+    def __init__(self, path: Path, total: int):
+        self.path = Path(path)
+        self.total = total
+
+    def __iter__(self) -> Iterator[dict]:
+        configs: dict[str, dict] = {}
+        rules: dict[str, dict] = {}
+        for record in _read_records(self.path):
+            if "input" in record:
+                yield _expand_entry(record["input"], configs, rules)
+            elif "config" in record:
+                configs[record["config"]["id"]] = record["config"]["data"]
+            elif "rule" in record:
+                rules[record["rule"]["id"]] = record["rule"]["data"]
+
+    def __len__(self) -> int:
+        return self.total
+
+
+def _open_results(path: Path, mode: str):
+    if Path(path).suffix == GZIP_SUFFIX:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return Path(path).open(mode, encoding="utf-8")
+
+
+def _read_records(path: Path) -> Iterator[dict]:
+    with _open_results(path, "r") as results_file:
+        try:
+            for line in results_file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # last line of a crashed run can be incomplete
+                    return
+        except EOFError:
+            # compressed file of a crashed run has no end marker
+            return
+
+
+def read_results(path: Path) -> dict:
+    """
+    Read a results file (see ResultsWriter) into the report data, the entries are streamed from the file.
+    A file without summary (crashed run) is read up to the last complete entry.
+
+    :param path: Path of the results file.
+    :return: Dict with timestamp, base_url, total_inputs, inputs and browser_console_log.
+    """
+    json_data = {"timestamp": None, "base_url": None, "total_inputs": 0, "browser_console_log": []}
+    total_inputs = 0
+    summary = None
+    for record in _read_records(path):
+        if "run" in record:
+            json_data.update(record["run"])
+            json_data.pop("schema", None)
+        elif "input" in record:
+            total_inputs += 1
+        elif "summary" in record:
+            summary = record["summary"]
+    if summary:
+        json_data.update(summary)
+    json_data["total_inputs"] = total_inputs
+    json_data["inputs"] = ResultInputs(path, total_inputs)
+    return json_data
+
+
+def load_results(path: Path) -> dict:
+    """
+    Load the report data of a results file, a JSON lines file (see ResultsWriter) or a JSON file
+    (both optionally gzip compressed, '.gz').
+
+    :param path: Path of the results file.
+    :return: Dict with timestamp, base_url, total_inputs, inputs and browser_console_log.
+    """
+    path = Path(path)
+    name = path.with_suffix("") if path.suffix == GZIP_SUFFIX else path
+    if name.suffix == RESULTS_SUFFIX:
+        return read_results(path)
+    with _open_results(path, "r") as f:
+        return json.load(f)
+
+
+def write_results_json(json_data: dict, path: Path) -> None:
+    """
+    Write the report data as one JSON document (full entries), the entries are written one by one.
+    A path ending with '.gz' is written gzip compressed.
+
+    :param json_data: Report data (see read_results).
+    :param path: Path of the JSON file.
+    """
+    def dump(value, indent: int) -> str:
+        return textwrap.indent(json.dumps(value, indent=4, ensure_ascii=False, cls=ResultsEncoder), " " * indent).lstrip()
+
+    with _open_results(path, "w") as json_file:
+        json_file.write("{\n")
+        for key in ("timestamp", "base_url", "total_inputs"):
+            json_file.write(f'    "{key}": {dump(json_data.get(key), 4)},\n')
+        json_file.write('    "inputs": [')
+        for idx, entry in enumerate(json_data.get("inputs", [])):
+            json_file.write(("," if idx else "") + "\n        " + dump(entry, 8))
+        json_file.write("\n    ],\n")
+        json_file.write(f'    "browser_console_log": {dump(json_data.get("browser_console_log", []), 4)}\n')
+        json_file.write("}\n")
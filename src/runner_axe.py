@@ -1,13 +1,14 @@
 from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
 from pathlib import Path
 import re
 
 from src.config import ProcessingConfig
 from src.ignore_violations import violation_ignored
+from src.image_writer import image_suffix
 from src.logger_setup import logger
-from src.utils import take_element_screenshot, outline_elements_for_screenshot
+from src.script_preload import ensure_script
+from src.screenshot import PageScreenshot, get_element_rects, save_element_screenshot
+from src.utils import outline_elements_for_screenshot
 
 axe = None
 class Axe:
@@ -42,8 +43,9 @@ class Axe:
     def inject(self):
         """
         Inject the Axe script into the current page.
+        The script is preloaded once per session and only sent again if it is not defined in the page.
         """
-        self.driver.execute_script(self.script_data)
+        ensure_script(self.driver, "axe", self.script_data, "typeof axe === 'object' && typeof axe.run === 'function'")
 
     def run(self, context: object = None, options: dict = None) -> dict:
         """
@@ -71,7 +73,7 @@ class Axe:
         return self.driver.execute_async_script(command)
 
 def runner_axe(config: ProcessingConfig, driver: WebDriver, results: list,
-               screenshots_folder: Path, url_idx: int) -> Path|None:
+               screenshots_folder: Path, url_idx: int, page_screenshot: PageScreenshot | None = None) -> Path|None:
     global axe
     if axe is None:
         axe = Axe(driver)
@@ -94,7 +96,7 @@ def runner_axe(config: ProcessingConfig, driver: WebDriver, results: list,
     axe_data = axe.run(context=config.context, options=options)
 
     # extract violation elements
-    elements: list[WebElement] = []
+    violation_nodes: list[tuple[dict, object]] = []
     elm_idx = 0
     violations = axe_data.get("violations", [])
     for violation in violations:
@@ -115,7 +117,7 @@ def runner_axe(config: ProcessingConfig, driver: WebDriver, results: list,
                    nodes_to_remove.append(node)
                    continue
 
-                screenshot_path = screenshots_folder / f"{config.mode.value}_{url_idx}_link_{elm_idx}.png"
+                screenshot_path = screenshots_folder / f"{config.mode.value}_{url_idx}_link_{elm_idx}{image_suffix()}"
                 dat = {
                     "index": elm_idx,
                     "path": element_path_str,
@@ -123,45 +125,42 @@ def runner_axe(config: ProcessingConfig, driver: WebDriver, results: list,
                 }
                 node["element_info"] = dat
                 elm_idx += 1
-                # find an element and take a screenshot
-                try:
-                    element = find_element_in_shadow_dom(driver, element_path)
-                    if not element:
-                        logger.debug(f"Element {elm_idx} not found in the DOM. Skipping screenshot.")
-                        # FIXME: if we continue here the index numbers will not match element to outline
-                        continue
-                    elif element.size['width'] == 0 or element.size['height'] == 0:
-                        logger.debug(f"Element {elm_idx} has 0 width or height. Skipping screenshot.")
-                        elements.append(element)
-                        dat["screenshot"] = None
-                        continue
-                    elif element.is_displayed():
-                        elements.append(element)
-                        take_element_screenshot(driver, element, elm_idx, screenshot_path)
-                        element.screenshot(dat["screenshot"])
-                    else:
-                        logger.debug(f"Element {elm_idx} is not displayed. Skipping screenshot.")
-                        node["element_info"]["screenshot"] = None
-                except Exception as e:
-                    logger.error(f"Error taking screenshot of element {elm_idx}: {e}")
-                    dat["error"] = str(e)
+                violation_nodes.append((dat, element_path))
         for node in nodes_to_remove:
             violation["nodes"].remove(node)
 
+    # find all elements with their position in one call and crop the screenshots from the page capture
+    outline_rects: list[dict] = []
+    try:
+        element_rects = get_element_rects(driver, [element_path for _, element_path in violation_nodes])
+    except Exception as e:
+        logger.error(f"Error locating violation elements: {e}")
+        element_rects = [None] * len(violation_nodes)
+    for (dat, _), rect in zip(violation_nodes, element_rects):
+        try:
+            if not rect:
+                logger.debug(f"Element {dat['index']} not found in the DOM. Skipping screenshot.")
+                # FIXME: if we continue here the index numbers will not match element to outline
+                continue
+            element = rect["element"]
+            if rect["width"] == 0 or rect["height"] == 0:
+                logger.debug(f"Element {dat['index']} has 0 width or height. Skipping screenshot.")
+                outline_rects.append(rect)
+                dat["screenshot"] = None
+                continue
+            elif rect["visible"]:
+                outline_rects.append(rect)
+                dat["screenshot"] = save_element_screenshot(page_screenshot, rect, element, dat["index"],
+                                                            Path(dat["screenshot"])).as_posix()
+            else:
+                logger.debug(f"Element {dat['index']} is not displayed. Skipping screenshot.")
+                dat["screenshot"] = None
+        except Exception as e:
+            logger.error(f"Error taking screenshot of element {dat['index']}: {e}")
+            dat["error"] = str(e)
+
     results.append(axe_data)
-    full_page_screenshot_path_outline = outline_elements_for_screenshot(config, driver, elements,
-                                                                        elements, url_idx)
+    full_page_screenshot_path_outline = outline_elements_for_screenshot(config, driver, outline_rects,
+                                                                        [rect["element"] for rect in outline_rects], url_idx,
+                                                                        page_screenshot=page_screenshot)
     return full_page_screenshot_path_outline
-
-def find_element_in_shadow_dom(driver: WebDriver, selector_list: str | list):
-    if isinstance(selector_list, str):
-        selector_list = [selector_list]
-    element = driver
-    for idx, selector in enumerate(selector_list):
-        if idx == 0:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-        else:
-            # Enter shadow root for intermediate selectors
-            element = driver.execute_script("return arguments[0].shadowRoot", element)
-            element = driver.execute_script("return arguments[0].querySelector(arguments[1])", element, selector)
-    return element
\ No newline at end of file
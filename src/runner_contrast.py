@@ -1,15 +1,18 @@
 from pathlib import Path
 from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.common.by import By
 
-from src.config import ProcessingConfig
-from src.contrast import check_contrast
+from src.config import ColorSource, ProcessingConfig, ReportLevel
+from src.contrast import check_contrast, evaluate_contrast, extract_image_colors, get_image_pool, image_debug_path
 from src.ignore_violations import violation_ignored
+from src.image_writer import image_suffix
 from src.logger_setup import logger
-from src.utils import define_get_path_script, get_csspath, outline_elements_for_screenshot
+from src.recommend_colors import suggestion_cache_info
+from src.screenshot import PageScreenshot, get_element_image
+from src.utils import define_get_path_script, get_element_snapshots, outline_elements_for_screenshot
 
 
-def runner_contrast(config: ProcessingConfig, driver: WebDriver, results: list, screenshots_folder: Path, url_idx: int) -> Path | None:
+def runner_contrast(config: ProcessingConfig, driver: WebDriver, results: list, screenshots_folder: Path, url_idx: int,
+                    page_screenshot: PageScreenshot | None = None) -> Path | None:
     """
     This function checks the contrast of elements on a webpage using Selenium.
 
@@ -18,32 +21,36 @@ def runner_contrast(config: ProcessingConfig, driver: WebDriver, results: list,
     :param results: List to store results.
     :param screenshots_folder: Path to the folder where screenshots will be saved.
     :param url_idx: Index of the URL being processed.
+    :param page_screenshot: Capture of the current page, element screenshots are cropped from it.
     :return: Path to the full-page screenshot with outlines of elements.
     """
 
-    # find visible elements on page
-    if config.context:
-        context = driver.find_elements(By.CSS_SELECTOR, config.context)
-        if context:
-            elements = []
-            for element in context:
-                elements += [element for element in element.find_elements(By.CSS_SELECTOR, config.selector) if element.is_displayed()]
-        else:
-            logger.warning(f"No context found for selector {config.context}. Using all visible elements.")
-            elements = [element for element in driver.find_elements(By.CSS_SELECTOR, config.selector) if element.is_displayed()]
-    else:
-        elements = [element for element in driver.find_elements(By.CSS_SELECTOR, config.selector) if element.is_displayed()]
-    define_get_path_script(driver)  # will later be used in JavaScript for element XPath
+    # collect all visible elements with path, text, colors and position in one call
+    define_get_path_script(driver)  # getCSSPath is used in JavaScript for the element path
+    prefilter = (config.contrast_prefilter and config.color_source == ColorSource.ELEMENT
+                 and config.report_level == ReportLevel.INVALID)
+    snapshot = get_element_snapshots(driver, config.selector, config.context,
+                                      threshold=config.contrast_threshold if prefilter else None)
+    if config.context and not snapshot["context_found"]:
+        logger.warning(f"No context found for selector {config.context}. Using all visible elements.")
+    element_snapshots = snapshot["elements"]
+    logger.info(f"Found {snapshot['total']} elements on page.")
+    if prefilter:
+        logger.info(f"{len(element_snapshots)} elements left to check after dropping passing elements in the browser.")
+
+    # image colors are extracted in a process pool, the browser thread continues with the next elements
+    image_pool = get_image_pool(config) if config.color_source == ColorSource.IMAGE else None
+    pending_images = []
     missed_contrast_elements = []
-    logger.info(f"Found {len(elements)} elements on page.")
-    for index, element in enumerate(elements):
+    for element_snapshot in element_snapshots:
+        index = element_snapshot["index"]
         try:
-            element_path = get_csspath(driver, element)
-            if element.size['width'] == 0 or element.size['height'] == 0:
+            element_path = element_snapshot["path"]
+            if element_snapshot["width"] == 0 or element_snapshot["height"] == 0:
                 results.append({
                     "element_index": index,
                     "element_path": element_path,
-                    "element_text": element.text,
+                    "element_text": element_snapshot["text"],
                     "error": f"Skipping element {index} due to 0 width or height."
                 })
                 continue
@@ -51,21 +58,48 @@ def runner_contrast(config: ProcessingConfig, driver: WebDriver, results: list,
                 logger.debug(f"Element {element_path} is ignored (from ignored list).")
                 continue
 
-            screenshot_path = screenshots_folder / f"{config.mode.value}_{url_idx}_link_{index}.png"
-            if not check_contrast(driver, config, index, element, screenshot_path, results, element_path=element_path):
-                missed_contrast_elements.append(element)
+            screenshot_path = screenshots_folder / f"{config.mode.value}_{url_idx}_link_{index}{image_suffix()}"
+            if image_pool is not None:
+                logger.debug(f"[Element {index}] Check contrast ratio for element path: {element_path}")
+                image = get_element_image(page_screenshot, element_snapshot, element_snapshot["element"])
+                future = image_pool.submit(extract_image_colors, image, config.color_extraction,
+                                           config.use_canny_edge_detection, config.use_antialias,
+                                           debug_path=image_debug_path(screenshot_path))
+                pending_images.append((element_snapshot, screenshot_path, image, future))
+            elif not check_contrast(driver, config, index, element_snapshot, screenshot_path, results,
+                                    page_screenshot=page_screenshot):
+                missed_contrast_elements.append(element_snapshot["element"])
         except Exception as e:
-            error_message = str(e).splitlines()[0]
-            logger.error(f"Error on element {index}: {error_message}")
-            results.append({
-                "element_index": index,
-                "error": error_message
-            })
-            if config.debug:
-                raise e
+            _element_error(config, results, index, e)
+
+    # join the image results before the outline screenshot
+    for element_snapshot, screenshot_path, image, future in pending_images:
+        index = element_snapshot["index"]
+        try:
+            if not evaluate_contrast(config, index, element_snapshot, screenshot_path, results, future.result(),
+                                     image=image, page_screenshot=page_screenshot):
+                missed_contrast_elements.append(element_snapshot["element"])
+        except Exception as e:
+            _element_error(config, results, index, e)
+    if pending_images:
+        # keep the element order of the results (skipped elements are added while collecting)
+        results.sort(key=lambda result: result.get("element_index", 0))
+    logger.debug(suggestion_cache_info())
+
     # last screenshot with outline of elements
-    full_page_screenshot_path_outline = outline_elements_for_screenshot(config, driver, elements,
-                                                                        missed_contrast_elements, url_idx)
+    full_page_screenshot_path_outline = outline_elements_for_screenshot(config, driver, element_snapshots,
+                                                                        missed_contrast_elements, url_idx,
+                                                                        element_indices=[element_snapshot["index"] for element_snapshot in element_snapshots],
+                                                                        page_screenshot=page_screenshot)
     return full_page_screenshot_path_outline
 
 
+def _element_error(config: ProcessingConfig, results: list, index: int, e: Exception) -> None:
+    error_message = str(e).splitlines()[0]
+    logger.error(f"Error on element {index}: {error_message}")
+    results.append({
+        "element_index": index,
+        "error": error_message
+    })
+    if config.debug:
+        raise e
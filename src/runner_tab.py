@@ -2,15 +2,22 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import StaleElementReferenceException
 from pathlib import Path
 
-from src.config import ProcessingConfig
+from src.config import ProcessingConfig, TabMode
 from src.ignore_violations import get_ignored_violations
+from src.image_writer import image_suffix
 from src.logger_setup import logger
+from src.screenshot import PageScreenshot
+from src.script_preload import ensure_script
 from src.utils import take_fullpage_screenshot
 
 tabpath_checker = None
+# number of Tab keys sent per actions request to collect the tab order
+TAB_BATCH_SIZE = 50
+# distance between the elements verified with a Tab key in predicted tab mode
+TAB_SAMPLE_STEP = 20
+
 class TabRunnerScript:
     """
     Tab class to handle tab path visualisation.
@@ -34,8 +41,9 @@ class TabRunnerScript:
     def inject(self):
         """
         Inject the Tab script into the current page.
+        The script is preloaded once per session and only sent again if it is not defined in the page.
         """
-        self.driver.execute_script(self.script_data)
+        ensure_script(self.driver, "tabpath", self.script_data, "typeof TabPath === 'object'")
 
     def run(self, tab_elements: list[WebElement] = None, missing_check: bool = True, missing_ignores: list[str] = []) -> dict:
         """
@@ -63,67 +71,123 @@ class TabRunnerScript:
         """
         self.driver.execute_script("TabPath.cleanVisualization();")
 
-def _collect_elements_by_tab_key(driver: WebDriver) -> list[dict]:
+def _reset_focus(driver: WebDriver) -> None:
+    # Reset focus by clicking at (0,0) or sending the page to the top first
+    driver.execute_script("window.scrollTo(0, 0);")
+    # Send Escape key to clear any potential focus
+    ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+
+def _send_tab_keys(driver: WebDriver, count: int, batch_size: int = TAB_BATCH_SIZE) -> None:
+    for sent in range(0, count, batch_size):
+        ActionChains(driver).send_keys(Keys.TAB * min(batch_size, count - sent)).perform()
+
+def _record_tab_stops(driver: WebDriver, start_index: int | None = None,
+                      batch_size: int = TAB_BATCH_SIZE) -> tuple[list[dict], int | None]:
     """
-    Collects all elements that are focusable by the tab key on the current page.
-    This function simulates pressing the Tab key to navigate through focusable elements
-    and collects them in a list.
+    Sends the Tab key in batches (one actions request per batch), the page records
+    the focused element after each key and detects the end of the tab order (cycle or no focus).
+    The recorded elements are taken from the page after each batch.
 
     :param driver: The Selenium WebDriver instance.
-    :return: A list of WebElement objects that are focusable by the tab key.
+    :param start_index: Index of the predicted element to start from (-1 for the page start),
+                        the recording stops at the next predicted element. None records from the current focus.
+    :param batch_size: Number of Tab keys sent per actions request.
+    :return: The recorded element info dicts in tab order and the index of the predicted element
+             the recording stopped at (None if the end of the tab order was reached).
     """
-
-    # send tab keys to page to collect all elements focusable by tab key
-    logger.info("Sending tab keys to page to collect focusable elements, this may take a while")
     focusable_elements: list[dict] = []
-    seen_elements = set()  # Track elements by a hash of their properties
     max_tabs = 10000  # Limit the number of tabs to prevent infinite loops
     current_tab_count = 0
+    resync_index = None
+
+    driver.execute_script("TabPath.startTabRecording(arguments[0]);", start_index)
+    try:
+        while current_tab_count < max_tabs:
+            presses = min(batch_size, max_tabs - current_tab_count)
+            _send_tab_keys(driver, presses, batch_size)
+            current_tab_count += presses
+
+            recording: dict = driver.execute_script("return TabPath.takeTabRecording(arguments[0]);", presses)
+            focusable_elements.extend(recording["elements"])
+            logger.debug(f"Tab batch recorded {len(recording['elements'])} elements after {current_tab_count} tabs")
+            if recording["done"]:
+                resync_index = recording.get("resync_index")
+                if resync_index is not None:
+                    logger.debug(f"Tab order matches the prediction again at element {resync_index}")
+                elif recording["cycle"]:
+                    logger.debug(f"Tab cycle detected after {len(focusable_elements)} elements")
+                else:
+                    logger.debug("No active element found, stopping tab collection.")
+                break
+    finally:
+        driver.execute_script("TabPath.stopTabRecording();")
 
-    # Reset focus by clicking at (0,0) or sending the page to the top first
-    driver.execute_script("window.scrollTo(0, 0);")
-    # Send Escape key to clear any potential focus
-    ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+    return focusable_elements, resync_index
 
-    action = ActionChains(driver)
-    while current_tab_count < max_tabs:
-        # Press the Tab key
-        action.send_keys(Keys.TAB).perform()
-        current_tab_count += 1
+def _collect_elements_by_tab_key(driver: WebDriver) -> list[dict]:
+    """
+    Collects all elements that are focusable by the tab key on the current page.
+    This function simulates pressing the Tab key to navigate through focusable elements
+    and collects them in a list.
 
-        # Get the currently focused element
-        current_active_element: dict = driver.execute_script("return TabPath.getRealActiveElement();")
-        if not current_active_element:
-            logger.debug("No active element found, stopping tab collection.")
-            break
+    :param driver: The Selenium WebDriver instance.
+    :return: A list of element info dicts (see TabPath.getRealActiveElement) in tab order.
+    """
 
-        try:
-            # Create a unique signature for this element
-            element_signature = (
-                current_active_element.get('id', current_active_element['tag_name']),
-                current_active_element['location']['x'],
-                current_active_element['location']['y']
-            )
-            logger.debug(f"focus element: {element_signature}")
-            print(".", end="", flush=True)  # Print dots to indicate progress
-
-            # check for recent elements to detect cycles
-            if element_signature in seen_elements and current_tab_count > 1:
-                print("!", flush=True) # Print final char to indicate completion
-                logger.debug(f"Tab cycle detected after {current_tab_count} tabs")
-                break
+    # send tab keys to page to collect all elements focusable by tab key
+    logger.info("Sending tab keys to page to collect focusable elements")
+    _reset_focus(driver)
+    focusable_elements, _ = _record_tab_stops(driver)
+    return focusable_elements
 
-            seen_elements.add(element_signature)
-            focusable_elements.append(current_active_element)
+def _collect_elements_by_prediction(driver: WebDriver, sample_step: int = TAB_SAMPLE_STEP) -> list[dict]:
+    """
+    Collects all elements that are focusable by the tab key on the current page from a predicted tab order.
+    The tab order is computed in the browser and verified with one Tab key per checkpoint
+    (page start, sampled elements, last element and elements around a custom tabindex).
+    Where the next element differs from the prediction, the elements are collected with Tab keys
+    until the tab order matches the prediction again.
 
-        except StaleElementReferenceException:
-            logger.debug("Encountered stale element reference")
-            continue
+    :param driver: The Selenium WebDriver instance.
+    :param sample_step: Distance between the sampled checkpoints.
+    :return: A list of element info dicts (see TabPath.getRealActiveElement) in tab order.
+    """
+    prediction: dict = driver.execute_script("return TabPath.predictTabOrder(arguments[0]);", sample_step)
+    predicted: list[dict] = prediction["elements"]
+    checkpoints: list[int] = prediction["checkpoints"]
+    if not predicted:
+        logger.info("No focusable elements predicted, collecting them with tab keys")
+        return _collect_elements_by_tab_key(driver)
+
+    logger.info(f"Predicted {len(predicted)} focusable elements, verifying {len(checkpoints)} checkpoints with tab keys")
+    _reset_focus(driver)
+    driver.execute_script("TabPath.startTabVerification(arguments[0]);", checkpoints)
+    try:
+        _send_tab_keys(driver, len(checkpoints))
+    finally:
+        verification: list[dict] = driver.execute_script("return TabPath.takeTabVerification();")
+    mismatches = [checkpoint["index"] for checkpoint in verification if not checkpoint["ok"]]
+    if mismatches:
+        logger.info(f"Tab order differs from the prediction at {len(mismatches)} checkpoints, collecting these parts with tab keys")
 
+    focusable_elements: list[dict] = []
+    position = 0  # next predicted element to take over
+    for index in mismatches:
+        if position > 0 and index < position:
+            # already collected with tab keys
+            continue
+        focusable_elements.extend(predicted[position:index + 1])
+        if index < 0:
+            _reset_focus(driver)
+        recorded, resync_index = _record_tab_stops(driver, start_index=index)
+        logger.debug(f"Collected {len(recorded)} elements with tab keys after predicted element {index}")
+        focusable_elements.extend(recorded)
+        position = resync_index if resync_index is not None else len(predicted)
+    focusable_elements.extend(predicted[position:])
     return focusable_elements
 
 def runner_tab(config: ProcessingConfig, driver: WebDriver, results: list,
-               screenshots_folder: Path, url_idx: int) -> Path|None:
+               screenshots_folder: Path, url_idx: int, page_screenshot: PageScreenshot | None = None) -> Path|None:
     global tabpath_checker
     if tabpath_checker is None:
         logger.debug("Setting up tab runner")
@@ -133,7 +197,10 @@ def runner_tab(config: ProcessingConfig, driver: WebDriver, results: list,
     tabpath_checker.inject()
 
     # send tab keys to page to collect all elements focusable by tab key
-    tab_elements = _collect_elements_by_tab_key(driver)
+    if config.tab_mode == TabMode.PREDICTED:
+        tab_elements = _collect_elements_by_prediction(driver)
+    else:
+        tab_elements = _collect_elements_by_tab_key(driver)
     logger.info(f"Found {len(tab_elements)} tabbable elements on page.")
 
     violation_ignores = list(get_ignored_violations())
@@ -163,7 +230,7 @@ def runner_tab(config: ProcessingConfig, driver: WebDriver, results: list,
         logger.debug(f"Error Details: {error_info.get('details', 'No details available')}")
         results.append({'error': error_info['message'], 'status': 'failed'})
 
-    full_page_screenshot_path_outline = Path(config.output) / f"{config.mode.value}_{url_idx}_full_page_screenshot_outline.png"
+    full_page_screenshot_path_outline = Path(config.output) / f"{config.mode.value}_{url_idx}_full_page_screenshot_outline{image_suffix()}"
     logger.debug(f"Taking full-page screenshot and saving to: {full_page_screenshot_path_outline}")
     take_fullpage_screenshot(driver, full_page_screenshot_path_outline)
     tabpath_checker.cleanup()
@@ -0,0 +1,253 @@
+import base64
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from src.image_writer import store_image, write_image
+from src.logger_setup import logger
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+
+class PageScreenshot:
+    """
+    Full-page capture of the current page state.
+
+    The capture is taken once per page state, decoded once on first use,
+    and element screenshots are cropped from it in memory (instead of one browser capture per element).
+    OpenCV and NumPy are imported on first decode.
+    """
+
+    def __init__(self, png_data: bytes):
+        self.png_data = png_data
+        self._image: "ndarray | None" = None
+
+    @property
+    def image(self) -> "ndarray":
+        """
+        The decoded capture as NumPy array (BGR, like OpenCV uses it).
+        """
+        if self._image is None:
+            import cv2
+            import numpy as np
+
+            self._image = cv2.imdecode(np.frombuffer(self.png_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return self._image
+
+    def save(self, path: Path) -> None:
+        """
+        Save the full-page capture in the background (see write_image), the format is taken from the file suffix.
+        A PNG is written with the original bytes (no re-encoding) unless it is downscaled.
+
+        :param path: Path where the screenshot will be saved.
+        """
+        write_image(self.png_data, path, full_page=True)
+
+    def crop(self, rect: dict) -> "ndarray | None":
+        """
+        Crop an area of the capture.
+
+        :param rect: Dict with x, y, width, height in device pixels of the document.
+        :return: The cropped image or None if the area is not part of the capture.
+        """
+        image = self.image
+        if image is None:
+            return None
+        img_height, img_width = image.shape[:2]
+        x1 = max(0, int(round(rect["x"])))
+        y1 = max(0, int(round(rect["y"])))
+        x2 = min(img_width, int(round(rect["x"] + rect["width"])))
+        y2 = min(img_height, int(round(rect["y"] + rect["height"])))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return image[y1:y2, x1:x2]
+
+    def save_element(self, rect: dict, path: Path) -> Path | None:
+        """
+        Crop an element from the capture and store it in the background (see store_image).
+
+        :param rect: Dict with x, y, width, height in device pixels of the document.
+        :param path: Path of the element screenshot.
+        :return: The path the element screenshot is stored at or None if the element could not be cropped.
+        """
+        cropped = self.crop(rect)
+        if cropped is None:
+            return None
+        return store_image(cropped, path)
+
+
+def capture_page(driver: WebDriver) -> PageScreenshot:
+    """
+    Capture the full page (beyond the viewport) of the current page with one CDP call.
+
+    :param driver: Selenium WebDriver instance.
+    :return: The page capture.
+    """
+    # Ensure the current window is active.
+    driver.switch_to.window(driver.current_window_handle)
+
+    #scroll to the top of the page
+    driver.execute_script("window.scrollTo(0, 0);")
+
+    # Capture screenshot from the surface (full page)
+    screenshot_data = driver.execute_cdp_cmd("Page.captureScreenshot", {
+        "captureBeyondViewport": True,
+    })
+    return PageScreenshot(base64.b64decode(screenshot_data["data"]))
+
+
+# language=JS
+script_element_rects = """
+const dpr = window.devicePixelRatio || 1;
+const findElement = (target) => {
+    if (target instanceof Element) return target;
+    const selectors = Array.isArray(target) ? target : [target];
+    let root = document;
+    let el = null;
+    for (const selector of selectors) {
+        if (!root) return null;
+        el = root.querySelector(selector);
+        if (!el) return null;
+        root = el.shadowRoot;
+    }
+    return el;
+};
+return arguments[0].map(target => {
+    const el = findElement(target);
+    if (!el) return null;
+    const rect = el.getBoundingClientRect();
+    const style = window.getComputedStyle(el);
+    return {
+        element: el,
+        x: (rect.left + window.scrollX) * dpr,
+        y: (rect.top + window.scrollY) * dpr,
+        width: rect.width * dpr,
+        height: rect.height * dpr,
+        visible: rect.width > 0 && rect.height > 0 && style.display !== 'none'
+            && style.visibility !== 'hidden' && el.getClientRects().length > 0
+    };
+});
+"""
+
+def get_element_rects(driver: WebDriver, targets: list[WebElement | str | list[str]]) -> list[dict | None]:
+    """
+    Collect the element, its document bounding rect (device pixels) and visibility
+    for all targets in one browser call.
+
+    :param driver: Selenium WebDriver instance.
+    :param targets: WebElements or CSS selectors (list of selectors to step into shadow roots).
+    :return: List with a dict (element, x, y, width, height, visible) per target or None if not found.
+    """
+    if not targets:
+        return []
+    return driver.execute_script(script_element_rects, targets)
+
+
+def save_element_screenshot(page_screenshot: PageScreenshot | None, rect: dict | None, element: WebElement,
+                            index: int, screenshot_path: Path) -> Path:
+    """
+    Save the screenshot of an element, cropped from the page capture.
+    Falls back to a browser capture of the element if no page capture is available
+    or the element is outside the capture.
+
+    :param page_screenshot: The page capture of the current page state.
+    :param rect: The document bounding rect of the element (see get_element_rects).
+    :param element: The WebElement, used as fallback.
+    :param index: Index of the element for log output.
+    :param screenshot_path: Path of the element screenshot (see store_image).
+    :return: The path the screenshot is stored at.
+    """
+    if page_screenshot is not None and rect is not None:
+        stored_path = page_screenshot.save_element(rect, screenshot_path)
+        if stored_path is not None:
+            logger.debug(f"[Element {index}] Screenshot cropped from page capture, saved to: {stored_path}")
+            return stored_path
+    logger.debug(f"[Element {index}] Take screenshot of element")
+    stored_path = store_image(element.screenshot_as_png, screenshot_path)
+    logger.debug(f"[Element {index}] Screenshot saved to: {stored_path}")
+    return stored_path
+
+
+def get_element_image(page_screenshot: PageScreenshot | None, rect: dict | None,
+                      element: WebElement) -> "ndarray | bytes":
+    """
+    Get the image of an element in memory, cropped from the page capture.
+    Falls back to a browser capture of the element (PNG bytes) if no page capture is available
+    or the element is outside the capture.
+
+    :param page_screenshot: The page capture of the current page state.
+    :param rect: The document bounding rect of the element (see get_element_rects).
+    :param element: The WebElement, used as fallback.
+    :return: The cropped image (BGR array) or the PNG bytes of the element capture.
+    """
+    if page_screenshot is not None and rect is not None:
+        cropped = page_screenshot.crop(rect)
+        if cropped is not None:
+            return cropped
+    return element.screenshot_as_png
+
+
+OUTLINE_COLOR = (255, 0, 0)
+LABEL_COLOR = (255, 255, 0)
+LABEL_COLOR_PASSED = (170, 230, 170)
+
+
+def _draw_dotted_rect(pixels: "ndarray", x1: int, y1: int, x2: int, y2: int, color: tuple[int, int, int],
+                      thickness: int = 2, dot: int = 2) -> None:
+    import numpy as np
+
+    height, width = pixels.shape[:2]
+    xs = np.arange(max(x1, 0), min(x2, width))
+    xs = xs[(xs - x1) // dot % 2 == 0]
+    ys = np.arange(max(y1, 0), min(y2, height))
+    ys = ys[(ys - y1) // dot % 2 == 0]
+    for offset in range(thickness):
+        for y in (y1 + offset, y2 - 1 - offset):
+            if 0 <= y < height:
+                pixels[y, xs] = color
+        for x in (x1 + offset, x2 - 1 - offset):
+            if 0 <= x < width:
+                pixels[ys, x] = color
+
+
+def save_outline_screenshot(page_screenshot: PageScreenshot, outlines: list[tuple[dict, str, bool]],
+                            path: Path, offset: int = 3) -> None:
+    """
+    Draw a dotted outline and an index label per element onto a copy of the page capture
+    and save it in the background (see write_image).
+    The page itself is not changed, no second capture is needed.
+
+    :param page_screenshot: The page capture of the current page state.
+    :param outlines: Per element the document bounding rect (device pixels, see get_element_rects),
+                     the label text and if the element missed the check (label highlighted).
+    :param path: Path where the screenshot will be saved.
+    :param offset: Distance of the outline to the element in pixels.
+    """
+    import cv2
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFont
+
+    pixels = cv2.cvtColor(page_screenshot.image, cv2.COLOR_BGR2RGB)
+    for rect, _, _ in outlines:
+        x1 = int(round(rect["x"])) - offset
+        y1 = int(round(rect["y"])) - offset
+        x2 = int(round(rect["x"] + rect["width"])) + offset
+        y2 = int(round(rect["y"] + rect["height"])) + offset
+        _draw_dotted_rect(pixels, x1, y1, x2, y2, OUTLINE_COLOR)
+
+    # labels after the outlines, so they are not covered by outlines of neighbouring elements
+    image = Image.fromarray(pixels)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+    for rect, label, missed in outlines:
+        left, top, right, bottom = draw.textbbox((0, 0), label, font=font)
+        label_width, label_height = right - left + 4, bottom - top + 4
+        x = max(0, int(round(rect["x"])))
+        y = max(0, int(round(rect["y"])) - label_height - offset)
+        draw.rectangle((x, y, x + label_width, y + label_height),
+                       fill=LABEL_COLOR if missed else LABEL_COLOR_PASSED, outline=(0, 0, 0))
+        draw.text((x + 2 - left, y + 2 - top), label, fill=(0, 0, 0), font=font)
+    write_image(cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR), path, full_page=True)
@@ -0,0 +1,63 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from src.logger_setup import logger
+
+# names of the scripts registered as preload per browser session (key is the session id)
+registered_preload_scripts: dict[str, set[str]] = {}
+
+def register_preload_script(driver: WebDriver, name: str, source: str) -> bool:
+    """
+    Register a script to be evaluated on every new document of the browser session.
+    Registration is done only once per session and script name.
+
+    Chrome and Edge are registered via CDP `Page.addScriptToEvaluateOnNewDocument`,
+    if that is not available the BiDi preload script is used.
+
+    :param driver: Selenium WebDriver instance.
+    :param name: Unique name of the script.
+    :param source: JavaScript source of the script.
+    :return: True if the script was registered as preload (now or before), False otherwise.
+    """
+    session_scripts = registered_preload_scripts.setdefault(driver.session_id, set())
+    if name in session_scripts:
+        return True
+    session_scripts.add(name)
+
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        logger.debug(f"Registered preload script '{name}' via CDP")
+        return True
+    except Exception as e:
+        logger.debug(f"CDP preload of script '{name}' not available: {e}")
+
+    try:
+        driver.script.add_preload_script(function_declaration=f"() => {{\n{source}\n}}")
+        logger.debug(f"Registered preload script '{name}' via BiDi")
+        return True
+    except Exception as e:
+        logger.debug(f"BiDi preload of script '{name}' not available: {e}")
+
+    logger.debug(f"Script '{name}' will be injected on demand")
+    return False
+
+def ensure_script(driver: WebDriver, name: str, source: str, probe: str) -> bool:
+    """
+    Make sure a script is available in the current document.
+
+    The script is registered as preload script for the session, so new documents already contain it.
+    A cheap probe checks if the script is defined in the current document
+    (e.g. document loaded before registration, iframes, scripts overwritten by the page),
+    only then the full script is sent to the browser.
+
+    :param driver: Selenium WebDriver instance.
+    :param name: Unique name of the script.
+    :param source: JavaScript source of the script.
+    :param probe: JavaScript expression that is true if the script is already defined.
+    :return: True if the script had to be injected, False if it was already defined.
+    """
+    register_preload_script(driver, name, source)
+    if driver.execute_script(f"return !!({probe});"):
+        return False
+    logger.debug(f"Script '{name}' not defined in current document, inject it")
+    driver.execute_script(source)
+    return True
@@ -0,0 +1,53 @@
+import builtins
+import sys
+import time
+
+# collected import times, entries of (module name, nesting depth, cumulative seconds, self seconds)
+import_times: list[tuple[str, int, float, float]] = []
+_original_import = builtins.__import__
+_start_time = time.perf_counter()
+_stack: list[float] = []
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        import_times.append((name, len(_stack), elapsed, elapsed - children))
+
+
+def start_import_profile() -> None:
+    """
+    Start measuring the time of all following (first time) imports.
+    Call it as early as possible, the breakdown is printed on exit of the program.
+    """
+    global _start_time
+    import atexit
+
+    _start_time = time.perf_counter()
+    builtins.__import__ = _timed_import
+    atexit.register(print_import_profile)
+
+
+def print_import_profile(limit: int = 30) -> None:
+    """
+    Print the import time breakdown (like `python -X importtime`, but also available in the frozen executable).
+
+    :param limit: Number of imports to show, sorted by cumulative time.
+    """
+    builtins.__import__ = _original_import
+    total = sum(entry[2] for entry in import_times if entry[1] == 0)
+    runtime = time.perf_counter() - _start_time
+    print(f"\nStartup profile: {total * 1000:.1f} ms in {len(import_times)} imports, "
+          f"{runtime * 1000:.1f} ms runtime since profile start", file=sys.stderr)
+    print(f"{'cumulative':>12} {'self':>10}  module", file=sys.stderr)
+    for name, depth, cumulative, own in sorted(import_times, key=lambda entry: entry[2], reverse=True)[:limit]:
+        print(f"{cumulative * 1000:9.1f} ms {own * 1000:7.1f} ms  {'  ' * depth}{name}", file=sys.stderr)
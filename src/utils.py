@@ -1,21 +1,89 @@
+import math
 import sys
-import base64
 
 from dataclasses import fields
 from urllib.parse import urlparse
 from pathlib import Path
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import WebDriverException
 
 from src.config import ProcessingConfig, ReportLevel
-from src.css import inject_outline_css
+from src.image_writer import image_suffix
 from src.logger_setup import logger
+from src.page_ready import wait_page_loaded
+from src.screenshot import PageScreenshot, capture_page, save_outline_screenshot
+from src.script_preload import ensure_script
 
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.webdriver import WebDriver
 
+# language=JS
+script_color_functions = """
+function parentWithOpacity(el) {
+    while (el) {
+        const style = window.getComputedStyle(el);
+        const opacity = parseFloat(style.getPropertyValue("opacity"));
+        if (opacity < 1) {
+            return opacity;
+        }
+        el = el.parentElement;
+    }
+    return 1;
+}
+function blendColors(baseColor, overlayColor, alpha) {
+    return [
+        Math.round((1 - alpha) * baseColor[0] + alpha * overlayColor[0]),
+        Math.round((1 - alpha) * baseColor[1] + alpha * overlayColor[1]),
+        Math.round((1 - alpha) * baseColor[2] + alpha * overlayColor[2])
+    ];
+}
+function getComputedColor(el, property, bg_color) {
+    let baseColor = [255, 255, 255];
+    while (el) {
+        const style = window.getComputedStyle(el);
+        const color = style.getPropertyValue(property);
+        let opacity = 1;
+        if (bg_color) {
+            opacity = parentWithOpacity(el) || 1;
+        }
+        if (!bg_color && color === "rgba(0, 0, 0, 0)") {
+          return baseColor;
+        } else if (color.startsWith("rgba")) {
+            const match = color.match(/rgba\\((\\d+), (\\d+), (\\d+), ([0-9.]+)\\)/);
+            if (match) {
+                const r = parseInt(match[1]);
+                const g = parseInt(match[2]);
+                const b = parseInt(match[3]);
+                const alpha = parseFloat(match[4]) * opacity;
+                if (alpha === 1) {
+                    return [r, g, b];
+                } else if (alpha > 0) {
+                    baseColor = blendColors(baseColor, [r, g, b], alpha);
+                }
+            }
+        } else if (color !== "transparent") {
+            const match = color.match(/rgb\\((\\d+), (\\d+), (\\d+)/);
+            if (match) {
+                const r = parseInt(match[1]);
+                const g = parseInt(match[2]);
+                const b = parseInt(match[3]);
+                if (opacity < 1) {
+                    return blendColors(bg_color, [r, g, b], opacity);
+                } else {
+                    return [r, g, b];
+                }
+            }
+        }
+        el = el.parentElement;
+    }
+    return null;
+}
+function getElementColors(el) {
+    const backgroundColor = getComputedColor(el, "background-color", undefined);
+    const foregroundColor = getComputedColor(el, "color", backgroundColor);
+    return [foregroundColor, backgroundColor];
+}
+"""
+
 def get_element_colors(driver: WebDriver, element: WebElement) -> tuple:
     """
     Determines the foreground and background colors of an element using JavaScript.
@@ -24,74 +92,95 @@ def get_element_colors(driver: WebDriver, element: WebElement) -> tuple:
     :param element: The WebElement for which to get the colors.
     :return: A tuple containing the foreground and background colors as RGB tuples.
     """
+    colors = driver.execute_script(script_color_functions + "return getElementColors(arguments[0]);", element)
+    return tuple(colors)
 
-    # language=JS
-    script = """
-    function parentWithOpacity(el) {
-        while (el) {
-            const style = window.getComputedStyle(el);
-            const opacity = parseFloat(style.getPropertyValue("opacity"));
-            if (opacity < 1) {
-                return opacity;
-            }
-            el = el.parentElement;
-        }
-        return 1;
+# language=JS
+script_element_snapshots = script_color_functions + """
+function relativeLuminance(color) {
+    const [r, g, b] = color.map(c => {
+        c = c / 255;
+        return c <= 0.04045 ? c / 12.92 : Math.pow((c + 0.055) / 1.055, 2.4);
+    });
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b;
+}
+function contrastRatio(color1, color2) {
+    const l1 = relativeLuminance(color1);
+    const l2 = relativeLuminance(color2);
+    return (Math.max(l1, l2) + 0.05) / (Math.min(l1, l2) + 0.05);
+}
+function isVisible(el) {
+    const style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || style.visibility === 'collapse') {
+        return false;
     }
-    function blendColors(baseColor, overlayColor, alpha) {
-        return [
-            Math.round((1 - alpha) * baseColor[0] + alpha * overlayColor[0]),
-            Math.round((1 - alpha) * baseColor[1] + alpha * overlayColor[1]),
-            Math.round((1 - alpha) * baseColor[2] + alpha * overlayColor[2])
-        ];
+    if (typeof el.checkVisibility === 'function') {
+        return el.checkVisibility({opacityProperty: true, visibilityProperty: true});
     }
-    function getComputedColor(el, property, bg_color) {
-        let baseColor = [255, 255, 255];
-        while (el) {
-            const style = window.getComputedStyle(el);
-            const color = style.getPropertyValue(property);
-            let opacity = 1;
-            if (bg_color) {
-                opacity = parentWithOpacity(el) || 1;
-            }
-            if (!bg_color && color === "rgba(0, 0, 0, 0)") {
-              return baseColor;
-            } else if (color.startsWith("rgba")) {
-                const match = color.match(/rgba\\((\\d+), (\\d+), (\\d+), ([0-9.]+)\\)/);
-                if (match) {
-                    const r = parseInt(match[1]);
-                    const g = parseInt(match[2]);
-                    const b = parseInt(match[3]);
-                    const alpha = parseFloat(match[4]) * opacity;
-                    if (alpha === 1) {
-                        return [r, g, b];
-                    } else if (alpha > 0) {
-                        baseColor = blendColors(baseColor, [r, g, b], alpha);
-                    }
-                }
-            } else if (color !== "transparent") {
-                const match = color.match(/rgb\\((\\d+), (\\d+), (\\d+)/);
-                if (match) {
-                    const r = parseInt(match[1]);
-                    const g = parseInt(match[2]);
-                    const b = parseInt(match[3]);
-                    if (opacity < 1) {
-                        return blendColors(bg_color, [r, g, b], opacity);
-                    } else {
-                        return [r, g, b];
-                    }
-                }
-            }
-            el = el.parentElement;
-        }
-        return null;
+    return el.getClientRects().length > 0;
+}
+
+const selector = arguments[0];
+const contextSelector = arguments[1];
+const threshold = arguments[2];
+const dpr = window.devicePixelRatio || 1;
+
+let contextFound = true;
+let candidates = document.querySelectorAll(selector);
+if (contextSelector) {
+    const contexts = document.querySelectorAll(contextSelector);
+    if (contexts.length) {
+        const found = new Set();
+        contexts.forEach(context => context.querySelectorAll(selector).forEach(el => found.add(el)));
+        candidates = found;
+    } else {
+        contextFound = false;
     }
-    const backgroundColor = getComputedColor(arguments[0], "background-color", undefined);
-    const foregroundColor = getComputedColor(arguments[0], "color", backgroundColor);
-    return [foregroundColor, backgroundColor];
+}
+
+const elements = [];
+let total = 0;
+candidates.forEach(el => {
+    if (!isVisible(el)) return;
+    const index = total++;
+    const [fg, bg] = getElementColors(el);
+    if (threshold !== null && fg && bg && contrastRatio(fg, bg) >= threshold) return;
+    const rect = el.getBoundingClientRect();
+    elements.push({
+        index: index,
+        element: el,
+        path: getCSSPath(el),
+        text: (el.innerText || '').trim(),
+        fg: fg,
+        bg: bg,
+        x: (rect.left + window.scrollX) * dpr,
+        y: (rect.top + window.scrollY) * dpr,
+        width: rect.width * dpr,
+        height: rect.height * dpr,
+        visible: true
+    });
+});
+return {context_found: contextFound, total: total, elements: elements};
+"""
+
+def get_element_snapshots(driver: WebDriver, selector: str, context: str | None = None,
+                          threshold: float | None = None) -> dict:
     """
-    colors = driver.execute_script(script, element)
-    return tuple(colors)
+    Collect a snapshot of all visible elements matching the selector (inside the context) in one browser call.
+    Each snapshot contains the element, its CSS path, text, foreground and background colors
+    and the document bounding rect (device pixels).
+    The getCSSPath function has to be defined in the page (see define_get_path_script).
+
+    If a threshold is given, elements with a contrast ratio that meets it are dropped in the browser,
+    only failing elements are returned (the index is still the index of all visible elements).
+
+    :param driver: Selenium WebDriver instance.
+    :param selector: CSS selector of the elements.
+    :param context: Optional CSS selector of the page parts to search in.
+    :param threshold: Optional contrast ratio threshold to drop passing elements in the browser.
+    :return: Dict with context_found, total (count of visible elements) and the list of element snapshots.
+    """
+    return driver.execute_script(script_element_snapshots, selector, context or None, threshold)
 
 def log_colored_char(color1: tuple[int, int, int], color2: tuple[int, int, int], char:str = "⬤"):
     """
@@ -111,7 +200,8 @@ def log_colored_char(color1: tuple[int, int, int], color2: tuple[int, int, int],
 
 def define_get_path_script(driver: WebDriver) -> None:
     """
-    Defines the JavaScript function getXPath in the browser context, if it does not already exist."
+    Defines the JavaScript functions getXPath and getCSSPath in the browser context, if they do not already exist.
+    The functions are preloaded once per session for all new documents.
 
     :param driver: Selenium WebDriver instance.
     """
@@ -164,7 +254,7 @@ def define_get_path_script(driver: WebDriver) -> None:
         };
     }
     """
-    driver.execute_script(script)
+    ensure_script(driver, "get_path", script, "typeof getXPath === 'function' && typeof getCSSPath === 'function'")
 
 
 def get_xpath(driver: WebDriver, element: WebElement) -> str:
@@ -188,35 +278,73 @@ def get_csspath(driver: WebDriver, element: WebElement) -> str:
     return driver.execute_script("return getCSSPath(arguments[0]);", element)
 
 # language=JS
-script_viewport_size = """
-function getMaxDimensions() {
-    // Calculate maximum absolute bottom from all elements
-    const allElements = document.querySelectorAll('*');
+script_page_extent = """
+// the extent of the containers is cached until the next DOM change or resize of the window
+if (!window._pageExtent) {
+    const pageExtent = { containers: null };
+    const invalidate = () => { pageExtent.containers = null; };
+    new MutationObserver(invalidate).observe(document, { childList: true, subtree: true, attributes: true });
+    window.addEventListener('resize', invalidate);
+    window._pageExtent = pageExtent;
+}
+
+function getContainersExtent() {
+    // only positioned and overflow containers can extend beyond the document scroll size,
+    // their content is clipped or taken out of the flow
+    const skippedTags = new Set(['SCRIPT', 'STYLE', 'TEMPLATE', 'NOSCRIPT', 'svg']);
     let maxBottom = 0;
-    allElements.forEach(element => {
-        const rect = element.getBoundingClientRect();
-        const absoluteBottom = rect.bottom + window.scrollY;
-        maxBottom = Math.max(maxBottom, absoluteBottom);
-    });
-    
-    // Get body dimensions
-    const bodyWidth = document.body.scrollWidth;
-    const bodyHeight = document.body.scrollHeight;
-    
-    return {
-    scrollWidth: bodyWidth,
-    // Use the maximum of body height or calculated maximum element bottom
-    scrollHeight: Math.max(maxBottom, bodyHeight),
-    browserUIWidth: window.outerWidth - window.innerWidth,
-    browserUIHeight: window.outerHeight - window.innerHeight
+    const measure = element => {
+        const style = window.getComputedStyle(element);
+        // hidden subtrees have no extent
+        if (style.display === 'none') return NodeFilter.FILTER_REJECT;
+        const positioned = style.position === 'absolute' || style.position === 'fixed';
+        const overflow = style.overflowY !== 'visible';
+        if (positioned || overflow) {
+            const rect = element.getBoundingClientRect();
+            const top = rect.top + window.scrollY;
+            maxBottom = Math.max(maxBottom, rect.bottom + window.scrollY, overflow ? top + element.scrollHeight : 0);
+        }
+        // overflow containers are walked as well, an outer container (app shell) can clip an inner scrolling one
+        return skippedTags.has(element.tagName) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_SKIP;
     };
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT, { acceptNode: measure });
+    walker.nextNode();
+    return { scrollHeight: maxBottom };
 }
 
 // Reset scroll position and return dimensions
 window.scrollTo(0, 0);
-return getMaxDimensions();
+if (!window._pageExtent.containers) {
+    window._pageExtent.containers = getContainersExtent();
+}
+return {
+    scrollWidth: document.body.scrollWidth,
+    scrollHeight: Math.max(window._pageExtent.containers.scrollHeight, document.body.scrollHeight),
+    browserUIWidth: window.outerWidth - window.innerWidth,
+    browserUIHeight: window.outerHeight - window.innerHeight
+};
 """
 
+def measure_page_extent(driver: WebDriver) -> dict:
+    """
+    Measure the size of the page content (CSS pixels) and the size of the browser UI.
+    The document content size is taken from CDP `Page.getLayoutMetrics`, it does not cover content
+    scrolling inside containers (e.g. an app shell with a fixed body height), so the positioned and
+    overflow containers are measured in the page as well (cached until the next DOM change).
+
+    :param driver: The Selenium WebDriver instance.
+    :return: Dict with scrollWidth, scrollHeight, browserUIWidth and browserUIHeight.
+    """
+    dimensions = driver.execute_script(script_page_extent)
+    try:
+        metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+        content_size = metrics.get("cssContentSize") or metrics["contentSize"]
+        dimensions["scrollWidth"] = max(dimensions["scrollWidth"], math.ceil(content_size["width"]))
+        dimensions["scrollHeight"] = max(dimensions["scrollHeight"], math.ceil(content_size["height"]))
+    except WebDriverException as e:
+        logger.debug(f"CDP layout metrics not available, using page measurement: {e.msg}")
+    return dimensions
+
 def set_window_size_to_viewport(driver: WebDriver) -> None:
     """
     Set the browser window size to match the viewport dimensions.
@@ -224,9 +352,9 @@ def set_window_size_to_viewport(driver: WebDriver) -> None:
 
     :param driver: The Selenium WebDriver instance.
     """
-    dimensions = driver.execute_script(script_viewport_size)
-    scroll_width = dimensions["scrollWidth"]
-    scroll_height = dimensions["scrollHeight"]
+    dimensions = measure_page_extent(driver)
+    scroll_width = math.ceil(dimensions["scrollWidth"])
+    scroll_height = math.ceil(dimensions["scrollHeight"])
     browser_ui_height = dimensions["browserUIHeight"]
     browser_ui_width = dimensions["browserUIWidth"]
     scroll_width += browser_ui_width  # Adjust for browser UI width
@@ -245,60 +373,11 @@ def create_color_span(color: str) -> str:
     return f"<span class='color-point' style='color: {color};'>⬤</span> {color} "
 
 
-def relative_luminance(color: tuple[int, int, int]) -> float:
-    """
-    Calculate the relative luminance of a color.
-    The formula is based on the WCAG 2.0 guidelines.
-
-    The formula is:
-    L = 0.2126 * R + 0.7152 * G + 0.0722 * B
-    where R, G, and B are the normalized RGB values (0-1).
-
-    The RGB values are normalized to the range 0-1 by dividing by 255.
-    The gamma correction is applied to the RGB values before calculating the luminance.
-    The gamma correction is defined as:
-    R = R / 12.92 if R <= 0.04045 else ((R + 0.055) / 1.055) ** 2.4
-    G = G / 12.92 if G <= 0.04045 else ((G + 0.055) / 1.055) ** 2.4
-    B = B / 12.92 if B <= 0.04045 else ((B + 0.055) / 1.055) ** 2.4
-
-    The relative luminance is then calculated using the formula above.
-
-    :param color: The color as an RGB tuple (R, G, B).
-    :return: The relative luminance of the color.
-    """
-    r, g, b = [c / 255.0 for c in color]  # normalization to 0-1 for calculation
-    r, g, b = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in (r, g, b)]
-    return 0.2126 * r + 0.7152 * g + 0.0722 * b
-
-
-def contrast_ratio(l1: float, l2: float) -> float:
-    """
-    Calculate the contrast ratio between two luminance values.
-    :param l1: luminance of the first color
-    :param l2: luminance of the second color
-    :return: contrast ratio
-    """
-    l1, l2 = max(l1, l2), min(l1, l2)
-    return (l1 + 0.05) / (l2 + 0.05)
-
 def get_embedded_file_path(filename):
     if hasattr(sys, '_MEIPASS'):
         return Path(sys._MEIPASS) / filename
     return filename
 
-def take_element_screenshot(driver: WebDriver, element: WebElement, index: int, screenshot_path: Path) -> None:
-    """
-    Take a screenshot of a specific WebElement and save it to the specified path.
-    :param driver: Selenium WebDriver instance.
-    :param element: The WebElement to take a screenshot of.
-    :param index: Index of the element for log output.
-    :param screenshot_path: Path where the screenshot will be saved.
-    """
-    logger.debug(f"[Element {index}] Take screenshot of element")
-    element.screenshot(str(screenshot_path))
-    logger.debug(f"[Element {index}] Screenshot saved to: {screenshot_path}")
-
-
 def get_full_base_url(driver: WebDriver) -> str:
     parsed_url = urlparse(driver.current_url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
@@ -307,8 +386,7 @@ def get_full_base_url(driver: WebDriver) -> str:
 def call_url(driver: WebDriver, url: str) -> None:
     """
     Call a URL in the browser.
-    Wait until the page is fully loaded before proceeding.
-    This is done by checking the document's ready state (timeout 10 seconds).
+    Wait until the page is fully loaded before proceeding (see wait_page_loaded).
 
     :param driver: Selenium WebDriver instance.
     :param url: The URL to call.
@@ -323,52 +401,6 @@ def call_url(driver: WebDriver, url: str) -> None:
     driver.get(url)
     wait_page_loaded(driver)
 
-def wait_page_loaded(driver: WebDriver, element_selector: str = None, timeout: int = 5, idle_time: float = 0.5) -> None:
-    # wait for document ready state to be complete
-    WebDriverWait(driver, timeout).until(
-        lambda d: d.execute_script("return document.readyState === 'complete'")
-    )
-
-    # wait for all resources to be loaded
-    WebDriverWait(driver, timeout).until(
-        lambda d: d.execute_script(
-            "return window.performance.getEntriesByType('resource').every(r => r.responseEnd > 0)"
-        )
-    )
-
-    # if an element selector is provided, wait for the element to be present
-    if element_selector:
-        WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, element_selector))
-        )
-    else:
-        # wait for the page to be idle (no mutations for a certain time)
-        # Language=JS
-        script = """
-            if (!window._lastMutationTime) {
-                window._lastMutationTime = Date.now();
-                if (!window._mutationObserver) {
-                    window._mutationObserver = new MutationObserver(function() {
-                        window._lastMutationTime = Date.now();
-                    });
-                    window._mutationObserver.observe(document.body, {
-                        childList: true,
-                        subtree: true,
-                        attributes: true
-                    });
-                }
-            }
-        """
-        driver.execute_script(script)
-        try:
-            WebDriverWait(driver, timeout).until(
-                lambda d: d.execute_script(
-                    "return Date.now() - window._lastMutationTime >= arguments[0] * 1000;", idle_time
-                )
-            )
-        except TimeoutException:
-            pass
-
 def filter_args_for_dataclass(cls, args_dict):
     cls_fields = {f.name for f in fields(cls)}
     return {key: value for key, value in args_dict.items() if key in cls_fields}
@@ -385,27 +417,17 @@ def trim_string_to_length(s: str, length: int) -> str:
         return s[:length - 3] + "..."
     return s
 
-def take_fullpage_screenshot(driver: WebDriver, screenshot_path: Path) -> None:
+def take_fullpage_screenshot(driver: WebDriver, screenshot_path: Path) -> PageScreenshot:
     """
     Take a full-page screenshot of the current page and save it to the specified path.
 
     :param driver: Selenium WebDriver instance.
     :param screenshot_path: Path where the full-page screenshot will be saved.
+    :return: The page capture, can be used to crop element screenshots of the same page state.
     """
-    # Ensure the current window is active.
-    driver.switch_to.window(driver.current_window_handle)
-
-    #scroll to the top of the page
-    driver.execute_script("window.scrollTo(0, 0);")
-
-    # Capture screenshot from the surface (full page)
-    screenshot_data = driver.execute_cdp_cmd("Page.captureScreenshot", {
-        "captureBeyondViewport": True,
-    })
-
-    # Save the screenshot to the full_page_screenshot_path
-    with open(screenshot_path, "wb") as file:
-        file.write(base64.b64decode(screenshot_data["data"]))
+    page_screenshot = capture_page(driver)
+    page_screenshot.save(screenshot_path)
+    return page_screenshot
 
 
 def count_violations(results):
@@ -487,82 +509,50 @@ def setting_var(context: dict, name: str, value: str | dict | object, override:
     return False
 
 
-CSS_OUTLINE_CLASS = "contrat_checker--outline"
-CSS_LABEL_CLASS = "contrat_checker--label"
-
-def outline_elements_for_screenshot(config: ProcessingConfig, driver: WebDriver, elements: list[WebElement],
-                                    missed_contrast_elements: list, url_idx: int) -> Path:
+def outline_elements_for_screenshot(config: ProcessingConfig, driver: WebDriver, rects: list[dict],
+                                    missed_contrast_elements: list, url_idx: int,
+                                    element_indices: list[int] | None = None,
+                                    page_screenshot: PageScreenshot | None = None) -> Path:
     """
     Outline elements in the screenshot and save the full-page screenshot with outlines.
+    The outlines and labels are drawn onto the page capture, the page itself is not changed.
 
     :param config: ProcessingConfig instance containing configuration settings.
-    :param driver: Selenium WebDriver instance.
-    :param elements: List of WebElements to outline.
+    :param driver: Selenium WebDriver instance, used to capture the page if no capture is given.
+    :param rects: Element and document bounding rect (device pixels) per element to outline (see get_element_rects).
     :param missed_contrast_elements: List of elements that missed contrast checks.
     :param url_idx: Index of the URL being processed, used for naming the screenshot file.
+    :param element_indices: Optional index (label) per element, default is the position in the rects list.
+    :param page_screenshot: Capture of the current page state, the outlines are drawn onto it.
     :return: Path to the full-page screenshot with outlines.
     """
-
-    inject_outline_css(driver)
-
-    # reset scrolling for accurate positioning of outlines
-    driver.execute_script("window.scrollTo(0, 0);")
-
-    full_page_screenshot_path_outline = Path(config.output) / f"{config.mode.value}_{url_idx}_full_page_screenshot_outline.png"
-    logger.debug(f"Taking full-page screenshot with outlines and saving to: {full_page_screenshot_path_outline}")
-
-    # language=JS
-    outline_elements_script = """
-        const elements = arguments[0];
-        const labels = arguments[1];
-        const outlineClass = arguments[2];
-        const labelClass = arguments[3];
-        elements.forEach((el, idx) => {
-            el.classList.add(outlineClass);
-            const label = document.createElement('div');
-            label.textContent = labels[idx];
-            label.className = labelClass;
-            const rect = el.getBoundingClientRect();
-            label.style.left = `${rect.left + window.scrollX}px`;
-            label.style.top = `${Math.max(0, rect.top + window.scrollY - 20)}px`;
-            document.body.appendChild(label);
-        });    
-    """
-
-    # language=JS
-    cleanup_script = f"""
-        document.querySelectorAll('.{CSS_OUTLINE_CLASS}, .{CSS_LABEL_CLASS}')
-            .forEach(el => el.classList.contains('{CSS_OUTLINE_CLASS}')
-             ? el.classList.remove('{CSS_OUTLINE_CLASS}')
-             : el.remove());
-    """
-
-    element_indices: dict[WebElement, list[int]] = {}
-    for index, element in enumerate(elements):
-        element_indices.setdefault(element, []).append(index)
-
-    elements_to_process = []
-    labels = []
-    for element, indices in element_indices.items():
-        missed_element_present = (elements == missed_contrast_elements) or any(element == missed for missed in missed_contrast_elements)
-        report_invalid_only = config.report_level == ReportLevel.INVALID
+    full_page_screenshot_path_outline = Path(config.output) / f"{config.mode.value}_{url_idx}_full_page_screenshot_outline{image_suffix()}"
+    logger.debug(f"Drawing outlines into full-page screenshot and saving to: {full_page_screenshot_path_outline}")
+
+    rect_by_element: dict[WebElement, dict] = {}
+    indices_by_element: dict[WebElement, list[int]] = {}
+    for position, rect in enumerate(rects):
+        index = element_indices[position] if element_indices else position
+        rect_by_element.setdefault(rect["element"], rect)
+        indices_by_element.setdefault(rect["element"], []).append(index)
+
+    missed_elements = set(missed_contrast_elements)
+    report_invalid_only = config.report_level == ReportLevel.INVALID
+    outlines = []
+    for element, indices in indices_by_element.items():
+        missed_element_present = element in missed_elements
         if report_invalid_only and not missed_element_present:
             logger.debug(f"Element {indices} is not in missed_contrast_elements and invalid_only mode is set. Skipping outline.")
             continue
-        label = f"⚠️{','.join(map(str, indices))}" if element in missed_contrast_elements else f"✓{','.join(map(str, indices))}"
-        elements_to_process.append(element)
-        labels.append(label)
+        label = f"{'!' if missed_element_present else ''}{','.join(map(str, indices))}"
+        outlines.append((rect_by_element[element], label, missed_element_present))
 
-    logger.info(f"Processing {len(elements_to_process)} elements for outlining.")
+    logger.info(f"Processing {len(outlines)} elements for outlining.")
     try:
-        driver.execute_script(outline_elements_script, elements_to_process, labels, CSS_OUTLINE_CLASS, CSS_LABEL_CLASS)
-        take_fullpage_screenshot(driver, full_page_screenshot_path_outline)
+        if page_screenshot is None:
+            page_screenshot = capture_page(driver)
+        save_outline_screenshot(page_screenshot, outlines, full_page_screenshot_path_outline)
     except WebDriverException as e:
         logger.error(f"Failed to outline elements: {e}")
-    finally:
-        try:
-            driver.execute_script(cleanup_script)
-        except WebDriverException as e:
-            logger.error(f"Failed to clean up outlines and labels: {e}")
 
     return full_page_screenshot_path_outline
@@ -2,6 +2,7 @@ import sys
 import unittest
 from io import StringIO
 from unittest.mock import patch, MagicMock
+from selenium.common.exceptions import TimeoutException
 from src.actions.script_action import log_script
 from src.config import ProcessingConfig
 from src.ignore_violations import get_ignored_violations
@@ -164,19 +165,19 @@ class TestActions(unittest.TestCase):
             mock_sleep.assert_called_once_with(60)
 
         mock_driver = MagicMock()
-        with patch('src.actions.wait_action.WebDriverWait') as mock_wait:
-            mock_until = MagicMock()
-            mock_wait.return_value.until = mock_until
-
-            with patch('src.actions.wait_action.EC.presence_of_element_located') as mock_presence:
-                action = {"params": "#my-element"}
-                wait_action(self.config, mock_driver, action)
-                mock_presence.assert_called_once()
-
-            with patch('src.actions.wait_action.EC.staleness_of') as mock_staleness:
-                action = {"params": "!#my-element"}
-                wait_action(self.config, mock_driver, action)
-                mock_staleness.assert_called_once()
+        with patch('src.actions.wait_action.wait_for_selector', return_value=True) as mock_wait_for_selector:
+            action = {"params": "#my-element"}
+            wait_action(self.config, mock_driver, action)
+            mock_wait_for_selector.assert_called_once_with(mock_driver, "#my-element", timeout=10)
+
+        with patch('src.actions.wait_action.wait_for_selector', return_value=True) as mock_wait_for_selector:
+            action = {"params": "!#my-element"}
+            wait_action(self.config, mock_driver, action)
+            mock_wait_for_selector.assert_called_once_with(mock_driver, "#my-element", present=False, timeout=10)
+
+        with patch('src.actions.wait_action.wait_for_selector', return_value=False):
+            with self.assertRaises(TimeoutException):
+                wait_action(self.config, mock_driver, {"params": "#my-element"})
 
         action = {"params": None}
         with patch('src.actions.wait_action.wait_page_loaded') as mock_wait_page_loaded:
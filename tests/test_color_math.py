@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+
+from src.color_math import contrast_ratio, contrast_ratio_colors, relative_luminance, relative_luminance_array, \
+    srgb_to_lab_array, lab_to_srgb_array, luminance_to_lightness
+
+
+def reference_luminance(color):
+    r, g, b = [c / 255.0 for c in color]
+    r, g, b = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in (r, g, b)]
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+class TestColorMath(unittest.TestCase):
+
+    def setUp(self):
+        self.colors = [(0, 0, 0), (255, 255, 255), (118, 118, 118), (10, 200, 30), (255, 0, 128)]
+
+    def test_scalar_luminance(self):
+        for color in self.colors:
+            self.assertAlmostEqual(relative_luminance(color), reference_luminance(color))
+        # float channels are calculated, not looked up
+        self.assertAlmostEqual(relative_luminance((12.5, 100.2, 3.0)), reference_luminance((12.5, 100.2, 3.0)))
+
+    def test_array_luminance(self):
+        luminance = relative_luminance_array(np.array(self.colors))
+        self.assertEqual(luminance.shape, (len(self.colors),))
+        for color, value in zip(self.colors, luminance):
+            self.assertAlmostEqual(value, reference_luminance(color))
+
+    def test_contrast(self):
+        self.assertAlmostEqual(contrast_ratio(relative_luminance((0, 0, 0)), relative_luminance((255, 255, 255))), 21.0)
+        ratios = contrast_ratio_colors(np.array(self.colors), np.array([(255, 255, 255)]))
+        expected = [contrast_ratio(relative_luminance(color), 1.0) for color in self.colors]
+        np.testing.assert_allclose(ratios, expected)
+
+    def test_lab_round_trip(self):
+        colors = np.array(self.colors)
+        lab = srgb_to_lab_array(colors)
+        np.testing.assert_allclose(lab[1], [100.0, 0.0, 0.0], atol=1e-9)
+        np.testing.assert_array_equal(lab_to_srgb_array(lab), colors)
+        np.testing.assert_allclose(luminance_to_lightness(relative_luminance_array(colors)), lab[:, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
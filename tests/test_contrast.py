@@ -0,0 +1,61 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from src.config import ColorExtraction, ProcessingConfig
+from src.contrast import get_dominant_colors_from_image, extract_image_colors
+
+
+class TestContrast(unittest.TestCase):
+
+    def setUp(self):
+        # background with a block of "text" and an anti aliasing border in between
+        self.image = np.zeros((40, 100, 3), dtype=np.uint8)
+        self.image[:] = (240, 240, 245)
+        self.image[10:30, 10:90] = (120, 130, 200)
+        self.image[12:28, 12:88] = (30, 60, 200)
+
+    def test_histogram_colors(self):
+        colors = get_dominant_colors_from_image(self.image)
+        self.assertEqual(colors[:2], [(240, 240, 245), (30, 60, 200)])
+
+    def test_histogram_honours_mask(self):
+        mask = np.zeros(self.image.shape[:2], dtype=np.uint8)
+        mask[12:28, 12:88] = 255
+        self.assertEqual(get_dominant_colors_from_image(self.image, mask), [(30, 60, 200)])
+
+    def test_histogram_matches_kmeans(self):
+        histogram = get_dominant_colors_from_image(self.image)
+        kmeans = get_dominant_colors_from_image(self.image, extraction=ColorExtraction.KMEANS)
+        # K-Means centers are truncated to int
+        np.testing.assert_allclose(histogram, kmeans, atol=1)
+
+    def test_histogram_low_contrast_colors(self):
+        # text and background closer than the seed distance (#777 on #888, about 1.3:1)
+        for background, text in (((136, 136, 136), (119, 119, 119)), ((100, 100, 220), (90, 90, 200))):
+            image = np.zeros((40, 100, 3), dtype=np.uint8)
+            image[:] = background
+            image[12:28, 12:88] = text
+            for extraction in ColorExtraction:
+                colors = get_dominant_colors_from_image(image, extraction=extraction)
+                np.testing.assert_allclose(colors[:2], [background, text], atol=1)
+
+    def test_color_extraction_from_string(self):
+        # overrides of an action (e.g. @analyse_contrast) pass the plain value
+        config = ProcessingConfig(color_extraction="kmeans")
+        self.assertEqual(config.color_extraction, ColorExtraction.KMEANS)
+
+    def test_no_pixels(self):
+        with self.assertRaises(ValueError):
+            get_dominant_colors_from_image(self.image, np.zeros(self.image.shape[:2], dtype=np.uint8))
+
+    def test_extract_image_colors_from_png_bytes(self):
+        bgr = cv2.cvtColor(self.image, cv2.COLOR_RGB2BGR)
+        png = cv2.imencode(".png", bgr)[1].tobytes()
+        self.assertEqual(extract_image_colors(png), extract_image_colors(bgr))
+        self.assertEqual(extract_image_colors(png)[:2], [(240, 240, 245), (30, 60, 200)])
+
+
+if __name__ == '__main__':
+    unittest.main()
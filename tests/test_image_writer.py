@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.config import ImageFormat, ScreenshotStore
+from src.image_writer import configure_image_writer, configure_screenshot_store, flush_images, image_suffix, \
+    store_image, stored_image_counts, write_image
+
+
+class TestImageWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.image = np.zeros((400, 100, 3), dtype=np.uint8)
+        self.image[:, 50:] = (0, 0, 255)
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name)
+
+    def tearDown(self):
+        configure_image_writer(ImageFormat.PNG, 85, 0)
+        configure_screenshot_store(ScreenshotStore.HASHED)
+        self.folder.cleanup()
+
+    def test_image_suffix(self):
+        configure_image_writer(ImageFormat.JPEG, 85, 0)
+        self.assertEqual(image_suffix(), ".jpg")
+        configure_image_writer(ImageFormat.WEBP, 85, 0)
+        self.assertEqual(image_suffix(), ".webp")
+
+    def test_png_bytes_written_unchanged(self):
+        png = cv2.imencode(".png", self.image)[1].tobytes()
+        write_image(png, self.path / "page.png", full_page=True)
+        flush_images()
+        self.assertEqual((self.path / "page.png").read_bytes(), png)
+
+    def test_webp_written(self):
+        write_image(self.image, self.path / "element.webp")
+        flush_images()
+        self.assertEqual(cv2.imread((self.path / "element.webp").as_posix()).shape, (400, 100, 3))
+
+    def test_full_page_downscaled(self):
+        configure_image_writer(ImageFormat.JPEG, 85, 200)
+        write_image(self.image, self.path / "page.jpg", full_page=True)
+        write_image(self.image, self.path / "element.jpg")
+        flush_images()
+        self.assertEqual(cv2.imread((self.path / "page.jpg").as_posix()).shape, (200, 50, 3))
+        self.assertEqual(cv2.imread((self.path / "element.jpg").as_posix()).shape, (400, 100, 3))
+
+    def test_hashed_store_writes_identical_images_once(self):
+        configure_screenshot_store(ScreenshotStore.HASHED, self.path / "blobs")
+        first = store_image(self.image, self.path / "page_1_link_1.png")
+        second = store_image(self.image.copy(), self.path / "page_2_link_1.png")
+        other = store_image(self.image[:200], self.path / "page_2_link_2.png")
+        flush_images()
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(first.parent.parent, self.path / "blobs")
+        self.assertEqual(first.parent.name, first.stem[:2])
+        self.assertEqual(stored_image_counts(), (2, 1))
+        self.assertEqual(len(list((self.path / "blobs").rglob("*.png"))), 2)
+
+    def test_files_store_writes_path(self):
+        configure_screenshot_store(ScreenshotStore.FILES)
+        path = store_image(self.image, self.path / "page_1_link_1.png")
+        flush_images()
+        self.assertEqual(path, self.path / "page_1_link_1.png")
+        self.assertTrue(path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.config import ProcessingConfig
+from src.logger_setup import logger
+from src.processing import merge_worker_results, results_file_path, split_actions_for_workers
+from src.results_stream import ResultsWriter, read_results
+
+
+def url(path: str) -> dict:
+    return {'type': 'url', 'name': 'url', 'url': path}
+
+def action(name: str) -> dict:
+    return {'type': 'action', 'name': name, 'params': None}
+
+
+class TestSplitActionsForWorkers(unittest.TestCase):
+
+    def test_split_keeps_order_and_following_actions(self):
+        actions = [action('ignore'), url('/a'), action('click'), url('/b'), url('/c'), action('analyse'), url('/d')]
+        prelude, chunks = split_actions_for_workers(actions, 2)
+
+        self.assertEqual(prelude, [action('ignore')])
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0], [url('/a'), action('click'), url('/b')])
+        self.assertEqual(chunks[1], [url('/c'), action('analyse'), url('/d')])
+
+    def test_split_limited_by_inputs(self):
+        prelude, chunks = split_actions_for_workers([url('/a'), url('/b')], 8)
+        self.assertEqual(prelude, [])
+        self.assertEqual(chunks, [[url('/a')], [url('/b')]])
+
+    def test_split_without_urls(self):
+        actions = [action('navigate'), action('analyse')]
+        prelude, chunks = split_actions_for_workers(actions, 4)
+        self.assertEqual(prelude, [])
+        self.assertEqual(chunks, [actions])
+
+
+class TestMergeWorkerResults(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.config = ProcessingConfig(output=self.folder.name)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def write_worker(self, worker_idx: int, indexes: list[int], finish: bool = True) -> dict:
+        path = Path(self.folder.name) / f"worker_{worker_idx}" / "check_results.jsonl"
+        path.parent.mkdir()
+        writer = ResultsWriter(path)
+        writer.start("2025-01-01 10:00:00", "https://example.com")
+        for index in indexes:
+            writer.add({"index": index, "url": f"https://example.com/{worker_idx}/{index}"})
+        if finish:
+            writer.finish("https://example.com", [])
+        writer.close()
+        return {"base_url": "https://example.com", "results_file": path.as_posix(), "total_inputs": len(indexes),
+                "wait_time": 0, "browser_console_log": []}
+
+    def test_failed_worker_keeps_partial_results(self):
+        chunks = [[url('/a'), url('/b')], [url('/c'), url('/d'), url('/e')], [url('/f')]]
+        sessions = [self.write_worker(0, [1, 2]), None, self.write_worker(2, [1])]
+        # worker 1 crashed after its first page
+        self.write_worker(1, [1], finish=False)
+
+        results_file = results_file_path(self.config)
+        with self.assertLogs(logger, level="WARNING") as logs:
+            session_data = merge_worker_results(self.config, chunks, sessions, "2025-01-01 10:00:00", results_file)
+        self.assertIn("[Worker 1] failed", logs.output[0])
+        self.assertIn("/c to /e", logs.output[0])
+
+        inputs = list(read_results(results_file)["inputs"])
+        self.assertEqual(session_data["total_inputs"], 5)
+        self.assertEqual([entry.get("index") for entry in inputs], [1, 2, 3, None, 4])
+        self.assertEqual(inputs[2]["url"], "https://example.com/1/1")
+        self.assertTrue(inputs[3]["failed"])
+        self.assertEqual(inputs[4]["url"], "https://example.com/2/1")
+
+    def test_all_workers_failed(self):
+        chunks = [[url('/a')], [url('/b')]]
+        results_file = results_file_path(self.config)
+        with self.assertLogs(logger, level="WARNING"):
+            session_data = merge_worker_results(self.config, chunks, [None, None], "2025-01-01 10:00:00", results_file)
+        self.assertIsNone(session_data)
+        self.assertEqual(read_results(results_file)["total_inputs"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from src.color_math import contrast_ratio, relative_luminance
+from src.config import ProcessingConfig, ColorSuggestion
+from src.recommend_colors import suggest_wcag_colors, _cached_suggestions, _solve_wcag_colors
+from src.utils import hex_to_rgb
+
+
+class TestRecommendColors(unittest.TestCase):
+
+    def setUp(self):
+        self.config = ProcessingConfig()
+
+    def assert_suggestions(self, suggestions, threshold):
+        self.assertTrue(0 < len(suggestions) <= 3)
+        for suggestion in suggestions:
+            color1, color2 = (hex_to_rgb(color) for color in suggestion["colors"])
+            ratio = contrast_ratio(relative_luminance(color1), relative_luminance(color2))
+            self.assertGreaterEqual(ratio, threshold)
+            self.assertAlmostEqual(ratio, suggestion["contrast"])
+
+    def test_suggestions_meet_threshold(self):
+        result = {}
+        suggestions = suggest_wcag_colors(self.config, result, (119, 119, 119), (255, 255, 255))
+        self.assertIs(result["color_suggestions"], suggestions)
+        self.assertTrue(0 < len(suggestions) <= 3)
+        self.assert_suggestions(suggestions, self.config.contrast_threshold)
+
+    def test_lightness_suggestions(self):
+        config = ProcessingConfig(color_suggestion=ColorSuggestion.LIGHTNESS, contrast_threshold=7)
+        for color1, color2 in [((119, 119, 119), (255, 255, 255)), ((255, 255, 255), (0, 120, 255)),
+                               ((0, 0, 255), (255, 0, 0)), ((128, 128, 128), (128, 128, 128))]:
+            self.assert_suggestions(suggest_wcag_colors(config, {}, color1, color2), 7)
+        # the lighter color stays the lighter one, the nearest solution keeps white
+        self.assertEqual(_solve_wcag_colors((255, 255, 255), (119, 119, 119))[0][:2], ("#ffffff", "#767676"))
+
+    def test_lightness_suggestions_deterministic(self):
+        self.assertEqual(_solve_wcag_colors((200, 60, 60), (230, 230, 240)),
+                         _solve_wcag_colors((200, 60, 60), (230, 230, 240)))
+
+    def test_alternate_flag_selects_rgb(self):
+        self.assertEqual(ProcessingConfig(alternate_color_suggestion=True).color_suggestion, ColorSuggestion.RGB)
+        self.assertEqual(ProcessingConfig(color_suggestion="lightness").color_suggestion, ColorSuggestion.LIGHTNESS)
+
+    def test_suggestions_cached(self):
+        _cached_suggestions.cache_clear()
+        first = suggest_wcag_colors(self.config, {}, [100, 100, 100], [150, 150, 150])
+        second = suggest_wcag_colors(self.config, {}, (100, 100, 100), (150, 150, 150))
+        self.assertEqual(first, second)
+        info = _cached_suggestions.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
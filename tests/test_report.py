@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from jinja2 import FileSystemLoader, ModuleLoader
+
+from src.report import TEMPLATE_FOLDER, compile_report_templates, create_report_environment
+
+
+class TestReportTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self.config = SimpleNamespace(debug=False, output="output")
+        self.input_data = {
+            "index": 1,
+            "title": "Start <page>",
+            "url": "https://example.com",
+            "config": {"mode": "check", "runner": "contrast", "resolution_width": 1920, "resolution_height": 1080},
+            "results": [{
+                "element_index": 1,
+                "element_path": "body > a",
+                "element_text": "Link",
+                "screenshot": "output/screenshots/blobs/ab/ab12.png",
+                "colors": ["#777777", "#ffffff"],
+                "contrast_ratio": 4.48,
+                "meets_wcag": False,
+            }],
+            "violations": 1,
+        }
+
+    def render(self, env, template_name):
+        return env.get_template(template_name).render(config=self.config, input_data=self.input_data,
+                                                      page_index=1, page_count=2, output="output")
+
+    def test_compiled_templates_render_like_source(self):
+        source_env = create_report_environment(FileSystemLoader(TEMPLATE_FOLDER))
+        with tempfile.TemporaryDirectory() as folder:
+            compile_report_templates(folder)
+            compiled_env = create_report_environment(ModuleLoader(folder))
+            for template_name in ("markdown_report_page.md", "html_report_page.html"):
+                self.assertEqual(self.render(compiled_env, template_name), self.render(source_env, template_name))
+
+    def test_html_page_is_escaped(self):
+        env = create_report_environment(FileSystemLoader(TEMPLATE_FOLDER))
+        html = self.render(env, "html_report_page.html")
+        self.assertIn("Start &lt;page&gt;", html)
+        self.assertIn("<span class='color-point' style='color: #777777;'>", html)
+        self.assertIn('src="screenshots/blobs/ab/ab12.png"', html)
+        self.assertIn("Start <page>", self.render(env, "markdown_report_page.md"))
+
+
+if __name__ == '__main__':
+    unittest.main()
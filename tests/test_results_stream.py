@@ -0,0 +1,110 @@
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.config import Runner
+from src.results_stream import ResultsWriter, load_results, read_results, write_results_json
+
+
+class TestResultsStream(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name) / "check_results.jsonl"
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_write_and_read(self):
+        with ResultsWriter(self.path) as writer:
+            writer.start("2025-01-01 10:00:00", "https://example.com")
+            writer.add({"index": 1, "config": {"runner": Runner.AXE}, "wait_time": 0.5})
+            writer.add({"index": 2, "wait_time": 1.0})
+            writer.finish("https://example.com", [{"text": "log"}])
+        self.assertEqual(writer.wait_time, 1.5)
+
+        json_data = read_results(self.path)
+        self.assertEqual(json_data["timestamp"], "2025-01-01 10:00:00")
+        self.assertEqual(json_data["total_inputs"], 2)
+        self.assertEqual(json_data["browser_console_log"], [{"text": "log"}])
+        self.assertEqual(len(json_data["inputs"]), 2)
+        inputs = list(json_data["inputs"])
+        self.assertEqual(inputs[0]["config"]["runner"], "axe")
+        # entries can be iterated again (report loops twice over the pages)
+        self.assertEqual([entry["index"] for entry in json_data["inputs"]], [1, 2])
+
+    def test_read_crashed_run(self):
+        writer = ResultsWriter(self.path)
+        writer.start("2025-01-01 10:00:00", "https://example.com")
+        writer.add({"index": 1})
+        # entry flushed before the crash, incomplete last line is ignored
+        with self.path.open("a", encoding="utf-8") as results_file:
+            results_file.write('{"input": {"ind')
+        json_data = read_results(self.path)
+        writer.close()
+        self.assertEqual(json_data["base_url"], "https://example.com")
+        self.assertEqual(json_data["total_inputs"], 1)
+        self.assertEqual(list(json_data["inputs"]), [{"index": 1}])
+
+    def test_write_results_json(self):
+        with ResultsWriter(self.path) as writer:
+            writer.start("2025-01-01 10:00:00", "https://example.com")
+            writer.add({"index": 1, "results": [{"text": "ä"}]})
+            writer.add({"index": 2})
+            writer.finish("https://example.com", [])
+        json_path = Path(self.folder.name) / "check_results.json"
+        write_results_json(read_results(self.path), json_path)
+        json_data = json.loads(json_path.read_text(encoding="utf-8"))
+        self.assertEqual(json_data["total_inputs"], 2)
+        self.assertEqual(json_data["inputs"], [{"index": 1, "results": [{"text": "ä"}]}, {"index": 2}])
+        self.assertEqual(load_results(json_path), json_data)
+
+    def axe_entry(self, index: int) -> dict:
+        rule = {"id": "color-contrast", "impact": "serious", "description": "Contrast", "help": "Help",
+                "helpUrl": "https://example.com/rule", "tags": ["wcag2aa"],
+                "nodes": [{"html": "<a>" + "x" * 100 + "</a>", "target": ["a"]}]}
+        return {"index": index, "config": {"runner": "axe", "axe_rules": "wcag2aa"},
+                "results": [{"violations": [rule], "passes": [], "incomplete": []}]}
+
+    def test_compact_schema(self):
+        with ResultsWriter(self.path, html_length=20) as writer:
+            writer.start("2025-01-01 10:00:00", "https://example.com")
+            writer.add(self.axe_entry(1))
+            writer.add(self.axe_entry(2))
+            writer.finish("https://example.com", [])
+        records = [json.loads(line) for line in self.path.read_text(encoding="utf-8").splitlines()]
+        # config and rule metadata written once, the pages reference them
+        self.assertEqual(sum("config" in record for record in records), 1)
+        self.assertEqual(sum("rule" in record for record in records), 1)
+        stored = [record["input"] for record in records if "input" in record]
+        self.assertEqual(stored[1]["config"], "config_1")
+        self.assertNotIn("description", stored[1]["results"][0]["violations"][0])
+
+        entries = list(read_results(self.path)["inputs"])
+        self.assertEqual(entries[1]["config"], {"runner": "axe", "axe_rules": "wcag2aa"})
+        violation = entries[1]["results"][0]["violations"][0]
+        self.assertEqual(violation["description"], "Contrast")
+        self.assertEqual(violation["tags"], ["wcag2aa"])
+        self.assertEqual(violation["nodes"][0]["html"], "<a>" + "x" * 17 + "…")
+
+    def test_gzip(self):
+        path = self.path.with_name("check_results.jsonl.gz")
+        with ResultsWriter(path) as writer:
+            writer.start("2025-01-01 10:00:00", "https://example.com")
+            writer.add(self.axe_entry(1))
+            writer.finish("https://example.com", [])
+        with gzip.open(path, "rt", encoding="utf-8") as results_file:
+            self.assertIn('"schema": 2', results_file.readline())
+        json_data = load_results(path)
+        self.assertEqual(json_data["total_inputs"], 1)
+        self.assertEqual(list(json_data["inputs"])[0]["results"][0]["violations"][0]["help"], "Help")
+
+        json_path = self.path.with_name("check_results.json.gz")
+        write_results_json(json_data, json_path)
+        self.assertEqual(load_results(json_path)["inputs"][0]["config"]["runner"], "axe")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.image_writer import flush_images
+from src.screenshot import PageScreenshot, save_outline_screenshot
+
+
+class TestPageScreenshot(unittest.TestCase):
+
+    def setUp(self):
+        image = np.zeros((40, 60, 3), dtype=np.uint8)
+        image[10:20, 5:25] = (0, 0, 255)
+        _, png = cv2.imencode(".png", image)
+        self.page_screenshot = PageScreenshot(png.tobytes())
+
+    def test_crop(self):
+        cropped = self.page_screenshot.crop({"x": 5, "y": 10, "width": 20, "height": 10})
+        self.assertEqual(cropped.shape, (10, 20, 3))
+        self.assertTrue((cropped == (0, 0, 255)).all())
+
+    def test_crop_clipped_to_capture(self):
+        cropped = self.page_screenshot.crop({"x": 50, "y": 30, "width": 100, "height": 100})
+        self.assertEqual(cropped.shape, (10, 10, 3))
+
+    def test_crop_outside_capture(self):
+        self.assertIsNone(self.page_screenshot.crop({"x": 100, "y": 0, "width": 10, "height": 10}))
+        self.assertIsNone(self.page_screenshot.crop({"x": 0, "y": 0, "width": 0, "height": 10}))
+
+    def test_save_outline_screenshot(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = Path(folder) / "outline.png"
+            save_outline_screenshot(self.page_screenshot, [({"x": 5, "y": 20, "width": 20, "height": 10}, "!1", True)], path)
+            flush_images()
+            outlined = cv2.imread(path.as_posix())
+        self.assertEqual(outlined.shape, (40, 60, 3))
+        # dotted red outline 3 pixels around the element (BGR)
+        self.assertEqual(tuple(outlined[17, 2]), (0, 0, 255))
+        self.assertEqual(tuple(outlined[32, 2]), (0, 0, 255))
+        # the capture itself is not changed
+        self.assertTrue((self.page_screenshot.image[17, 2] == 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,12 +9,19 @@ import pkgutil
 import src.actions
 
 template_files = [(file, 'src/templates') for file in glob.glob('src/templates/*.*')]
+# templates precompiled to python modules, the bundled tool loads them without parsing (see src/report.py)
+from src.report import compile_report_templates
+compiled_template_folder = os.path.join('build', 'templates_compiled')
+compile_report_templates(compiled_template_folder)
+template_files += [(file, 'src/templates_compiled') for file in glob.glob(os.path.join(compiled_template_folder, '*.py'))]
 js_files = [(file, 'src/js') for file in glob.glob('src/js/*.js')]
 
 hiddenimports = [
     f"src.actions.{module_name}"
     for _, module_name, _ in pkgutil.iter_modules(src.actions.__path__)
 ]
+# runner modules are imported on first use (see analyse_action.runner_function_map)
+hiddenimports += ["src.runner_axe", "src.runner_contrast", "src.runner_tab"]
 
 a = Analysis(
     ['src/main.py'],